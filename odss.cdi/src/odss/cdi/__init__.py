@@ -8,4 +8,18 @@ from .decorators import (
     invalidate,
     component,
     instantiate,
+    lazy,
+    factory,
 )
+from .aggregates import ServiceCollection
+from .runtime import ComponentRuntime
+
+
+class Activator:
+    async def start(self, ctx):
+        self.runtime = ComponentRuntime(ctx)
+        await self.runtime.open()
+
+    async def stop(self, ctx):
+        await self.runtime.close()
+        self.runtime = None
@@ -0,0 +1,146 @@
+import collections.abc
+import math
+import random
+import typing as t
+
+from odss.common import SERVICE_ID, SERVICE_PRIORITY, IServiceReference
+
+
+def get_rank(reference: IServiceReference) -> tuple[int, int]:
+    # the same order as service registry uses for references
+    return (
+        int(reference.get_property(SERVICE_PRIORITY, 0)),
+        reference.get_property(SERVICE_ID),
+    )
+
+
+# levels of skip list: enough for ~2**MAX_LEVEL services
+MAX_LEVEL = 24
+# rank of the end of every level, greater than rank of any service
+END_RANK = (math.inf, math.inf)
+
+
+class SkipNode:
+    __slots__ = ("rank", "service", "next", "width")
+
+    def __init__(self, rank: tuple, service: t.Any, level: int) -> None:
+        self.rank = rank
+        self.service = service
+        self.next: list[SkipNode | None] = [None] * level
+        # number of services passed by following next link of the level
+        self.width: list[int] = [1] * level
+
+
+def random_level() -> int:
+    level = 1
+    while level < MAX_LEVEL and random.random() < 0.5:
+        level += 1
+    return level
+
+
+class ServiceCollection(collections.abc.Sequence):
+    """
+    Read-only live collection of services injected by aggregate requirement.
+
+    Services are kept sorted by rank of their references in indexable skip
+    list: insert, remove and indexing are O(log n) (expected), iteration
+    follows links of the lowest level, so it does not copy. Iteration
+    interrupted by await may observe changes.
+    """
+
+    __slots__ = ("_head", "_end", "_size", "_references")
+
+    def __init__(self) -> None:
+        self._end = SkipNode(END_RANK, None, 0)
+        self._clear()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ServiceCollection index out of range")
+        node = self._head
+        # head is at position 0, services from 1
+        position = index + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.width[level] <= position:
+                position -= node.width[level]
+                node = node.next[level]
+        return node.service
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        node = self._head.next[0]
+        while node is not self._end:
+            yield node.service
+            node = node.next[0]
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __repr__(self) -> str:
+        return f"ServiceCollection({list(self)!r})"
+
+    def _add(self, reference: IServiceReference, service: t.Any) -> None:
+        if reference in self._references:
+            return
+        rank = get_rank(reference)
+        # last node before the new one on every level, with its position
+        chain = [self._head] * MAX_LEVEL
+        steps = [0] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level].rank <= rank:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        level_count = random_level()
+        new = SkipNode(rank, service, level_count)
+        passed = 0
+        for level in range(level_count):
+            previous = chain[level]
+            new.next[level] = previous.next[level]
+            previous.next[level] = new
+            new.width[level] = previous.width[level] - passed
+            previous.width[level] = passed + 1
+            passed += steps[level]
+        for level in range(level_count, MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+        self._references[reference] = rank
+
+    def _remove(self, reference: IServiceReference) -> t.Any:
+        rank = self._references.pop(reference)
+        chain = [self._head] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level].rank < rank:
+                node = node.next[level]
+            chain[level] = node
+
+        removed = chain[0].next[0]
+        for level in range(len(removed.next)):
+            previous = chain[level]
+            previous.width[level] += removed.width[level] - 1
+            previous.next[level] = removed.next[level]
+        for level in range(len(removed.next), MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+        return removed.service
+
+    def _clear(self) -> None:
+        # running iteration keeps links of old nodes
+        self._head = SkipNode((), None, MAX_LEVEL)
+        self._head.next = [self._end] * MAX_LEVEL
+        self._size = 0
+        self._references: dict[IServiceReference, tuple[int, int]] = {}
+
+    def _update(self, reference: IServiceReference) -> None:
+        if reference in self._references:
+            if self._references[reference] != get_rank(reference):
+                self._add(reference, self._remove(reference))
@@ -5,6 +5,8 @@ HANDLER_REQUIRES = "odss.requires"
 HANDLER_CONSTRUCTOR_REQUIRES = "odss.constructor.requires"
 HANDLER_VALIDATE = "odss.validate"
 HANDLER_BIND = "odss.bind"
+HANDLER_LAZY = "odss.lazy"
+HANDLER_FACTORY_PID = "odss.factory.pid"
 
 PROP_HANDLER_NAME = "odss.handler.id"
 
@@ -1,8 +1,10 @@
 import collections
+import dataclasses as dts
 import inspect
 import typing as t
 
 from odss.common import IBundle, IBundleContext, get_class_name
+from odss.core.query import create_query, nodes
 
 from . import consts
 
@@ -86,6 +88,87 @@ def prepare_factory_context(clazz, name):
         raise TypeError("Component has already been prepared")
 
 
+@dts.dataclass(frozen=True, slots=True)
+class RequirementSlot:
+    specification: str
+    query: nodes.Node
+    field: str | None = None
+    bind: t.Callable | None = None
+    unbind: t.Callable | None = None
+    aggregate: bool = False
+
+    def match(self, properties: dict) -> bool:
+        return self.query.match(properties)
+
+
+@dts.dataclass(frozen=True, slots=True)
+class InjectionPlan:
+    """
+    Everything needed to create and wire component instance, computed once
+    per factory: instances of factory are created without reflection.
+    """
+
+    provides: tuple[str, ...]
+    arguments: tuple[RequirementSlot, ...]
+    fields: tuple[RequirementSlot, ...]
+    binds: tuple[RequirementSlot, ...]
+    validate: t.Callable | None
+    invalidate: t.Callable | None
+    lazy: bool
+    idle_timeout: float | None
+    factory_pid: str | None
+
+
+def create_injection_plan(factory_context: "FactoryContext") -> InjectionPlan:
+    provides = tuple(factory_context.get_handler(consts.HANDLER_PROVIDES) or ())
+    everything = create_query(None)
+    arguments = tuple(
+        RequirementSlot(specification, everything)
+        for specification in factory_context.get_handler(
+            consts.HANDLER_CONSTRUCTOR_REQUIRES
+        )
+        or ()
+    )
+    requires = factory_context.get_handler(consts.HANDLER_REQUIRES) or {}
+    fields = tuple(
+        RequirementSlot(specifications[0], create_query(query or None), field)
+        for field, (specifications, query, aggregate) in requires.items()
+        if not aggregate
+    )
+    # aggregate requirement is handled like bind: any number of services
+    aggregates = tuple(
+        RequirementSlot(
+            specifications[0], create_query(query or None), field, aggregate=True
+        )
+        for field, (specifications, query, aggregate) in requires.items()
+        if aggregate
+    )
+    binds = aggregates + tuple(
+        RequirementSlot(
+            get_class_name(requirement.specification),
+            create_query(requirement.spec_filter or None),
+            bind=callbacks.get(consts.CALLBACK_BIND),
+            unbind=callbacks.get(consts.CALLBACK_UNBIND),
+        )
+        for requirement, callbacks in factory_context.get_handler(consts.HANDLER_BIND)
+        or ()
+    )
+    lazy = factory_context.get_handler(consts.HANDLER_LAZY)
+    # lazy component is instantiated by get_service() of its provided service
+    is_lazy = lazy is not None and bool(provides)
+    return InjectionPlan(
+        provides=provides,
+        arguments=arguments,
+        fields=fields,
+        binds=binds,
+        validate=factory_context.get_callback(consts.CALLBACK_VALIDATE)[0],
+        invalidate=factory_context.get_callback(consts.CALLBACK_INVALIDATE)[0],
+        lazy=is_lazy,
+        idle_timeout=lazy["idle_timeout"] if is_lazy else None,
+        factory_pid=factory_context.get_handler(consts.HANDLER_FACTORY_PID),
+    )
+
+
 class FactoryContext:
     def __init__(self):
         self.name = ""
@@ -94,6 +177,12 @@ class FactoryContext:
         self.__handlers = {}
         self._callbacks = {}
         self.__bundle = None
+        self.__plan = None
+
+    def get_injection_plan(self) -> InjectionPlan:
+        if self.__plan is None:
+            self.__plan = create_injection_plan(self)
+        return self.__plan
 
     def set_bundle(self, bundle: IBundle):
         self.__bundle = bundle
@@ -123,16 +212,19 @@ class FactoryContext:
         return name in self.__handlers
 
     def set_handler(self, name: str, args: any) -> None:
+        self.__plan = None
         if name in self.__handlers:
             raise ValueError(f"Handler {name} already register")
         self.__handlers[name] = args
 
     def set_default_handler(self, name: str, args: any) -> any:
+        self.__plan = None
         if name not in self.__handlers:
             self.__handlers[name] = args
         return self.__handlers[name]
 
     def append_handler(self, name, args: any) -> None:
+        self.__plan = None
         if name not in self.__handlers:
             self.__handlers[name] = []
         self.__handlers[name].append(args)
@@ -147,6 +239,7 @@ class FactoryContext:
         return self.__handlers.items()
 
     def set_callback(self, kind: str, method: t.Callable, args: t.Any):
+        self.__plan = None
         self._callbacks[kind] = (method, args)
 
     def get_callback(self, kind: str):
@@ -154,6 +247,8 @@ class FactoryContext:
 
 
 class ComponentContext:
+    __slots__ = ("name", "factory_target", "factory_context", "properties")
+
     def __init__(
         self,
         name: str,
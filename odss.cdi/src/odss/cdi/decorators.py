@@ -8,6 +8,8 @@ from .consts import (
     CALLBACK_INVALIDATE,
     CALLBACK_UNBIND,
     CALLBACK_VALIDATE,
+    HANDLER_FACTORY_PID,
+    HANDLER_LAZY,
     HANDLER_PROVIDES,
     HANDLER_REQUIRES,
     METHOD_CALLBACK,
@@ -69,6 +71,36 @@ def instantiate(name, properties=None):
     return instantiate_decorator
 
 
+def factory(factory_pid):
+    """
+    The ``@factory`` decorator creates component instance for every
+    configuration of given factory PID (``IConfigurationManagedFactory``),
+    instead of instances declared by ``@instantiate``.
+
+    Configuration properties become properties of instance service.
+
+    :Example:
+
+    .. code-block:: python
+
+        @component
+        @provides(ITenant)
+        @factory("tenant")
+        class Tenant:
+            pass
+    """
+    if not isinstance(factory_pid, str) or not factory_pid.strip():
+        raise ValueError("Invalid factory pid '{0}'".format(factory_pid))
+
+    def factory_decorator(clazz):
+        if not inspect.isclass(clazz):
+            raise TypeError("Class exptected, got '{0}'".format(type(clazz).__name__))
+        get_factory_context(clazz).set_handler(HANDLER_FACTORY_PID, factory_pid)
+        return clazz
+
+    return factory_decorator
+
+
 def provides(specifications):
     """
     The ``@Provides`` decorator defines a service to expose
@@ -109,7 +141,69 @@ def provides(specifications):
     return provides_decorator
 
 
-def requires(field, specifications, query=None):
+def lazy(idle_timeout=None):
+    """
+    The ``@lazy`` decorator delays component instantiation: provided service
+    is registered as soon as component is valid, but class is created and
+    validated on first ``get_service``.
+
+    :Example:
+
+    .. code-block:: python
+
+        @component
+        @provides(IReport)
+        @lazy  # keep instance until component is invalidated
+        class Report:
+            pass
+
+
+        @component
+        @provides(IReport)
+        @lazy(idle_timeout=60)  # dispose instance 60s after last user
+        class Report:
+            pass
+    """
+    if inspect.isclass(idle_timeout):
+        get_factory_context(idle_timeout).set_handler(
+            HANDLER_LAZY, {"idle_timeout": None}
+        )
+        return idle_timeout
+
+    if idle_timeout is not None and idle_timeout < 0:
+        raise ValueError("Invalid idle timeout '{0}'".format(idle_timeout))
+
+    def lazy_decorator(clazz):
+        if not inspect.isclass(clazz):
+            raise TypeError("Class exptected, got '{0}'".format(type(clazz).__name__))
+        get_factory_context(clazz).set_handler(
+            HANDLER_LAZY, {"idle_timeout": idle_timeout}
+        )
+        return clazz
+
+    return lazy_decorator
+
+
+def requires(field, specifications, query=None, aggregate=False):
+    """
+    The ``@requires`` decorator injects required service into field.
+
+    Component is valid only when service is available. Aggregate requirement
+    does not block validation: field holds read-only ``ServiceCollection`` of
+    all matching services sorted by rank, updated when services come and go.
+
+    :Example:
+
+    .. code-block:: python
+
+        @component
+        @requires("storage", IStorage)
+        @requires("plugins", IPlugin, "(enabled=true)", aggregate=True)
+        class Manager:
+            def run(self):
+                for plugin in self.plugins:
+                    plugin.run(self.storage)
+    """
     if not field:
         raise ValueError("Empty field name")
     if not isinstance(field, str):
@@ -118,7 +212,7 @@ def requires(field, specifications, query=None):
     def requires_decorator(clazz):
         specs = get_classes_name(specifications)
         fields = get_factory_context(clazz).set_default_handler(HANDLER_REQUIRES, {})
-        fields[field] = (specs, query)
+        fields[field] = (specs, query, aggregate)
 
         setattr(clazz, field, None)
 
@@ -0,0 +1,716 @@
+import asyncio
+import collections
+import inspect
+import logging
+import typing as t
+
+from odss.common import (
+    OBJECTCLASS,
+    SERVICE_FACTORY_PID,
+    SERVICE_PID,
+    BundleEvent,
+    IBundle,
+    IBundleContext,
+    IConfigurationManagedFactory,
+    IServiceFactory,
+    IServiceReference,
+    ServiceEvent,
+    TProperties,
+)
+
+from .aggregates import ServiceCollection
+from .contexts import (
+    ComponentContext,
+    FactoryContext,
+    RequirementSlot,
+    get_factory_context,
+    has_factory_context,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Dependency:
+    """
+    Mandatory dependency: constructor argument or required field
+    """
+
+    __slots__ = ("slot", "reference", "service")
+
+    def __init__(self, slot: RequirementSlot) -> None:
+        self.slot = slot
+        self.reference: IServiceReference | None = None
+        self.service: t.Any = None
+
+
+class BindDependency:
+    """
+    Optional dependency with multiple cardinality handled by bind/unbind callbacks
+    """
+
+    __slots__ = ("slot", "services", "collection")
+
+    def __init__(self, slot: RequirementSlot) -> None:
+        self.slot = slot
+        self.services: dict[IServiceReference, t.Any] = {}
+        # injected into field by aggregate requirement
+        self.collection = ServiceCollection() if slot.aggregate else None
+
+
+async def _call(method, *args):
+    result = method(*args)
+    if inspect.isawaitable(result):
+        await result
+
+
+def _call_in_order(tasks: set[asyncio.Task], calls: list[tuple]) -> None:
+    # lazy components are created inside synchronous get_service(): callbacks
+    # are called at once up to the first coroutine, the rest runs in one task
+    calls = iter(calls)
+    for method, *args in calls:
+        result = method(*args)
+        if inspect.isawaitable(result):
+            _spawn(tasks, _finish_calls(result, calls))
+            return
+
+
+async def _finish_calls(awaitable, calls: t.Iterator[tuple]) -> None:
+    await awaitable
+    for method, *args in calls:
+        await _call(method, *args)
+
+
+def _spawn(tasks: set[asyncio.Task], awaitable) -> None:
+    # keep reference: pending task is awaited (or cancelled) by its owner
+    task = asyncio.ensure_future(awaitable)
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    task.add_done_callback(_log_error)
+
+
+async def _wait_tasks(tasks: set[asyncio.Task], cancel: bool = False) -> None:
+    current = asyncio.current_task()
+    pending = [task for task in tasks if task is not current]
+    if cancel:
+        for task in pending:
+            task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _log_error(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        exception = future.exception()
+        logger.error("Component task error: %s", exception, exc_info=exception)
+
+
+class LazyComponentService(IServiceFactory):
+    """
+    Registered in place of lazy component: instance is created by first
+    get_service() and optionally disposed after idle timeout without users.
+    """
+
+    def __init__(self, manager: "ComponentManager") -> None:
+        self.manager = manager
+        self.users = 0
+
+    def get_service(self, bundle: IBundle, reference: IServiceReference) -> t.Any:
+        self.users += 1
+        return self.manager.get_instance()
+
+    def unget_service(
+        self, bundle: IBundle, reference: IServiceReference, service: t.Any
+    ) -> None:
+        self.users -= 1
+        if not self.users:
+            self.manager.schedule_dispose()
+
+
+class ComponentManager:
+    """
+    Life cycle of single component instance.
+
+    Component is valid (instantiated, validated and registered) when every
+    mandatory dependency is bound. Lazy component is registered when valid,
+    but instantiated on first use.
+    """
+
+    __slots__ = (
+        "context",
+        "plan",
+        "state",
+        "instance",
+        "registration",
+        "arguments",
+        "fields",
+        "binds",
+        "dependencies",
+        "dispose_handle",
+        "waiting",
+        "tasks",
+    )
+
+    INVALID = 0
+    VALID = 1
+
+    def __init__(self, context: ComponentContext) -> None:
+        plan = context.factory_context.get_injection_plan()
+        self.context = context
+        self.plan = plan
+        self.state = ComponentManager.INVALID
+        self.instance: t.Any = None
+        self.registration = None
+        self.arguments = [Dependency(slot) for slot in plan.arguments]
+        self.fields = [Dependency(slot) for slot in plan.fields]
+        self.binds = [BindDependency(slot) for slot in plan.binds]
+        self.dependencies = self.arguments + self.fields
+        self.dispose_handle: asyncio.TimerHandle | None = None
+        # specifications indexed by runtime as waiting for services
+        self.waiting: set[str] = set()
+        # pending callbacks of lazy instance
+        self.tasks: set[asyncio.Task] = set()
+
+    @property
+    def name(self) -> str:
+        return self.context.name
+
+    def get_bundle_context(self) -> IBundleContext:
+        return self.context.get_bundle_context()
+
+    def get_missing(self) -> set[str]:
+        return {
+            dependency.slot.specification
+            for dependency in self.dependencies
+            if dependency.reference is None
+        }
+
+    def bind_dependency(
+        self, dependency: Dependency, reference: IServiceReference
+    ) -> None:
+        dependency.reference = reference
+        dependency.service = self.get_bundle_context().get_service(reference)
+
+    def unbind_dependency(self, dependency: Dependency) -> None:
+        if dependency.reference is not None:
+            self.get_bundle_context().unget_service(dependency.reference)
+        dependency.reference = None
+        dependency.service = None
+
+    def get_references(self) -> t.Iterable[IServiceReference]:
+        for dependency in self.dependencies:
+            if dependency.reference is not None:
+                yield dependency.reference
+        for bind in self.binds:
+            yield from bind.services
+
+    async def add_bind(self, bind: BindDependency, reference: IServiceReference):
+        if reference in bind.services:
+            return
+        service = self.get_bundle_context().get_service(reference)
+        bind.services[reference] = service
+        if bind.collection is not None:
+            bind.collection._add(reference, service)
+        if bind.slot.bind is not None and self.instance is not None:
+            await _call(bind.slot.bind, self.instance, service)
+
+    async def remove_bind(self, bind: BindDependency, reference: IServiceReference):
+        service = bind.services.pop(reference, None)
+        if service is None:
+            return
+        if bind.collection is not None:
+            bind.collection._remove(reference)
+        try:
+            if bind.slot.unbind is not None and self.instance is not None:
+                await _call(bind.slot.unbind, self.instance, service)
+        finally:
+            self.get_bundle_context().unget_service(reference)
+
+    def create_instance(self) -> t.Any:
+        args = [dependency.service for dependency in self.arguments]
+        instance = self.context.factory_target(*args)
+        for dependency in self.fields:
+            setattr(instance, dependency.slot.field, dependency.service)
+        for bind in self.binds:
+            if bind.collection is not None:
+                setattr(instance, bind.slot.field, bind.collection)
+        return instance
+
+    def update_bind(self, reference: IServiceReference) -> None:
+        for bind in self.binds:
+            if bind.collection is not None:
+                bind.collection._update(reference)
+
+    async def validate(self) -> None:
+        ctx = self.get_bundle_context()
+        if not self.plan.lazy:
+            self.instance = self.create_instance()
+        try:
+            for bind in self.binds:
+                for reference in ctx.get_service_references(
+                    bind.slot.specification, bind.slot.query
+                ):
+                    await self.add_bind(bind, reference)
+
+            if self.plan.validate is not None and not self.plan.lazy:
+                await _call(self.plan.validate, self.instance, ctx)
+        except Exception:
+            for bind in self.binds:
+                for reference in list(bind.services):
+                    ctx.unget_service(reference)
+                bind.services.clear()
+                if bind.collection is not None:
+                    bind.collection._clear()
+            self.instance = None
+            raise
+
+        if self.plan.provides:
+            service = LazyComponentService(self) if self.plan.lazy else self.instance
+            self.registration = await ctx.register_service(
+                self.plan.provides, service, self.context.properties
+            )
+        self.state = ComponentManager.VALID
+        logger.debug("Component %s validated", self.name)
+
+    def get_instance(self) -> t.Any:
+        """
+        Instance of lazy component: bind callbacks and validate are called in
+        this order, but get_service() is synchronous, so instance with async
+        callbacks is returned before they finish (invalidate waits for them)
+        """
+        self.cancel_dispose()
+        if self.instance is None:
+            logger.debug("Instantiate lazy component %s", self.name)
+            instance = self.instance = self.create_instance()
+            calls = [
+                (bind.slot.bind, instance, service)
+                for bind in self.binds
+                if bind.slot.bind is not None
+                for service in bind.services.values()
+            ]
+            if self.plan.validate is not None:
+                calls.append((self.plan.validate, instance, self.get_bundle_context()))
+            _call_in_order(self.tasks, calls)
+        return self.instance
+
+    def schedule_dispose(self) -> None:
+        if self.plan.idle_timeout is None or self.instance is None:
+            return
+        self.cancel_dispose()
+        loop = asyncio.get_running_loop()
+        self.dispose_handle = loop.call_later(self.plan.idle_timeout, self.dispose)
+
+    def cancel_dispose(self) -> None:
+        if self.dispose_handle is not None:
+            self.dispose_handle.cancel()
+            self.dispose_handle = None
+
+    def dispose(self) -> None:
+        self.dispose_handle = None
+        instance, self.instance = self.instance, None
+        if instance is None:
+            return
+        logger.debug("Dispose idle component %s", self.name)
+        calls = []
+        if self.plan.invalidate is not None:
+            calls.append((self.plan.invalidate, instance, self.get_bundle_context()))
+        calls.extend(
+            (bind.slot.unbind, instance, service)
+            for bind in self.binds
+            if bind.slot.unbind is not None
+            for service in bind.services.values()
+        )
+        _call_in_order(self.tasks, calls)
+        for dependency in self.fields:
+            setattr(instance, dependency.slot.field, None)
+
+    async def invalidate(self) -> None:
+        if self.state != ComponentManager.VALID:
+            return
+        self.state = ComponentManager.INVALID
+        ctx = self.get_bundle_context()
+        try:
+            if self.registration is not None:
+                registration, self.registration = self.registration, None
+                await registration.unregister()
+            self.cancel_dispose()
+            # callbacks of lazy instance finish before it is invalidated
+            await _wait_tasks(self.tasks)
+
+            if self.plan.invalidate is not None and self.instance is not None:
+                await _call(self.plan.invalidate, self.instance, ctx)
+
+            for bind in self.binds:
+                for reference in list(bind.services):
+                    await self.remove_bind(bind, reference)
+        finally:
+            if self.instance is not None:
+                for dependency in self.fields:
+                    setattr(self.instance, dependency.slot.field, None)
+            self.instance = None
+            logger.debug("Component %s invalidated", self.name)
+
+
+class ComponentRuntime:
+    """
+    Instantiate components declared in started bundles.
+
+    Service events re-evaluate only components indexed by specification of
+    the changed service: invalid components by missing dependencies, valid
+    ones by bind dependencies and by used service id.
+    """
+
+    def __init__(self, ctx: IBundleContext) -> None:
+        self.ctx = ctx
+        self.factories: dict[str, FactoryContext] = {}
+        self.components: dict[int, list[ComponentManager]] = {}
+        self.managed: dict[int, list[ManagedComponentFactory]] = {}
+        self.waiting: dict[str, set[ComponentManager]] = {}
+        self.binds: dict[str, set[ComponentManager]] = {}
+        self.using: dict[int, set[ComponentManager]] = {}
+        self.__actions: collections.deque = collections.deque()
+        self.__running = False
+
+    async def open(self) -> None:
+        self.ctx.add_bundle_listener(self)
+        self.ctx.add_service_listener(self)
+        for bundle in self.ctx.get_bundles():
+            if bundle.state == IBundle.ACTIVE:
+                await self.run(self.add_bundle, bundle)
+
+    async def close(self) -> None:
+        self.ctx.remove_service_listener(self)
+        self.ctx.remove_bundle_listener(self)
+        for bundle_id in set(self.components) | set(self.managed):
+            await self.run(self.remove_bundle_components, bundle_id)
+
+    async def run(self, action, *args) -> None:
+        # service (un)registration of component fires nested events: queue them
+        # and process by the outer call, one action at time
+        self.__actions.append((action, args))
+        if self.__running:
+            return
+        self.__running = True
+        try:
+            while self.__actions:
+                action, args = self.__actions.popleft()
+                try:
+                    await action(*args)
+                except Exception as ex:
+                    logger.exception("Component runtime error: %s", ex)
+        finally:
+            self.__running = False
+
+    async def bundle_changed(self, event: BundleEvent) -> None:
+        if event.kind == BundleEvent.STARTED:
+            await self.run(self.add_bundle, event.bundle)
+        elif event.kind == BundleEvent.STOPPING:
+            await self.run(self.remove_bundle_components, event.bundle.id)
+
+    async def service_changed(self, event: ServiceEvent) -> None:
+        reference = event.reference
+        if event.kind == ServiceEvent.REGISTERED:
+            await self.run(self.service_added, reference)
+        elif event.kind == ServiceEvent.MODIFIED:
+            await self.run(self.service_modified, reference)
+        elif event.kind in (ServiceEvent.UNREGISTERING, ServiceEvent.MODIFIED_ENDMATCH):
+            await self.run(self.service_removed, reference)
+
+    def find_factories(
+        self, bundle: IBundle
+    ) -> list[tuple[t.Callable, FactoryContext]]:
+        module = bundle.get_module()
+        prefix = module.__name__
+        factories = []
+        for target in vars(module).values():
+            if not inspect.isclass(target) or not has_factory_context(target):
+                continue
+            if target.__module__ != prefix and not target.__module__.startswith(
+                prefix + "."
+            ):
+                continue
+            factory_context = get_factory_context(target)
+            if factory_context.completed and factory_context.name not in self.factories:
+                factories.append((target, factory_context))
+        return factories
+
+    async def add_bundle(self, bundle: IBundle) -> None:
+        if bundle.id in self.components or bundle.id in self.managed:
+            return
+        managers = []
+        managed = []
+        for target, factory_context in self.find_factories(bundle):
+            factory_context.set_bundle(bundle)
+            self.factories[factory_context.name] = factory_context
+            if factory_context.get_injection_plan().factory_pid is not None:
+                managed.append(ManagedComponentFactory(self, target, factory_context))
+                continue
+            for name, properties in factory_context.get_instances():
+                context = ComponentContext(
+                    name, target, factory_context, dict(properties)
+                )
+                managers.append(ComponentManager(context))
+        if managers:
+            logger.debug("Bundle %s components: %d", bundle.name, len(managers))
+            self.components[bundle.id] = managers
+            for manager in managers:
+                await self.resolve(manager)
+        if managed:
+            self.managed[bundle.id] = managed
+            for factory in managed:
+                await factory.open()
+
+    async def remove_bundle_components(self, bundle_id: int) -> None:
+        for factory in self.managed.pop(bundle_id, ()):
+            await factory.close()
+            self.factories.pop(factory.factory_context.name, None)
+        for manager in self.components.pop(bundle_id, ()):
+            await self.dispose(manager)
+            self.factories.pop(manager.context.factory_context.name, None)
+
+    async def dispose(self, manager: ComponentManager) -> None:
+        await self.deactivate(manager)
+        self.set_waiting(manager, set())
+
+    def set_waiting(self, manager: ComponentManager, specifications: set[str]):
+        for specification in manager.waiting - specifications:
+            managers = self.waiting[specification]
+            managers.discard(manager)
+            if not managers:
+                del self.waiting[specification]
+        for specification in specifications - manager.waiting:
+            self.waiting.setdefault(specification, set()).add(manager)
+        manager.waiting = specifications
+
+    async def resolve(self, manager: ComponentManager) -> None:
+        ctx = manager.get_bundle_context()
+        for dependency in manager.dependencies:
+            if dependency.reference is None:
+                reference = ctx.get_service_reference(
+                    dependency.slot.specification, dependency.slot.query
+                )
+                if reference is not None:
+                    self.bind_dependency(manager, dependency, reference)
+        await self.try_activate(manager)
+
+    def bind_dependency(
+        self,
+        manager: ComponentManager,
+        dependency: Dependency,
+        reference: IServiceReference,
+    ) -> None:
+        # indexed at once: service can go away before component is valid
+        manager.bind_dependency(dependency, reference)
+        self.using.setdefault(reference.get_id(), set()).add(manager)
+
+    async def try_activate(self, manager: ComponentManager) -> None:
+        missing = manager.get_missing()
+        self.set_waiting(manager, missing)
+        if missing:
+            return
+        try:
+            await manager.validate()
+        except Exception as ex:
+            logger.exception("Error validating component %s: %s", manager.name, ex)
+            # keep bound services: validation is retried when they change
+            self.set_waiting(
+                manager,
+                {dependency.slot.specification for dependency in manager.dependencies},
+            )
+            return
+        for bind in manager.binds:
+            self.binds.setdefault(bind.slot.specification, set()).add(manager)
+        for reference in manager.get_references():
+            self.using.setdefault(reference.get_id(), set()).add(manager)
+
+    async def deactivate(self, manager: ComponentManager) -> None:
+        # invalidate unbinds services: collect references to release before
+        references = list(manager.get_references())
+        try:
+            await manager.invalidate()
+        except Exception as ex:
+            logger.exception("Error invalidating component %s: %s", manager.name, ex)
+        for bind in manager.binds:
+            managers = self.binds.get(bind.slot.specification)
+            if managers is not None:
+                managers.discard(manager)
+                if not managers:
+                    del self.binds[bind.slot.specification]
+        for reference in references:
+            self.release(reference, manager)
+        for dependency in manager.dependencies:
+            manager.unbind_dependency(dependency)
+
+    def release(self, reference: IServiceReference, manager: ComponentManager):
+        managers = self.using.get(reference.get_id())
+        if managers is not None:
+            managers.discard(manager)
+            if not managers:
+                del self.using[reference.get_id()]
+
+    async def service_added(self, reference: IServiceReference) -> None:
+        properties = reference.get_properties()
+        specifications = properties[OBJECTCLASS]
+        waiting = set()
+        binding = set()
+        for specification in specifications:
+            waiting.update(self.waiting.get(specification, ()))
+            binding.update(self.binds.get(specification, ()))
+
+        for manager in waiting:
+            if manager.state == ComponentManager.VALID:
+                continue
+            for dependency in manager.dependencies:
+                if (
+                    dependency.reference is None
+                    and dependency.slot.specification in specifications
+                    and dependency.slot.match(properties)
+                ):
+                    self.bind_dependency(manager, dependency, reference)
+            await self.try_activate(manager)
+
+        for manager in binding:
+            if manager.state != ComponentManager.VALID:
+                continue
+            for bind in manager.binds:
+                slot = bind.slot
+                if slot.specification in specifications and slot.match(properties):
+                    await manager.add_bind(bind, reference)
+                    self.using.setdefault(reference.get_id(), set()).add(manager)
+
+    async def service_removed(self, reference: IServiceReference) -> None:
+        managers = self.using.pop(reference.get_id(), ())
+        for manager in managers:
+            await self.remove_reference(manager, reference)
+
+    async def service_modified(self, reference: IServiceReference) -> None:
+        for manager in list(self.using.get(reference.get_id(), ())):
+            if not self.still_matches(manager, reference):
+                self.release(reference, manager)
+                await self.remove_reference(manager, reference)
+            else:
+                # priority could change: keep aggregates sorted
+                manager.update_bind(reference)
+        await self.service_added(reference)
+
+    def still_matches(self, manager: ComponentManager, reference: IServiceReference):
+        properties = reference.get_properties()
+        for dependency in manager.dependencies:
+            if dependency.reference is reference:
+                if not dependency.slot.match(properties):
+                    return False
+        for bind in manager.binds:
+            if reference in bind.services and not bind.slot.match(properties):
+                return False
+        return True
+
+    async def remove_reference(
+        self, manager: ComponentManager, reference: IServiceReference
+    ) -> None:
+        if any(
+            dependency.reference is reference for dependency in manager.dependencies
+        ):
+            # constructor arguments can not be replaced on living instance
+            await self.deactivate(manager)
+            await self.resolve(manager)
+            return
+        for bind in manager.binds:
+            if reference in bind.services:
+                try:
+                    await manager.remove_bind(bind, reference)
+                except Exception as ex:
+                    logger.exception("Error unbinding %s: %s", manager.name, ex)
+
+
+class ManagedComponentFactory(IConfigurationManagedFactory):
+    """
+    Component instance per configuration of factory PID.
+
+    Configuration events are coalesced per PID and applied in batch by
+    runtime: repeated update of the same PID is applied once, update with
+    unchanged properties is ignored and changed properties of valid instance
+    only update its service registration.
+    """
+
+    def __init__(
+        self,
+        runtime: ComponentRuntime,
+        target: t.Callable,
+        factory_context: FactoryContext,
+    ) -> None:
+        self.runtime = runtime
+        self.target = target
+        self.factory_context = factory_context
+        self.factory_pid = factory_context.get_injection_plan().factory_pid
+        self.instances: dict[str, ComponentManager] = {}
+        self.pending: dict[str, TProperties | None] = {}
+        self.handle: asyncio.Handle | None = None
+        self.tasks: set[asyncio.Task] = set()
+        self.registration = None
+
+    async def open(self) -> None:
+        ctx = self.factory_context.get_bundle_context()
+        self.registration = await ctx.register_service(
+            IConfigurationManagedFactory,
+            self,
+            {SERVICE_FACTORY_PID: self.factory_pid},
+        )
+
+    async def close(self) -> None:
+        if self.registration is not None:
+            registration, self.registration = self.registration, None
+            await registration.unregister()
+        self.pending.clear()
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        await _wait_tasks(self.tasks, cancel=True)
+        instances, self.instances = self.instances, {}
+        for manager in instances.values():
+            await self.runtime.dispose(manager)
+
+    async def updated(self, pid: str, properties: TProperties) -> None:
+        self.schedule(pid, dict(properties or {}))
+
+    async def deleted(self, pid: str) -> None:
+        self.schedule(pid, None)
+
+    def schedule(self, pid: str, properties: TProperties | None) -> None:
+        if self.registration is None:
+            return
+        self.pending[pid] = properties
+        if self.handle is None:
+            self.handle = asyncio.get_running_loop().call_soon(self.__flush)
+
+    def __flush(self) -> None:
+        self.handle = None
+        _spawn(self.tasks, self.runtime.run(self.apply))
+
+    async def apply(self) -> None:
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        logger.debug(
+            "Factory %s: apply %d configurations", self.factory_pid, len(pending)
+        )
+        for pid, properties in pending.items():
+            manager = self.instances.get(pid)
+            if properties is None:
+                if manager is not None:
+                    del self.instances[pid]
+                    await self.runtime.dispose(manager)
+                continue
+
+            properties[SERVICE_PID] = pid
+            properties[SERVICE_FACTORY_PID] = self.factory_pid
+            if manager is None:
+                context = ComponentContext(
+                    pid, self.target, self.factory_context, properties
+                )
+                manager = self.instances[pid] = ComponentManager(context)
+                await self.runtime.resolve(manager)
+            elif manager.context.properties != properties:
+                manager.context.properties = properties
+                if manager.registration is not None:
+                    await manager.registration.set_properties(
+                        dict(properties), replace=True
+                    )
@@ -0,0 +1,102 @@
+import asyncio
+
+from odss.cdi import (
+    bind,
+    component,
+    factory,
+    instantiate,
+    invalidate,
+    lazy,
+    provides,
+    requires,
+    unbind,
+    validate,
+)
+from tests.interfaces import (
+    ICache,
+    IConsumer,
+    IDashboard,
+    ILogger,
+    IPlugin,
+    IReport,
+    IStorage,
+    ITenant,
+)
+
+
+@component
+@instantiate("consumer")
+@provides(IConsumer)
+@requires("storage", IStorage)
+class Consumer:
+    def __init__(self):
+        self.events = []
+        self.plugins = []
+
+    @validate
+    def validate(self, ctx):
+        self.events.append(("validate", self.storage))
+
+    @invalidate
+    def invalidate(self, ctx):
+        self.events.append(("invalidate", self.storage))
+
+    @bind
+    def add_plugin(self, plugin: IPlugin):
+        self.plugins.append(plugin)
+
+    @unbind
+    def remove_plugin(self, plugin: IPlugin):
+        self.plugins.remove(plugin)
+
+
+@component
+@instantiate("report")
+@provides(IReport)
+@requires("storage", IStorage)
+@requires("logger", ILogger)
+class Report:
+    @validate
+    def validate(self, ctx):
+        if getattr(self.storage, "broken", False):
+            raise ValueError("Broken storage")
+
+
+@component
+@instantiate("cache")
+@provides(ICache)
+@requires("storage", IStorage)
+@lazy
+class Cache:
+    def __init__(self):
+        self.events = []
+
+    @validate
+    async def validate(self, ctx):
+        await asyncio.sleep(0.01)
+        self.events.append("validate")
+
+    @invalidate
+    async def invalidate(self, ctx):
+        self.events.append("invalidate")
+
+    @bind
+    async def add_plugin(self, plugin: IPlugin):
+        await asyncio.sleep(0.02)
+        self.events.append("bind")
+
+
+@component
+@provides(ITenant)
+@requires("storage", IStorage)
+@factory("tenant")
+class Tenant:
+    pass
+
+
+@component
+@instantiate("dashboard")
+@provides(IDashboard)
+@requires("plugins", IPlugin, "(enabled=true)", aggregate=True)
+class Dashboard:
+    pass
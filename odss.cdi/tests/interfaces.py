@@ -0,0 +1,30 @@
+class IStorage:
+    pass
+
+
+class ILogger:
+    pass
+
+
+class IPlugin:
+    pass
+
+
+class IConsumer:
+    pass
+
+
+class IReport:
+    pass
+
+
+class ICache:
+    pass
+
+
+class ITenant:
+    pass
+
+
+class IDashboard:
+    pass
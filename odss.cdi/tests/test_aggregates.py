@@ -0,0 +1,112 @@
+import random
+
+import pytest
+from odss.cdi import ServiceCollection
+from odss.cdi.aggregates import get_rank
+from odss.common import SERVICE_ID, SERVICE_PRIORITY
+
+from tests.interfaces import IDashboard, IPlugin
+from tests.utils import COMPONENTS_BUNDLE, get_service, start_bundles
+
+
+class Reference:
+    def __init__(self, service_id, priority=0):
+        self.properties = {SERVICE_ID: service_id, SERVICE_PRIORITY: priority}
+
+    def get_property(self, name, default=None):
+        return self.properties.get(name, default)
+
+
+class Plugin(IPlugin):
+    def __init__(self, name):
+        self.name = name
+
+
+def get_names(plugins):
+    return [plugin.name for plugin in plugins]
+
+
+def test_sorted_by_rank():
+    collection = ServiceCollection()
+    first = Reference(1, priority=5)
+    second = Reference(2)
+    third = Reference(3)
+    collection._add(first, "first")
+    collection._add(third, "third")
+    collection._add(second, "second")
+    collection._add(second, "duplicate")
+
+    # lower priority first, then older service
+    assert list(collection) == ["second", "third", "first"]
+    assert collection[-1] == "first"
+    assert len(collection) == 3
+
+    assert collection._remove(third) == "third"
+    assert list(collection) == ["second", "first"]
+
+
+def test_update_rank():
+    collection = ServiceCollection()
+    first = Reference(1)
+    second = Reference(2)
+    collection._add(first, "first")
+    collection._add(second, "second")
+
+    first.properties[SERVICE_PRIORITY] = 10
+    collection._update(first)
+    assert list(collection) == ["second", "first"]
+
+    collection._update(Reference(3))
+    assert list(collection) == ["second", "first"]
+
+    collection._clear()
+    assert not collection
+
+
+def test_many_services():
+    rng = random.Random(7)
+    collection = ServiceCollection()
+    references = {}
+    for service_id in rng.sample(range(1000), 300):
+        reference = Reference(service_id, priority=rng.randint(-3, 3))
+        references[reference] = f"service-{service_id}"
+        collection._add(reference, references[reference])
+    for reference in rng.sample(list(references), 100):
+        assert collection._remove(reference) == references.pop(reference)
+
+    expected = [references[ref] for ref in sorted(references, key=get_rank)]
+    assert list(collection) == expected
+    assert len(collection) == len(expected)
+    assert [collection[i] for i in range(len(expected))] == expected
+    assert collection[-1] == expected[-1]
+    assert collection[10:20] == expected[10:20]
+    assert list(reversed(collection)) == expected[::-1]
+    with pytest.raises(IndexError):
+        collection[len(expected)]
+
+
+async def test_injected_aggregate(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    # aggregate does not block validation
+    dashboard = get_service(ctx, IDashboard)
+    assert not dashboard.plugins
+
+    await ctx.register_service(IPlugin, Plugin("a"), {"enabled": "true"})
+    b = await ctx.register_service(
+        IPlugin, Plugin("b"), {"enabled": "true", SERVICE_PRIORITY: -1}
+    )
+    await ctx.register_service(IPlugin, Plugin("disabled"), {"enabled": "false"})
+    assert get_names(dashboard.plugins) == ["b", "a"]
+
+    await b.set_properties({"enabled": "true", SERVICE_PRIORITY: 100})
+    assert get_names(dashboard.plugins) == ["a", "b"]
+
+    await b.set_properties({"enabled": "false"})
+    assert get_names(dashboard.plugins) == ["a"]
+
+    c = await ctx.register_service(IPlugin, Plugin("c"), {"enabled": "true"})
+    assert get_names(dashboard.plugins) == ["a", "c"]
+    await c.unregister()
+    assert get_names(dashboard.plugins) == ["a"]
+    assert get_service(ctx, IDashboard) is dashboard
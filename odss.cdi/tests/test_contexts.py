@@ -0,0 +1,141 @@
+import pytest
+
+from odss.cdi import (
+    bind,
+    component,
+    factory,
+    instantiate,
+    invalidate,
+    lazy,
+    provides,
+    requires,
+    unbind,
+    validate,
+)
+from odss.cdi.contexts import get_factory_context
+from odss.common import get_class_name
+
+from tests.interfaces import ILogger, IPlugin, IReport, IStorage
+
+
+def get_plan(clazz):
+    return get_factory_context(clazz).get_injection_plan()
+
+
+def test_constructor_and_field_slots():
+    @component
+    @provides(IReport)
+    @requires("logger", ILogger, "(level=debug)")
+    class Report:
+        def __init__(self, storage: IStorage):
+            self.storage = storage
+
+    plan = get_plan(Report)
+    assert plan.provides == (get_class_name(IReport),)
+    [argument] = plan.arguments
+    assert argument.specification == get_class_name(IStorage)
+    assert argument.match({})
+    [field] = plan.fields
+    assert field.field == "logger"
+    assert field.specification == get_class_name(ILogger)
+    assert field.match({"level": "debug"})
+    assert not field.match({"level": "info"})
+    assert plan.binds == ()
+    assert not plan.lazy
+    assert plan.factory_pid is None
+
+
+def test_aggregate_requirement_is_optional():
+    @component
+    @requires("plugins", IPlugin, "(enabled=true)", aggregate=True)
+    class Manager:
+        pass
+
+    plan = get_plan(Manager)
+    # does not block validation: no mandatory slot
+    assert plan.arguments == () and plan.fields == ()
+    [slot] = plan.binds
+    assert slot.aggregate
+    assert slot.field == "plugins"
+    assert slot.specification == get_class_name(IPlugin)
+    assert slot.match({"enabled": "true"})
+    assert slot.bind is None and slot.unbind is None
+
+
+def test_bind_unbind_callbacks():
+    @component
+    class Manager:
+        @bind
+        def add_plugin(self, plugin: IPlugin):
+            pass
+
+        @unbind
+        def remove_plugin(self, plugin: IPlugin):
+            pass
+
+        @bind(get_class_name(ILogger), "(level=debug)")
+        def add_logger(self, logger):
+            pass
+
+    plan = get_plan(Manager)
+    slots = {slot.specification: slot for slot in plan.binds}
+    plugins = slots[get_class_name(IPlugin)]
+    assert plugins.bind is Manager.add_plugin
+    assert plugins.unbind is Manager.remove_plugin
+    assert not plugins.aggregate
+    loggers = slots[get_class_name(ILogger)]
+    assert loggers.bind is Manager.add_logger
+    assert loggers.unbind is None
+    assert loggers.match({"level": "debug"})
+    assert not loggers.match({})
+
+
+def test_callbacks_lazy_and_factory():
+    @component
+    @provides(IReport)
+    @factory("report")
+    @lazy(idle_timeout=5)
+    class Report:
+        @validate
+        def start(self, ctx):
+            pass
+
+        @invalidate
+        def stop(self, ctx):
+            pass
+
+    plan = get_plan(Report)
+    assert plan.validate is Report.start
+    assert plan.invalidate is Report.stop
+    assert plan.lazy
+    assert plan.idle_timeout == 5
+    assert plan.factory_pid == "report"
+
+
+def test_lazy_without_provides():
+    @component
+    @lazy
+    class Worker:
+        pass
+
+    # nothing calls get_service(): instantiated at once
+    assert not get_plan(Worker).lazy
+
+
+def test_plan_is_cached_until_changed():
+    @component
+    @instantiate("first")
+    class Report:
+        pass
+
+    plan = get_plan(Report)
+    assert get_plan(Report) is plan
+    requires("storage", IStorage)(Report)
+    changed = get_plan(Report)
+    assert changed is not plan
+    assert [slot.field for slot in changed.fields] == ["storage"]
+
+
+def test_invalid_factory_pid():
+    with pytest.raises(ValueError):
+        factory("")
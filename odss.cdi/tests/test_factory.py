@@ -0,0 +1,103 @@
+from odss.common import (
+    SERVICE_FACTORY_PID,
+    SERVICE_PID,
+    IConfigurationManagedFactory,
+)
+
+from tests.interfaces import IStorage, ITenant
+from tests.utils import COMPONENTS_BUNDLE, start_bundles, wait_for
+
+
+class Storage(IStorage):
+    pass
+
+
+def get_tenants(ctx):
+    return {
+        reference.get_property(SERVICE_PID): reference
+        for reference in ctx.get_service_references(ITenant)
+    }
+
+
+async def start_factory(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    reference = ctx.get_service_reference(
+        IConfigurationManagedFactory, {SERVICE_FACTORY_PID: "tenant"}
+    )
+    return ctx.get_service(reference)
+
+
+async def test_create_instances(framework):
+    ctx = framework.get_context()
+    managed = await start_factory(framework)
+    await ctx.register_service(IStorage, Storage())
+
+    await managed.updated("tenant.a", {"name": "a"})
+    await managed.updated("tenant.b", {"name": "b"})
+    await wait_for(lambda: len(get_tenants(ctx)) == 2)
+
+    tenants = get_tenants(ctx)
+    assert tenants["tenant.a"].get_property("name") == "a"
+    assert tenants["tenant.a"].get_property(SERVICE_FACTORY_PID) == "tenant"
+    service = ctx.get_service(tenants["tenant.b"])
+    assert service.storage is ctx.get_service(ctx.get_service_reference(IStorage))
+
+
+async def test_update_and_delete_instance(framework):
+    ctx = framework.get_context()
+    managed = await start_factory(framework)
+    await ctx.register_service(IStorage, Storage())
+    await managed.updated("tenant.a", {"name": "a"})
+    await wait_for(lambda: "tenant.a" in get_tenants(ctx))
+    service = ctx.get_service(get_tenants(ctx)["tenant.a"])
+
+    await managed.updated("tenant.a", {"name": "renamed"})
+    await wait_for(
+        lambda: get_tenants(ctx)["tenant.a"].get_property("name") == "renamed"
+    )
+    # changed properties do not recreate valid instance
+    assert ctx.get_service(get_tenants(ctx)["tenant.a"]) is service
+
+    await managed.deleted("tenant.a")
+    await wait_for(lambda: not get_tenants(ctx))
+
+
+async def test_removed_property(framework):
+    ctx = framework.get_context()
+    managed = await start_factory(framework)
+    await ctx.register_service(IStorage, Storage())
+    await managed.updated("tenant.a", {"name": "a", "region": "eu"})
+    await wait_for(lambda: "tenant.a" in get_tenants(ctx))
+
+    await managed.updated("tenant.a", {"name": "a"})
+    await wait_for(
+        lambda: "region" not in get_tenants(ctx)["tenant.a"].get_properties()
+    )
+    reference = get_tenants(ctx)["tenant.a"]
+    assert reference.get_property("name") == "a"
+    assert reference.get_property(SERVICE_FACTORY_PID) == "tenant"
+    assert reference.get_property(SERVICE_PID) == "tenant.a"
+
+
+async def test_instance_waits_for_dependency(framework):
+    ctx = framework.get_context()
+    managed = await start_factory(framework)
+    await managed.updated("tenant.a", {})
+    await wait_for(lambda: not managed.pending and not managed.tasks)
+    assert not get_tenants(ctx)
+
+    await ctx.register_service(IStorage, Storage())
+    assert list(get_tenants(ctx)) == ["tenant.a"]
+
+
+async def test_close_cancels_pending(framework):
+    ctx = framework.get_context()
+    managed = await start_factory(framework)
+    await ctx.register_service(IStorage, Storage())
+    await managed.updated("tenant.a", {})
+
+    bundle = framework.get_bundle_by_name(COMPONENTS_BUNDLE)
+    await bundle.stop()
+    assert not managed.tasks
+    assert not get_tenants(ctx)
@@ -0,0 +1,148 @@
+from tests.interfaces import ICache, IConsumer, ILogger, IPlugin, IReport, IStorage
+from tests.utils import COMPONENTS_BUNDLE, get_service, start_bundles, wait_for
+
+
+class Storage(IStorage):
+    pass
+
+
+class Logger(ILogger):
+    pass
+
+
+class Plugin(IPlugin):
+    pass
+
+
+async def test_validate_when_dependency_bound(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    assert ctx.get_service_reference(IConsumer) is None
+
+    storage = Storage()
+    await ctx.register_service(IStorage, storage)
+
+    consumer = get_service(ctx, IConsumer)
+    assert consumer.storage is storage
+    assert consumer.events == [("validate", storage)]
+
+
+async def test_bind_unbind(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    first = Plugin()
+    await ctx.register_service(IPlugin, first)
+    await ctx.register_service(IStorage, Storage())
+
+    consumer = get_service(ctx, IConsumer)
+    assert consumer.plugins == [first]
+
+    second = Plugin()
+    registration = await ctx.register_service(IPlugin, second)
+    assert consumer.plugins == [first, second]
+
+    await registration.unregister()
+    assert consumer.plugins == [first]
+    assert get_service(ctx, IConsumer) is consumer
+
+
+async def test_removed_before_validation(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+
+    registration = await ctx.register_service(IStorage, Storage())
+    await registration.unregister()
+    await ctx.register_service(ILogger, Logger())
+    # bound storage went away before logger came
+    assert ctx.get_service_reference(IReport) is None
+
+    storage = Storage()
+    await ctx.register_service(IStorage, storage)
+    assert get_service(ctx, IReport).storage is storage
+
+
+async def test_retry_failed_validation(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    broken = Storage()
+    broken.broken = True
+    registration = await ctx.register_service(IStorage, broken)
+    await ctx.register_service(ILogger, Logger())
+    assert ctx.get_service_reference(IReport) is None
+
+    await registration.unregister()
+    storage = Storage()
+    await ctx.register_service(IStorage, storage)
+    assert get_service(ctx, IReport).storage is storage
+
+
+async def test_removed_after_validation(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    storage = Storage()
+    registration = await ctx.register_service(IStorage, storage)
+    consumer = get_service(ctx, IConsumer)
+
+    await registration.unregister()
+    assert ctx.get_service_reference(IConsumer) is None
+    assert consumer.events == [("validate", storage), ("invalidate", storage)]
+    assert consumer.storage is None
+
+
+async def test_resolve_replacement(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    first = Storage()
+    second = Storage()
+    registration = await ctx.register_service(IStorage, first)
+    await ctx.register_service(IStorage, second)
+    consumer = get_service(ctx, IConsumer)
+    assert consumer.storage is first
+
+    await registration.unregister()
+    # constructor dependencies are not replaced: new instance is created
+    replaced = get_service(ctx, IConsumer)
+    assert replaced is not consumer
+    assert replaced.storage is second
+    assert replaced.events == [("validate", second)]
+
+
+async def test_stop_bundle(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    storage = Storage()
+    await ctx.register_service(IStorage, storage)
+    consumer = get_service(ctx, IConsumer)
+
+    bundle = framework.get_bundle_by_name(COMPONENTS_BUNDLE)
+    await bundle.stop()
+    assert ctx.get_service_reference(IConsumer) is None
+    assert consumer.events[-1] == ("invalidate", storage)
+    assert not ctx.get_service_reference(IStorage).get_using_bundles()
+
+
+async def test_lazy_callbacks_finish_before_invalidate(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    registration = await ctx.register_service(IStorage, Storage())
+
+    cache = get_service(ctx, ICache)
+    # validate of lazy instance is still pending
+    assert cache.events == []
+
+    await registration.unregister()
+    assert cache.events == ["validate", "invalidate"]
+
+
+async def test_lazy_callbacks_order(framework):
+    ctx = framework.get_context()
+    await start_bundles(framework, COMPONENTS_BUNDLE)
+    await ctx.register_service(IPlugin, Plugin())
+    await ctx.register_service(IStorage, Storage())
+
+    cache = get_service(ctx, ICache)
+    # async callbacks of lazy instance finish after get_service()
+    assert cache.events == []
+    await wait_for(lambda: len(cache.events) == 2)
+    # slower bind still ends before validate starts
+    assert cache.events == ["bind", "validate"]
@@ -0,0 +1,25 @@
+import asyncio
+
+COMPONENTS_BUNDLE = "tests.bundles.components"
+
+
+async def start_bundles(framework, *names):
+    for name in ("odss.cdi",) + names:
+        bundle = await framework.install_bundle(name)
+        await bundle.start()
+
+
+def get_service(ctx, specification):
+    reference = ctx.get_service_reference(specification)
+    if reference is None:
+        return None
+    return ctx.get_service(reference)
+
+
+async def wait_for(predicate, timeout=1):
+    """
+    Wait until predicate is true: configurations are applied in background
+    """
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
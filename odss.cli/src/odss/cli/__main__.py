@@ -86,9 +86,9 @@ def handle_args(args):
     if args.shell:
         config.bundles.extend(
             [
-                "odss.services.shell",
-                "odss.services.shell.commands",
-                "odss.services.terminal",
+                "odss.core.shell",
+                "odss.core.shell.commands",
+                "odss.core.shell.remote",
             ]
         )
     config.normalize()
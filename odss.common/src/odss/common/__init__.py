@@ -12,6 +12,7 @@ from .configadmin import (
 )
 from .consts import (
     ACTIVATOR_CLASS,
+    FACTORY_PID_SEPARATOR,
     FRAMEWORK_UUID,
     OBJECTCLASS,
     SERVICE_BUNDLE_ID,
@@ -27,10 +28,11 @@ from .core import (
     FrameworkEvent,
     IBundle,
     IBundleContext,
+    IServiceFactory,
     IServiceReference,
     IServiceTrackerListener,
     ServiceEvent,
 )
-from .shell import ShellCommands, ShellService, command
+from .shell import IShellStream, ShellCommands, ShellService, command
 from .trackers import ServiceTracker
 from .utils import get_class_name, get_classes_name
@@ -108,6 +108,18 @@ class IConfigurationStorage(metaclass=abc.ABCMeta):
         Return all pids in store
         """
 
+    @abc.abstractmethod
+    async def load_batch(self, pids: t.Iterable[str]) -> t.Dict[str, TProperties]:
+        """
+        Load properties of many pids at once
+        """
+
+    @abc.abstractmethod
+    async def find_pids(self, ldap_filter=None) -> t.Iterable[str]:
+        """
+        Return pids of properties matching the filter
+        """
+
 
 class IConfigurationDirectory(metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -156,7 +168,14 @@ class IConfigurationAdmin(metaclass=abc.ABCMeta):
         """
 
     @abc.abstractmethod
-    def list_configurations(self, ldap_filter=None) -> t.Iterable[IConfiguration]:
+    def get_factory_configuration(self, factory_pid: str, name: str):
+        """
+        Get an existing or create a new factory Configuration object
+        with PID derived from the name: <factory pid>~<name>.
+        """
+
+    @abc.abstractmethod
+    async def list_configurations(self, ldap_filter=None) -> t.Iterable[IConfiguration]:
         """
         List the current Configuration objects which match the filter."
         """
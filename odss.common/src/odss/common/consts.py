@@ -8,6 +8,8 @@ ACTIVATOR_CLASS = "Activator"
 
 SERVICE_PID = "service.pid"
 SERVICE_FACTORY_PID = "service.factoryPid"
+# PID of named factory configuration: <factory pid>~<name>
+FACTORY_PID_SEPARATOR = "~"
 
 SHELL_COMMAND_HANDLER = "__odss.command.handler__"
 SHELL_DEFAULT_NAMESPACE = "default"
@@ -157,6 +157,24 @@ class IServiceTrackerListener(metaclass=abc.ABCMeta):
         raise NotImplementedError()
 
 
+class IServiceFactory(metaclass=abc.ABCMeta):
+    """
+    Service registered as factory: registry asks it for the service object
+    on first get_service() of each bundle and releases it when bundle usage
+    drops to zero.
+    """
+
+    @abc.abstractmethod
+    def get_service(self, bundle: IBundle, reference: IServiceReference) -> t.Any:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def unget_service(
+        self, bundle: IBundle, reference: IServiceReference, service: t.Any
+    ) -> None:
+        raise NotImplementedError()
+
+
 BUNDLE_EVENTS = {
     1: "INSTALLED",
     2: "STARTED",
@@ -8,6 +8,11 @@ class IShellStream:
     def write_line(self, line: str):
         pass
 
+    async def drain(self):
+        """
+        Wait until written lines can be sent further (flow control)
+        """
+
 
 class ShellService(metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -32,6 +37,10 @@ class ShellService(metaclass=abc.ABCMeta):
     def get_all_commands(self):
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def complete(self, prefix: str) -> list[str]:
+        raise NotImplementedError()
+
     @abc.abstractmethod
     async def execute(self, cmd_line: str, stream: IShellStream):
         raise NotImplementedError()
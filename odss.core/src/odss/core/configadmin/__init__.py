@@ -0,0 +1,38 @@
+from odss.common import IConfigurationAdmin, IConfigurationStorage
+
+from .admin import Configuration, ConfigurationAdmin, ConfigurationDirectory
+from .sqlite import SqliteStorage
+from .storage import DEFAULT_FLUSH_INTERVAL, FileStorage
+
+DEFAULT_STORAGE_PATH = "~/.local/odss/configuration"
+DEFAULT_DATABASE_PATH = "~/.local/odss/configuration.db"
+
+
+class Activator:
+    async def start(self, ctx):
+        try:
+            props = ctx.get_property("odss.core.configadmin")
+        except KeyError:
+            props = {}
+
+        storage = props.get("storage", "file")
+        if storage == "sqlite":
+            self.storage = SqliteStorage(props.get("path", DEFAULT_DATABASE_PATH))
+        elif storage == "file":
+            self.storage = FileStorage(
+                props.get("path", DEFAULT_STORAGE_PATH),
+                float(props.get("flush_interval", DEFAULT_FLUSH_INTERVAL)),
+            )
+        else:
+            raise ValueError(f"Unknown configuration storage: {storage}")
+        await self.storage.open()
+        self.admin = ConfigurationAdmin(ctx, self.storage)
+        await self.admin.open()
+        await ctx.register_service(IConfigurationStorage, self.storage)
+        await ctx.register_service(IConfigurationAdmin, self.admin)
+
+    async def stop(self, ctx):
+        await self.admin.close()
+        self.admin = None
+        await self.storage.close()
+        self.storage = None
@@ -0,0 +1,254 @@
+import logging
+import typing as t
+import uuid
+
+from odss.common import (
+    FACTORY_PID_SEPARATOR,
+    SERVICE_FACTORY_PID,
+    SERVICE_PID,
+    IBundleContext,
+    IConfiguration,
+    IConfigurationAdmin,
+    IConfigurationDirectory,
+    IConfigurationManaged,
+    IConfigurationManagedFactory,
+    IConfigurationStorage,
+    IServiceTrackerListener,
+    ServiceTracker,
+    TProperties,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Configuration(IConfiguration):
+    def __init__(
+        self,
+        admin: "ConfigurationAdmin",
+        pid: str,
+        properties: TProperties | None,
+        storage: IConfigurationStorage,
+        factory_pid: str | None = None,
+    ) -> None:
+        self.__admin = admin
+        self.__pid = pid
+        self.__properties = properties
+        self.__storage = storage
+        self.__factory_pid = factory_pid
+        self.__location = None
+
+    def get_bundle_location(self) -> str:
+        return self.__location
+
+    def set_bundle_location(self, bundle_location: str) -> None:
+        self.__location = bundle_location
+
+    def get_factory_pid(self) -> str | None:
+        return self.__factory_pid
+
+    def get_pid(self) -> str:
+        return self.__pid
+
+    def get_properties(self) -> TProperties | None:
+        if self.__properties is None:
+            return None
+        return self.__properties.copy()
+
+    async def update(self, properties: TProperties | None = None) -> None:
+        if properties is None:
+            properties = self.__properties or {}
+        properties = dict(properties)
+        properties[SERVICE_PID] = self.__pid
+        if self.__factory_pid is not None:
+            properties[SERVICE_FACTORY_PID] = self.__factory_pid
+        self.__properties = properties
+        await self.__storage.store(self.__pid, properties)
+        await self.__admin.notify_updated(self)
+
+    async def remove(self) -> None:
+        await self.__storage.remove(self.__pid)
+        await self.__admin.directory.remove(self.__pid)
+        self.__properties = None
+        await self.__admin.notify_deleted(self)
+
+    async def reload(self):
+        self.__properties = await self.__storage.load(self.__pid)
+
+    def __repr__(self) -> str:
+        return f"Configuration(pid={self.__pid}, factory_pid={self.__factory_pid})"
+
+
+class ConfigurationDirectory(IConfigurationDirectory):
+    def __init__(self, admin: "ConfigurationAdmin") -> None:
+        self.admin = admin
+        self.configurations: dict[str, Configuration] = {}
+        self.factories: dict[str, dict[str, Configuration]] = {}
+
+    def get(self, pid: str) -> Configuration | None:
+        return self.configurations.get(pid)
+
+    def create(
+        self,
+        pid: str,
+        properties: TProperties | None,
+        storage: IConfigurationStorage,
+        factory_pid: str | None = None,
+    ) -> Configuration:
+        if pid in self.configurations:
+            raise KeyError(f"Configuration {pid} already exists")
+        configuration = Configuration(self.admin, pid, properties, storage, factory_pid)
+        self.configurations[pid] = configuration
+        if factory_pid is not None:
+            self.factories.setdefault(factory_pid, {})[pid] = configuration
+        return configuration
+
+    async def add(
+        self,
+        pid: str,
+        properties: TProperties | None,
+        storage: IConfigurationStorage,
+        factory_pid: str | None = None,
+    ) -> Configuration:
+        return self.create(pid, properties, storage, factory_pid)
+
+    def exists(self, pid: str) -> bool:
+        return pid in self.configurations
+
+    async def remove(self, pid: str) -> None:
+        configuration = self.configurations.pop(pid, None)
+        factory_pid = configuration and configuration.get_factory_pid()
+        if factory_pid is not None:
+            configurations = self.factories[factory_pid]
+            del configurations[pid]
+            if not configurations:
+                del self.factories[factory_pid]
+
+    def values(self) -> t.Iterable[Configuration]:
+        return self.configurations.values()
+
+    def get_factory_configurations(self, factory_pid: str) -> list[Configuration]:
+        return list(self.factories.get(factory_pid, {}).values())
+
+
+class ManagedTracker(ServiceTracker, IServiceTrackerListener):
+    """
+    Track managed services (by service.pid) or managed factories
+    (by service.factoryPid) and pass them their current configurations.
+    """
+
+    def __init__(self, ctx: IBundleContext, admin: "ConfigurationAdmin", factory):
+        interface = IConfigurationManagedFactory if factory else IConfigurationManaged
+        super().__init__(self, ctx, interface)
+        self.admin = admin
+        self.key = SERVICE_FACTORY_PID if factory else SERVICE_PID
+        self.managed: dict[str, list[t.Any]] = {}
+
+    def get_managed(self, pid: str) -> list[t.Any]:
+        return self.managed.get(pid, [])
+
+    async def on_adding_service(self, reference, service):
+        pid = reference.get_property(self.key, "")
+        if not pid:
+            return
+        self.managed.setdefault(pid, []).append(service)
+        await self.admin.deliver(self.key == SERVICE_FACTORY_PID, pid, service)
+
+    def on_modified_service(self, reference, service):
+        pass
+
+    def on_removed_service(self, reference, service):
+        pid = reference.get_property(self.key, "")
+        services = self.managed.get(pid)
+        if services and service in services:
+            services.remove(service)
+            if not services:
+                del self.managed[pid]
+
+
+class ConfigurationAdmin(IConfigurationAdmin):
+    def __init__(self, ctx: IBundleContext, storage: IConfigurationStorage) -> None:
+        self.storage = storage
+        self.directory = ConfigurationDirectory(self)
+        self.services = ManagedTracker(ctx, self, factory=False)
+        self.factories = ManagedTracker(ctx, self, factory=True)
+
+    async def open(self) -> None:
+        pids = await self.storage.get_pids()
+        for pid, properties in (await self.storage.load_batch(pids)).items():
+            await self.directory.add(
+                pid, properties, self.storage, properties.get(SERVICE_FACTORY_PID)
+            )
+        await self.services.open()
+        await self.factories.open()
+
+    async def close(self) -> None:
+        await self.factories.close()
+        await self.services.close()
+
+    def get_configuration(self, pid: str) -> Configuration:
+        configuration = self.directory.get(pid)
+        if configuration is None:
+            configuration = self.directory.create(pid, None, self.storage)
+        return configuration
+
+    def create_factory_configuration(self, factory_pid: str) -> Configuration:
+        pid = f"{factory_pid}.{uuid.uuid4().hex}"
+        return self.directory.create(pid, None, self.storage, factory_pid)
+
+    def get_factory_configuration(self, factory_pid: str, name: str) -> Configuration:
+        pid = f"{factory_pid}{FACTORY_PID_SEPARATOR}{name}"
+        configuration = self.directory.get(pid)
+        if configuration is None:
+            configuration = self.directory.create(pid, None, self.storage, factory_pid)
+        return configuration
+
+    async def list_configurations(self, ldap_filter=None) -> list[Configuration]:
+        # storage matches filter: it can use its indexes
+        result = []
+        for pid in await self.storage.find_pids(ldap_filter):
+            configuration = self.directory.get(pid)
+            if configuration is not None:
+                result.append(configuration)
+        return result
+
+    async def deliver(self, factory: bool, pid: str, service) -> None:
+        # pass current configurations to just registered managed service
+        if factory:
+            for configuration in self.directory.get_factory_configurations(pid):
+                properties = configuration.get_properties()
+                if properties is not None:
+                    await self.__call(
+                        service.updated, configuration.get_pid(), properties
+                    )
+        else:
+            configuration = self.directory.get(pid)
+            properties = configuration.get_properties() if configuration else None
+            if properties is not None:
+                await self.__call(service.updated, properties)
+
+    async def notify_updated(self, configuration: Configuration) -> None:
+        pid = configuration.get_pid()
+        factory_pid = configuration.get_factory_pid()
+        if factory_pid is not None:
+            for service in self.factories.get_managed(factory_pid):
+                properties = configuration.get_properties()
+                await self.__call(service.updated, pid, properties)
+        else:
+            for service in self.services.get_managed(pid):
+                await self.__call(service.updated, configuration.get_properties())
+
+    async def notify_deleted(self, configuration: Configuration) -> None:
+        pid = configuration.get_pid()
+        factory_pid = configuration.get_factory_pid()
+        if factory_pid is not None:
+            for service in self.factories.get_managed(factory_pid):
+                await self.__call(service.deleted, pid)
+        else:
+            for service in self.services.get_managed(pid):
+                await self.__call(service.updated, None)
+
+    async def __call(self, method, *args) -> None:
+        try:
+            await method(*args)
+        except Exception as ex:
+            logger.exception("Error updating configuration %s: %s", args[0], ex)
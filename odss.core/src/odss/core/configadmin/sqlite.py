@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import typing as t
+from pathlib import Path
+
+from odss.common import IConfigurationStorage, TProperties
+
+from ..loop import create_job
+from ..query import create_query, nodes
+
+logger = logging.getLogger(__name__)
+
+# keep below SQLITE_MAX_VARIABLE_NUMBER of old sqlite versions (999)
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configurations (
+    pid TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS properties (
+    pid TEXT NOT NULL REFERENCES configurations(pid) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value
+);
+CREATE INDEX IF NOT EXISTS properties_name_value ON properties(name, value);
+CREATE INDEX IF NOT EXISTS properties_pid ON properties(pid);
+"""
+
+SCALARS = (str, int, float, bool)
+
+
+def iter_rows(pid: str, properties: TProperties):
+    """
+    Row per scalar property and per scalar item of list property, property
+    of other type gets NULL value row: it is only present for filters.
+    """
+    for name, value in properties.items():
+        if isinstance(value, SCALARS):
+            yield pid, name, value
+        elif isinstance(value, (list, tuple)):
+            items = [item for item in value if isinstance(item, SCALARS)]
+            if not items:
+                yield pid, name, None
+            for item in items:
+                yield pid, name, item
+        else:
+            yield pid, name, None
+
+
+def to_number(value: str) -> int | float | None:
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return None
+
+
+def translate_query(node: nodes.Node) -> tuple[str, list, nodes.Node | None]:
+    """
+    Translate query to SQL condition on ``configurations.pid``.
+
+    Return (sql, params, rest): when rest is not None the condition selects
+    superset of matching configurations and rest has to be matched in memory.
+    """
+    if isinstance(node, nodes.AllNode):
+        return "1", [], None
+    if isinstance(node, nodes.NoneNode):
+        return "0", [], None
+    if isinstance(node, nodes.PresentNode):
+        return "pid IN (SELECT pid FROM properties WHERE name = ?)", [node.name], None
+    if isinstance(node, nodes.EqNode):
+        return (
+            "pid IN (SELECT pid FROM properties WHERE name = ? AND value = ?)",
+            [node.name, node.value],
+            None,
+        )
+    if isinstance(node, (nodes.LteNode, nodes.GteNode)):
+        operator = "<=" if isinstance(node, nodes.LteNode) else ">="
+        # compare numbers with numbers and text with text
+        value = to_number(node.value)
+        if value is None:
+            value, types = node.value, "'text'"
+        else:
+            types = "'integer', 'real'"
+        return (
+            "pid IN (SELECT pid FROM properties WHERE name = ? "
+            f"AND typeof(value) IN ({types}) AND value {operator} ?)",
+            [node.name, value],
+            None,
+        )
+    if isinstance(node, nodes.AndNode):
+        parts = [translate_query(item) for item in node.value]
+        rest = nodes.AndNode()
+        rest.value = [part[2] for part in parts if part[2] is not None]
+        return (
+            " AND ".join(f"({sql})" for sql, _, _ in parts) or "1",
+            [param for _, params, _ in parts for param in params],
+            (rest.value[0] if len(rest.value) == 1 else rest) if rest.value else None,
+        )
+    if isinstance(node, (nodes.OrNode, nodes.NotNode)):
+        parts = [translate_query(item) for item in node.value]
+        params = [param for _, params, _ in parts for param in params]
+        exact = all(part[2] is None for part in parts)
+        if isinstance(node, nodes.OrNode):
+            sql = " OR ".join(f"({sql})" for sql, _, _ in parts) or "0"
+            return sql, params, None if exact else node
+        if not exact:
+            # negation of superset is not superset of negation
+            return "1", [], node
+        sql = " AND ".join(f"({sql})" for sql, _, _ in parts) or "1"
+        return f"NOT ({sql})", params, None
+    return "1", [], node
+
+
+class SqliteStorage(IConfigurationStorage):
+    """
+    Configurations stored in SQLite database.
+
+    Properties are indexed by (name, value): equality, presence and range
+    filters are executed by SQLite, other filters are matched in memory on
+    rows preselected by translatable part of the filter. Range filter with
+    numeric value compares numeric properties, so unlike in memory matching
+    ``(port>=8000)`` selects ``{"port": 8080}``. Queries run in executor,
+    one at time.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(Path(path).expanduser())
+        self.connection: sqlite3.Connection | None = None
+        self.lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        await self._execute(self._open)
+
+    async def close(self) -> None:
+        if self.connection is not None:
+            await self._execute(self.connection.close)
+            self.connection = None
+
+    async def _execute(self, method, *args):
+        async with self.lock:
+            return await create_job(method, *args)
+
+    def _open(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(SCHEMA)
+        self.connection = connection
+
+    async def store(self, pid: str, properties: TProperties) -> None:
+        data = json.dumps(properties)
+        rows = list(iter_rows(pid, properties))
+        await self._execute(self._store, pid, data, rows)
+
+    def _store(self, pid: str, data: str, rows: list[tuple]) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO configurations(pid, data) VALUES (?, ?) "
+                "ON CONFLICT(pid) DO UPDATE SET data = excluded.data",
+                (pid, data),
+            )
+            self.connection.execute("DELETE FROM properties WHERE pid = ?", (pid,))
+            self.connection.executemany(
+                "INSERT INTO properties(pid, name, value) VALUES (?, ?, ?)", rows
+            )
+
+    async def load(self, pid: str) -> TProperties | None:
+        return (await self.load_batch([pid])).get(pid)
+
+    async def load_batch(self, pids: t.Iterable[str]) -> dict[str, TProperties]:
+        rows = await self._execute(self._load_batch, list(pids))
+        return {pid: json.loads(data) for pid, data in rows}
+
+    def _load_batch(self, pids: list[str]) -> list[tuple[str, str]]:
+        rows = []
+        for start in range(0, len(pids), BATCH_SIZE):
+            chunk = pids[start : start + BATCH_SIZE]
+            marks = ", ".join("?" * len(chunk))
+            rows.extend(
+                self.connection.execute(
+                    f"SELECT pid, data FROM configurations WHERE pid IN ({marks})",
+                    chunk,
+                )
+            )
+        return rows
+
+    async def find_pids(self, ldap_filter=None) -> list[str]:
+        query = create_query(ldap_filter)
+        sql, params, rest = translate_query(query)
+        if rest is None:
+            rows = await self._execute(
+                self._select, f"SELECT pid FROM configurations WHERE {sql}", params
+            )
+            return [pid for pid, in rows]
+
+        logger.debug("Match configurations in memory: %s", ldap_filter)
+        rows = await self._execute(
+            self._select, f"SELECT pid, data FROM configurations WHERE {sql}", params
+        )
+        return [pid for pid, data in rows if rest.match(json.loads(data))]
+
+    def _select(self, sql: str, params: list) -> list[tuple]:
+        return self.connection.execute(sql, params).fetchall()
+
+    async def remove(self, pid: str) -> None:
+        await self._execute(self._remove, pid)
+
+    def _remove(self, pid: str) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM configurations WHERE pid = ?", (pid,))
+
+    async def exists(self, pid: str) -> bool:
+        rows = await self._execute(
+            self._select, "SELECT 1 FROM configurations WHERE pid = ?", [pid]
+        )
+        return bool(rows)
+
+    async def get_pids(self) -> list[str]:
+        rows = await self._execute(self._select, "SELECT pid FROM configurations", [])
+        return [pid for pid, in rows]
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import os
+import typing as t
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+from odss.common import IConfigurationStorage, TProperties
+
+from ..loop import create_job
+from ..query import create_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+SUFFIX = ".json"
+
+
+class FileStorage(IConfigurationStorage):
+    """
+    One JSON file per PID with write-behind.
+
+    store() and remove() only update memory: changes are coalesced per PID
+    and written in batch, in executor, every flush_interval seconds. Every
+    file is written to temporary file, fsynced and renamed, directory is
+    fsynced once per batch.
+    """
+
+    def __init__(
+        self, path: str | Path, flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.flush_interval = flush_interval
+        self.pids: set[str] = set()
+        self.cache: dict[str, str] = {}
+        # pid -> serialized properties or None when removed
+        self.dirty: dict[str, str | None] = {}
+        self.lock = asyncio.Lock()
+        self.flusher: asyncio.Task | None = None
+
+    async def open(self) -> None:
+        self.pids = set(await create_job(self._scan))
+        self.flusher = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self.flusher is not None:
+            flusher, self.flusher = self.flusher, None
+            flusher.cancel()
+            # cancelled flusher returns after its write in executor is done
+            await asyncio.gather(flusher, return_exceptions=True)
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError as ex:
+                logger.error("Error writing configurations to %s: %s", self.path, ex)
+
+    async def flush(self) -> None:
+        async with self.lock:
+            if not self.dirty:
+                return
+            batch, self.dirty = self.dirty, {}
+            job = create_job(self._write, batch)
+            try:
+                await asyncio.shield(job)
+            except asyncio.CancelledError:
+                # write in executor can not be stopped: finish it under lock
+                await asyncio.wait([job])
+                if job.exception() is not None:
+                    self._restore(batch)
+                raise
+            except BaseException:
+                self._restore(batch)
+                raise
+
+    def _restore(self, batch: dict[str, str | None]) -> None:
+        # keep newer changes, retry not written ones with next flush
+        for pid, data in batch.items():
+            self.dirty.setdefault(pid, data)
+
+    async def store(self, pid: str, properties: TProperties) -> None:
+        data = json.dumps(properties)
+        self.pids.add(pid)
+        self.cache[pid] = data
+        self.dirty[pid] = data
+
+    async def load(self, pid: str) -> TProperties | None:
+        if pid not in self.pids:
+            return None
+        data = self.cache.get(pid)
+        if data is None:
+            data = await create_job(self._read, pid)
+            if data is None:
+                return None
+            self.cache[pid] = data
+        return json.loads(data)
+
+    async def load_batch(self, pids: t.Iterable[str]) -> dict[str, TProperties]:
+        pids = [pid for pid in pids if pid in self.pids]
+        missing = [pid for pid in pids if pid not in self.cache]
+        if missing:
+            for pid, data in zip(missing, await create_job(self._read_many, missing)):
+                if data is not None:
+                    self.cache[pid] = data
+        return {pid: json.loads(self.cache[pid]) for pid in pids if pid in self.cache}
+
+    async def find_pids(self, ldap_filter=None) -> list[str]:
+        query = create_query(ldap_filter)
+        batch = await self.load_batch(list(self.pids))
+        return [pid for pid, properties in batch.items() if query.match(properties)]
+
+    async def remove(self, pid: str) -> None:
+        if pid in self.pids:
+            self.pids.discard(pid)
+            self.cache.pop(pid, None)
+            self.dirty[pid] = None
+
+    async def exists(self, pid: str) -> bool:
+        return pid in self.pids
+
+    async def get_pids(self) -> t.Iterable[str]:
+        return list(self.pids)
+
+    def _get_file(self, pid: str) -> Path:
+        return self.path / (quote(pid, safe="") + SUFFIX)
+
+    def _scan(self) -> list[str]:
+        self.path.mkdir(parents=True, exist_ok=True)
+        return [
+            unquote(entry.name[: -len(SUFFIX)])
+            for entry in os.scandir(self.path)
+            if entry.is_file() and entry.name.endswith(SUFFIX)
+        ]
+
+    def _read(self, pid: str) -> str | None:
+        try:
+            return self._get_file(pid).read_text()
+        except FileNotFoundError:
+            return None
+
+    def _read_many(self, pids: list[str]) -> list[str | None]:
+        return [self._read(pid) for pid in pids]
+
+    def _write(self, batch: dict[str, str | None]) -> None:
+        for pid, data in batch.items():
+            file_path = self._get_file(pid)
+            if data is None:
+                file_path.unlink(missing_ok=True)
+                continue
+            tmp_path = file_path.with_name(file_path.name + ".tmp")
+            with open(tmp_path, "w") as fh:
+                fh.write(data)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, file_path)
+
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        logger.debug("Written %d configurations to %s", len(batch), self.path)
@@ -0,0 +1,34 @@
+from .sources import ConfigSources
+from .watcher import (
+    DEFAULT_DEBOUNCE,
+    DEFAULT_POLL_INTERVAL,
+    ConfigWatcher,
+    InotifyWatcher,
+    PollingWatcher,
+)
+
+DEFAULT_PATHS = ("~/.local/odss/config.d",)
+
+
+class Activator:
+    async def start(self, ctx):
+        try:
+            props = ctx.get_property("odss.core.configwatch")
+        except KeyError:
+            props = {}
+
+        paths = props.get("paths", DEFAULT_PATHS)
+        if isinstance(paths, str):
+            paths = [paths]
+        self.watcher = ConfigWatcher(
+            ctx,
+            paths,
+            debounce=float(props.get("debounce", DEFAULT_DEBOUNCE)),
+            backend=props.get("backend", "auto"),
+            poll_interval=float(props.get("poll_interval", DEFAULT_POLL_INTERVAL)),
+        )
+        await self.watcher.open()
+
+    async def stop(self, ctx):
+        await self.watcher.close()
+        self.watcher = None
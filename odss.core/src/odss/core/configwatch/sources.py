@@ -0,0 +1,158 @@
+import json
+import logging
+import typing as t
+from pathlib import Path
+
+from odss.common import TProperties
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = ".json"
+
+
+class ConfigSources:
+    """
+    Configurations read from watched paths.
+
+    Directory source: every ``<pid>.json`` file in directory holds properties
+    of one PID. File source: JSON object maps PIDs to their properties.
+    When PID is defined in many files, the last source (by order of paths,
+    then file name) wins.
+    """
+
+    def __init__(self, paths: t.Iterable[str | Path]) -> None:
+        self.paths = [Path(path).expanduser().absolute() for path in paths]
+        # file -> pid -> properties
+        self.files: dict[Path, dict[str, TProperties]] = {}
+        # pid -> files defining it
+        self.index: dict[str, set[Path]] = {}
+        # merged view: pid -> properties
+        self.properties: dict[str, TProperties] = {}
+
+    def directories(self) -> list[Path]:
+        """
+        Existing directories containing watched files
+        """
+        result = []
+        for path in self.paths:
+            directory = path if path.is_dir() else path.parent
+            if directory.is_dir() and directory not in result:
+                result.append(directory)
+        return result
+
+    def missing_parents(self) -> list[Path]:
+        """
+        Nearest existing parents of missing watched paths: they are watched
+        to see the paths created
+        """
+        result = []
+        for path in self.paths:
+            if path.exists():
+                continue
+            parent = path.parent
+            while not parent.is_dir() and parent != parent.parent:
+                parent = parent.parent
+            if parent.is_dir() and parent not in result:
+                result.append(parent)
+        return result
+
+    def get_order(self, file_path: Path) -> tuple[int, str] | None:
+        """
+        Sort key of file, None when file is not watched
+        """
+        for index, path in enumerate(self.paths):
+            if file_path == path:
+                return index, ""
+            if file_path.parent == path and file_path.suffix == SUFFIX:
+                return index, file_path.name
+        return None
+
+    def is_watched(self, file_path: Path) -> bool:
+        return self.get_order(file_path) is not None
+
+    def scan(self) -> list[Path]:
+        """
+        All existing watched files
+        """
+        result = []
+        for path in self.paths:
+            if path.is_dir():
+                result.extend(
+                    entry
+                    for entry in sorted(path.iterdir())
+                    if entry.suffix == SUFFIX and entry.is_file()
+                )
+            elif path.is_file():
+                result.append(path)
+        return result
+
+    def read(
+        self, files: t.Iterable[Path]
+    ) -> dict[Path, dict[str, TProperties] | None]:
+        """
+        Read configurations of files (blocking).
+
+        Removed file maps to None, file which can not be parsed is skipped:
+        it is probably written just now and its previous content is kept.
+        """
+        result = {}
+        for file_path in files:
+            order = self.get_order(file_path)
+            if order is None:
+                continue
+            try:
+                with open(file_path, "r") as fh:
+                    payload = json.load(fh)
+            except FileNotFoundError:
+                result[file_path] = None
+                continue
+            except (OSError, ValueError) as ex:
+                logger.warning("Skip configuration file %s: %s", file_path, ex)
+                continue
+            if not isinstance(payload, dict):
+                logger.warning("Skip configuration file %s: not an object", file_path)
+                continue
+            if order[1]:
+                result[file_path] = {file_path.stem: payload}
+            else:
+                result[file_path] = {
+                    pid: properties
+                    for pid, properties in payload.items()
+                    if isinstance(properties, dict)
+                }
+        return result
+
+    def apply(
+        self, contents: dict[Path, dict[str, TProperties] | None]
+    ) -> dict[str, TProperties | None]:
+        """
+        Update files content and return changed PIDs with their new
+        properties (None for PIDs no more defined)
+        """
+        affected = set()
+        for file_path, configurations in contents.items():
+            previous = self.files.pop(file_path, {})
+            for pid in previous:
+                self.index[pid].discard(file_path)
+            if configurations:
+                self.files[file_path] = configurations
+                for pid in configurations:
+                    self.index.setdefault(pid, set()).add(file_path)
+            affected.update(previous)
+            affected.update(configurations or ())
+
+        changes = {}
+        for pid in affected:
+            files = self.index.get(pid)
+            if files:
+                properties = self.files[max(files, key=self.get_order)][pid]
+            else:
+                self.index.pop(pid, None)
+                properties = None
+            if properties != self.properties.get(pid):
+                changes[pid] = properties
+                if properties is None:
+                    del self.properties[pid]
+                else:
+                    self.properties[pid] = properties
+        return changes
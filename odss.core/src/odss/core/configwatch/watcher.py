@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import typing as t
+from pathlib import Path
+
+from odss.common import (
+    FACTORY_PID_SEPARATOR,
+    SERVICE_FACTORY_PID,
+    SERVICE_PID,
+    IBundleContext,
+    IConfigurationAdmin,
+    IServiceTrackerListener,
+    ServiceTracker,
+    TProperties,
+)
+
+from ..loop import create_job
+from . import inotify
+from .sources import ConfigSources
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 0.1
+DEFAULT_POLL_INTERVAL = 1.0
+
+INOTIFY_MASK = (
+    inotify.IN_CLOSE_WRITE
+    | inotify.IN_MOVED_TO
+    | inotify.IN_MOVED_FROM
+    | inotify.IN_CREATE
+    | inotify.IN_DELETE
+    | inotify.IN_DELETE_SELF
+    | inotify.IN_MOVE_SELF
+    | inotify.IN_ONLYDIR
+)
+RESCAN_MASK = (
+    inotify.IN_Q_OVERFLOW
+    | inotify.IN_DELETE_SELF
+    | inotify.IN_MOVE_SELF
+    | inotify.IN_IGNORED
+)
+
+# callback argument: changed files or None when all files have to be rescanned
+TChangedCallback = t.Callable[[set[Path] | None], None]
+
+
+class InotifyWatcher:
+    """
+    Watch directories of sources with inotify, events are read in loop
+    """
+
+    def __init__(self, sources: ConfigSources, callback: TChangedCallback) -> None:
+        self.sources = sources
+        self.callback = callback
+        self.inotify = inotify.Inotify()
+        self.watches: dict[int, Path] = {}
+
+    async def start(self) -> None:
+        self._watch()
+        asyncio.get_running_loop().add_reader(self.inotify.fileno(), self._on_read)
+
+    async def stop(self) -> None:
+        asyncio.get_running_loop().remove_reader(self.inotify.fileno())
+        self.inotify.close()
+        self.watches.clear()
+
+    def _watch(self) -> bool:
+        """
+        Add watches of new directories, return True when any was added
+        """
+        watched = set(self.watches.values())
+        added = False
+        for directory in self.sources.directories() + self.sources.missing_parents():
+            if directory not in watched:
+                try:
+                    wd = self.inotify.add_watch(directory, INOTIFY_MASK)
+                except OSError as ex:
+                    logger.warning("Can not watch %s: %s", directory, ex)
+                    continue
+                self.watches[wd] = directory
+                watched.add(directory)
+                added = True
+        return added
+
+    def _on_read(self) -> None:
+        changed = set()
+        for wd, mask, name in self.inotify.read():
+            if mask & RESCAN_MASK:
+                logger.debug("Rescan configurations (inotify mask: %#x)", mask)
+                self.watches.pop(wd, None)
+                # watch again recreated directories
+                self._watch()
+                self.callback(None)
+                return
+            if mask & inotify.IN_ISDIR:
+                # created directory could be watched one or its parent: files
+                # written before its watch is added are found by rescan
+                if self._watch():
+                    self.callback(None)
+                    return
+                continue
+            directory = self.watches.get(wd)
+            if directory is not None and name:
+                changed.add(directory / name)
+        changed = {path for path in changed if self.sources.is_watched(path)}
+        if changed:
+            self.callback(changed)
+
+
+class PollingWatcher:
+    """
+    Compare stat of watched files every interval
+    """
+
+    def __init__(
+        self,
+        sources: ConfigSources,
+        callback: TChangedCallback,
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        self.sources = sources
+        self.callback = callback
+        self.interval = interval
+        self.snapshot: dict[Path, tuple[int, int, int]] = {}
+        self.runner: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self.snapshot = await create_job(self._stat)
+        self.runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            self.runner.cancel()
+            self.runner = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                snapshot = await create_job(self._stat)
+            except OSError as ex:
+                logger.error("Error scanning configurations: %s", ex)
+                continue
+            changed = {
+                path
+                for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+            if changed:
+                self.callback(changed)
+
+    def _stat(self) -> dict[Path, tuple[int, int, int]]:
+        result = {}
+        for path in self.sources.scan():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            result[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return result
+
+
+def create_watcher(
+    sources: ConfigSources,
+    callback: TChangedCallback,
+    backend: str = "auto",
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+):
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(sources, callback)
+        except OSError as ex:
+            if backend == "inotify":
+                raise
+            logger.info("Inotify not available (%s), polling configurations", ex)
+    elif backend != "poll":
+        raise ValueError(f"Unknown watcher backend: {backend}")
+    return PollingWatcher(sources, callback, poll_interval)
+
+
+class ConfigWatcher(IServiceTrackerListener):
+    """
+    Push configurations from watched files to ConfigurationAdmin.
+
+    Key ``<factory pid>~<alias>`` (file ``http-server~main.json``) holds
+    configuration of factory, the same alias always updates the same
+    factory configuration.
+
+    Changes are debounced: burst of writes ends with single reload of
+    changed files. Only PIDs with changed properties are updated (or
+    removed), so managed services of other PIDs are not touched.
+    """
+
+    def __init__(
+        self,
+        ctx: IBundleContext,
+        paths: t.Iterable[str | Path],
+        debounce: float = DEFAULT_DEBOUNCE,
+        backend: str = "auto",
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        self.sources = ConfigSources(paths)
+        self.debounce = debounce
+        self.watcher = create_watcher(
+            self.sources, self.changed, backend, poll_interval
+        )
+        self.tracker = ServiceTracker(self, ctx, IConfigurationAdmin)
+        self.admin: IConfigurationAdmin | None = None
+        self.pending: set[Path] | None = set()
+        self.timer: asyncio.TimerHandle | None = None
+        self.lock = asyncio.Lock()
+        self.tasks: set[asyncio.Task] = set()
+
+    async def open(self) -> None:
+        files = await create_job(self.sources.scan)
+        self.sources.apply(await create_job(self.sources.read, files))
+        await self.watcher.start()
+        await self.tracker.open()
+
+    async def close(self) -> None:
+        await self.watcher.stop()
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        # reload in progress ends before admin is released
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.tracker.close()
+
+    async def on_adding_service(self, reference, service):
+        if self.admin is None:
+            self.admin = service
+            async with self.lock:
+                await self.push(self.sources.properties)
+
+    def on_modified_service(self, reference, service):
+        pass
+
+    def on_removed_service(self, reference, service):
+        if self.admin is service:
+            self.admin = None
+
+    def changed(self, files: set[Path] | None) -> None:
+        if files is None or self.pending is None:
+            self.pending = None
+        else:
+            self.pending.update(files)
+        if self.timer is not None:
+            self.timer.cancel()
+        loop = asyncio.get_running_loop()
+        self.timer = loop.call_later(self.debounce, self._flush)
+
+    def _flush(self) -> None:
+        self.timer = None
+        files, self.pending = self.pending, set()
+        task = asyncio.create_task(self.reload(files))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def reload(self, files: set[Path] | None = None) -> dict[str, TProperties]:
+        """
+        Reload files (all when None) and push changed configurations
+        """
+        async with self.lock:
+            if files is None:
+                files = set(await create_job(self.sources.scan))
+                files.update(self.sources.files)
+            contents = await create_job(self.sources.read, files)
+            changes = self.sources.apply(contents)
+            logger.debug(
+                "Configuration files changed: %d, pids changed: %s",
+                len(files),
+                len(changes),
+            )
+            await self.push(changes)
+            return changes
+
+    async def push(self, changes: dict[str, TProperties | None]) -> None:
+        if self.admin is None:
+            return
+        for key, properties in changes.items():
+            configuration = self.get_configuration(key)
+            current = configuration.get_properties()
+            expected = dict(properties or {}, **{SERVICE_PID: configuration.get_pid()})
+            if configuration.get_factory_pid() is not None:
+                expected[SERVICE_FACTORY_PID] = configuration.get_factory_pid()
+            try:
+                if properties is None:
+                    if current is not None:
+                        await configuration.remove()
+                elif current != expected:
+                    await configuration.update(properties)
+            except Exception as ex:
+                logger.exception("Error pushing configuration %s: %s", key, ex)
+
+    def get_configuration(self, key: str):
+        # <factory pid>~<alias> is named configuration of factory
+        factory_pid, separator, alias = key.partition(FACTORY_PID_SEPARATOR)
+        if separator and factory_pid and alias:
+            return self.admin.get_factory_configuration(factory_pid, alias)
+        return self.admin.get_configuration(key)
@@ -90,6 +90,9 @@ class ServiceListeners:
         self.by_interface.setdefault(interface, []).append(info)
         return True
 
+    def get_listeners(self) -> list[tuple]:
+        return list(self.by_listeners.values())
+
     async def fire_event(self, event):
         properties = event.reference.get_properties()
         listeners = set()
@@ -148,6 +151,16 @@ class EventDispatcher:
     def remove_service_listener(self, listener):
         return self.services.remove_listener(listener)
 
+    def get_listeners(self) -> dict[str, list[tuple]]:
+        """
+        Listeners by kind as (listener, interface, query)
+        """
+        return {
+            "framework": [(item, None, None) for item in self.framework.listeners],
+            "bundle": [(item, None, None) for item in self.bundles.listeners],
+            "service": self.services.get_listeners(),
+        }
+
     async def fire_framework_event(self, event):
         await self.framework.fire_event(event)
 
@@ -104,6 +104,24 @@ class Framework(Bundle):
     def get_bundle_using_services(self, bundle):
         return self.__registry.get_bundle_using_services(bundle)
 
+    def get_listeners(self) -> dict[str, list[tuple]]:
+        return self.__events.get_listeners()
+
+    def get_metrics(self) -> dict[str, int]:
+        """
+        Sizes of framework structures
+        """
+        metrics = {
+            "bundles": len(self.__bundles),
+            "active bundles": sum(
+                1 for bundle in self.__bundles if bundle.state == Bundle.ACTIVE
+            ),
+        }
+        metrics.update(self.__registry.get_metrics())
+        for kind, listeners in self.get_listeners().items():
+            metrics[f"{kind} listeners"] = len(listeners)
+        return metrics
+
     async def register_service(self, bundle, target, service, properties=None):
         if bundle is None:
             raise BundleException("Invalid registration parameter: bundle")
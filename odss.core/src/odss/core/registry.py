@@ -8,6 +8,7 @@ from odss.common import (
     SERVICE_ID,
     SERVICE_PRIORITY,
     IBundle,
+    IServiceFactory,
     IServiceReference,
     ServiceEvent,
     get_class_name,
@@ -114,6 +115,7 @@ class ServiceRegistry:
         self._services_classes = {}
         self.__bundle_services = {}
         self.__bundle_unsing = {}
+        self.__factory_services = {}
         self.__framework = framework
 
     def register(self, bundle, clazz, service, properties):
@@ -165,6 +167,11 @@ class ServiceRegistry:
         bundle = reference.get_bundle()
         if bundle in self.__bundle_services:
             self.__bundle_services[bundle].remove(reference)
+
+        if isinstance(service, IServiceFactory):
+            services = self.__factory_services.pop(reference, {})
+            for using_bundle, using_service in services.items():
+                service.unget_service(using_bundle, reference, using_service)
         return service
 
     def find_service_references(self, clazz=None, query=None, only_first=False):
@@ -190,15 +197,37 @@ class ServiceRegistry:
             raise BundleException("Expected ServiceReference object")
 
         try:
-            using = self.__bundle_unsing.setdefault(bundle, {})
-            using.setdefault(reference, _Counter()).inc()
-
             service = self._services[reference]
-            reference.used_by(bundle)
-            return service
         except KeyError:
             raise BundleException(f"Service not found fo reference: {reference}")
 
+        if isinstance(service, IServiceFactory):
+            service = self.__get_factory_service(bundle, reference, service)
+
+        using = self.__bundle_unsing.setdefault(bundle, {})
+        using.setdefault(reference, _Counter()).inc()
+        reference.used_by(bundle)
+        return service
+
+    def __get_factory_service(self, bundle, reference, factory):
+        services = self.__factory_services.setdefault(reference, {})
+        try:
+            return services[bundle]
+        except KeyError:
+            pass
+        service = factory.get_service(bundle, reference)
+        services[bundle] = service
+        return service
+
+    def __unget_factory_service(self, bundle, reference):
+        services = self.__factory_services.get(reference)
+        if not services or bundle not in services:
+            return
+        service = services.pop(bundle)
+        if not services:
+            del self.__factory_services[reference]
+        self._services[reference].unget_service(bundle, reference, service)
+
     def unget_service(self, bundle: IBundle, reference: ServiceReference) -> None:
         if not isinstance(reference, ServiceReference):
             raise BundleException("Expected ServiceReference object")
@@ -210,6 +239,7 @@ class ServiceRegistry:
                 del using[reference]
                 if not using:
                     del self.__bundle_unsing[bundle]
+                self.__unget_factory_service(bundle, reference)
         except KeyError:
             pass
 
@@ -225,6 +255,16 @@ class ServiceRegistry:
         """
         return list(self.__bundle_unsing.get(bundle, {}).keys())[:]
 
+    def get_metrics(self) -> dict[str, int]:
+        return {
+            "services": len(self._services),
+            "service classes": len(self._services_classes),
+            "bundles with services": len(self.__bundle_services),
+            "bundles using services": len(self.__bundle_unsing),
+            "service factories in use": len(self.__factory_services),
+            "next service id": self._next_service_id,
+        }
+
 
 class ServiceRegistration:
     __slots__ = ["__framework", "__reference", "__properties"]
@@ -237,7 +277,10 @@ class ServiceRegistration:
     async def unregister(self):
         await self.__framework.unregister_service(self)
 
-    async def set_properties(self, properties):
+    async def set_properties(self, properties, replace=False):
+        """
+        Update properties, with replace other properties are removed
+        """
         for forbidden_key in [OBJECTCLASS, SERVICE_ID, SERVICE_BUNDLE_ID]:
             try:
                 del properties[forbidden_key]
@@ -245,6 +288,11 @@ class ServiceRegistration:
                 pass
 
         previous = self.__properties.copy()
+        if replace:
+            for key in previous.keys() - properties.keys():
+                if key not in (OBJECTCLASS, SERVICE_ID, SERVICE_BUNDLE_ID):
+                    del self.__properties[key]
+            self.__properties.setdefault(SERVICE_PRIORITY, 50)
         self.__properties.update(properties)
         self.__reference.check_sort_update()
 
@@ -0,0 +1,19 @@
+from odss.common import ShellCommands, ShellService
+
+from .basic import BasicCommands
+from .service import Command, CommandsTracker, Shell
+from .trie import Trie
+
+
+class Activator:
+    async def start(self, ctx):
+        self.shell = Shell()
+        self.tracker = CommandsTracker(ctx, self.shell)
+        await ctx.register_service(ShellService, self.shell)
+        await ctx.register_service(ShellCommands, BasicCommands(self.shell))
+        await self.tracker.open()
+
+    async def stop(self, ctx):
+        await self.tracker.close()
+        self.tracker = None
+        self.shell = None
@@ -0,0 +1,30 @@
+from odss.common import IShellStream, ShellCommands, command, make_ascii_table
+
+from .service import Shell
+
+
+class BasicCommands(ShellCommands):
+    def __init__(self, shell: Shell) -> None:
+        self.shell = shell
+
+    @command()
+    def help(self, stream: IShellStream, name: str | None = None):
+        """
+        Print commands or usage of the command
+        """
+        if name is not None:
+            try:
+                command = self.shell.get_command(name)
+            except KeyError as ex:
+                yield ex.args[0]
+                return
+            yield f"Usage: {command.get_usage()}"
+            yield command.description
+            return
+
+        for namespace in self.shell.get_namespaces():
+            rows = []
+            for command_name in self.shell.get_commands(namespace):
+                command = self.shell.get_command(f"{namespace}.{command_name}")
+                rows.append((command.get_usage(), command.description))
+            yield make_ascii_table(namespace, ["Command", "Description"], rows)
@@ -0,0 +1,131 @@
+"""
+Shell commands inspecting running framework
+"""
+
+from odss.common import (
+    OBJECTCLASS,
+    SERVICE_BUNDLE_ID,
+    SERVICE_ID,
+    SERVICE_PRIORITY,
+    IBundle,
+    IShellStream,
+    ShellCommands,
+    command,
+    get_class_name,
+    make_ascii_table,
+)
+
+from ..query import nodes
+
+BUNDLE_STATES = {
+    IBundle.UNINSTALLED: "UNINSTALLED",
+    IBundle.INSTALLED: "INSTALLED",
+    IBundle.RESOLVED: "RESOLVED",
+    IBundle.STARTING: "STARTING",
+    IBundle.STOPPING: "STOPPING",
+    IBundle.ACTIVE: "ACTIVE",
+}
+
+QUERY_OPERATORS = {
+    nodes.EqNode: "=",
+    nodes.LteNode: "<=",
+    nodes.GteNode: ">=",
+    nodes.ApproxNode: "~=",
+}
+
+LOGIC_OPERATORS = {nodes.AndNode: "&", nodes.OrNode: "|", nodes.NotNode: "!"}
+
+
+def format_query(query) -> str:
+    if query is None or isinstance(query, nodes.AllNode):
+        return ""
+    if isinstance(query, nodes.NoneNode):
+        return "(!(*))"
+    if isinstance(query, nodes.PresentNode):
+        return f"({query.name}=*)"
+    if isinstance(query, nodes.SubstringNode):
+        value = query.value.pattern[1:-1].replace(".*?", "*")
+        return f"({query.name}={value})"
+    operator = QUERY_OPERATORS.get(type(query))
+    if operator is not None:
+        return f"({query.name}{operator}{query.value})"
+    operator = LOGIC_OPERATORS.get(type(query))
+    if operator is not None:
+        return f"({operator}{''.join(format_query(item) for item in query.value)})"
+    return repr(query)
+
+
+class FrameworkCommands(ShellCommands):
+    def __init__(self, ctx) -> None:
+        self.ctx = ctx
+        self.framework = ctx.get_framework()
+
+    @command()
+    def bundles(self, stream: IShellStream):
+        """
+        List installed bundles
+        """
+        rows = [
+            (
+                bundle.id,
+                bundle.name,
+                BUNDLE_STATES.get(bundle.state, bundle.state),
+                "" if bundle.start_level is None else bundle.start_level,
+            )
+            for bundle in self.framework.get_bundles()
+        ]
+        return make_ascii_table("Bundles", ["ID", "Name", "State", "Level"], rows)
+
+    @command()
+    def services(self, stream: IShellStream, interface: str | None = None):
+        """
+        List registered services, optionally of the interface
+        """
+        rows = []
+        for reference in self.framework.find_service_references(interface):
+            rows.append(
+                (
+                    reference.get_property(SERVICE_ID),
+                    ", ".join(reference.get_property(OBJECTCLASS)),
+                    reference.get_property(SERVICE_BUNDLE_ID),
+                    reference.get_property(SERVICE_PRIORITY),
+                    len(reference.get_using_bundles()),
+                )
+            )
+        headers = ["ID", "Classes", "Bundle", "Priority", "Users"]
+        return make_ascii_table("Services", headers, rows)
+
+    @command()
+    def listeners(self, stream: IShellStream):
+        """
+        List framework, bundle and service listeners
+        """
+        rows = []
+        for kind, listeners in self.framework.get_listeners().items():
+            for listener, interface, query in listeners:
+                rows.append(
+                    (
+                        kind,
+                        get_class_name(type(listener)),
+                        interface or "",
+                        format_query(query),
+                    )
+                )
+        headers = ["Kind", "Listener", "Interface", "Query"]
+        return make_ascii_table("Listeners", headers, rows)
+
+    @command()
+    def metrics(self, stream: IShellStream):
+        """
+        Print sizes of framework registries
+        """
+        rows = list(self.framework.get_metrics().items())
+        return make_ascii_table("Metrics", ["Name", "Value"], rows)
+
+
+class Activator:
+    async def start(self, ctx):
+        await ctx.register_service(ShellCommands, FrameworkCommands(ctx))
+
+    async def stop(self, ctx):
+        pass
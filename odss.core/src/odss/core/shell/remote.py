@@ -0,0 +1,250 @@
+"""
+Shell available over Unix domain socket or localhost TCP port.
+
+Line protocol: client sends command line, server streams output lines and
+ends every response with the prompt. ``exit`` closes the session.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import stat
+from pathlib import Path
+
+from odss.common import (
+    IServiceTrackerListener,
+    IShellStream,
+    ServiceTracker,
+    ShellService,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "~/.local/odss/shell.sock"
+DEFAULT_MAX_SESSIONS = 32
+# output buffered for slow client before command is paused
+DEFAULT_WRITE_BUFFER = 64 * 1024
+PROMPT = "odss> "
+EXIT_COMMANDS = ("exit", "quit")
+SESSION_STOP_TIMEOUT = 1
+
+
+def get_file_id(path: Path) -> tuple[int, int] | None:
+    try:
+        info = path.stat()
+    except FileNotFoundError:
+        return None
+    return info.st_dev, info.st_ino
+
+
+def remove_stale_socket(path: Path) -> None:
+    """
+    Remove socket file left by crashed shell: nobody listens on it.
+    Socket of running shell is kept, so bind fails on it.
+    """
+    if not path.is_socket():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except ConnectionRefusedError:
+            logger.info("Remove stale shell socket: %s", path)
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def bind_unix_socket(path: Path) -> socket.socket:
+    """
+    Bind socket accessible only by owner. Mode is set before the socket
+    listens, connections are refused till then.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(str(path))
+        os.chmod(path, 0o600)
+        mode = os.stat(path).st_mode
+        if not stat.S_ISSOCK(mode) or stat.S_IMODE(mode) != 0o600:
+            raise PermissionError(f"Can not restrict access to socket: {path}")
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class RemoteStream(IShellStream):
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+
+    def write_line(self, line: str):
+        self.writer.write(line.encode() + b"\n")
+
+    def write(self, text: str):
+        self.writer.write(text.encode())
+
+    async def drain(self):
+        await self.writer.drain()
+
+
+class RemoteShell(IServiceTrackerListener):
+    """
+    Every connection is served by its own task; commands of the session
+    are executed one by one, output is drained after every chunk, so slow
+    client pauses its command instead of buffering its whole output.
+    """
+
+    def __init__(
+        self,
+        ctx,
+        path: str | None = None,
+        host: str = "127.0.0.1",
+        port: int | None = None,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        write_buffer: int = DEFAULT_WRITE_BUFFER,
+    ) -> None:
+        if port is None and path is None:
+            path = DEFAULT_SOCKET_PATH
+        if port is not None and not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"Remote shell can listen only on loopback: {host}")
+        self.path = Path(path).expanduser() if port is None else None
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.write_buffer = write_buffer
+        self.tracker = ServiceTracker(self, ctx, ShellService)
+        self.shell: ShellService | None = None
+        self.server: asyncio.AbstractServer | None = None
+        # session task -> its writer
+        self.sessions: dict[asyncio.Task, asyncio.StreamWriter] = {}
+        # (st_dev, st_ino) of bound socket: removed on close if still the same
+        self.socket_id: tuple[int, int] | None = None
+
+    def get_address(self) -> str:
+        if self.path is not None:
+            return f"unix:{self.path}"
+        return f"{self.host}:{self.port}"
+
+    async def open(self) -> None:
+        await self.tracker.open()
+        if self.path is not None:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            remove_stale_socket(self.path)
+            sock = bind_unix_socket(self.path)
+            self.socket_id = get_file_id(self.path)
+            self.server = await asyncio.start_unix_server(self.handle, sock=sock)
+        else:
+            self.server = await asyncio.start_server(
+                self.handle, host=self.host, port=self.port
+            )
+            if not self.port:
+                self.port = self.server.sockets[0].getsockname()[1]
+        logger.info("Remote shell listen on %s", self.get_address())
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            # lost connection ends session: reading gets EOF, drain raises
+            for writer in self.sessions.values():
+                writer.transport.abort()
+            if self.sessions:
+                await asyncio.wait(list(self.sessions), timeout=SESSION_STOP_TIMEOUT)
+            for session in self.sessions:
+                session.cancel()
+            await self.server.wait_closed()
+            self.server = None
+            self._remove_socket()
+        await self.tracker.close()
+
+    def _remove_socket(self) -> None:
+        socket_id, self.socket_id = self.socket_id, None
+        # path could be taken over by socket of the next shell
+        if socket_id is not None and get_file_id(self.path) == socket_id:
+            self.path.unlink(missing_ok=True)
+
+    def on_adding_service(self, reference, service):
+        if self.shell is None:
+            self.shell = service
+
+    def on_modified_service(self, reference, service):
+        pass
+
+    def on_removed_service(self, reference, service):
+        if self.shell is service:
+            services = self.tracker.get_services()
+            self.shell = next((item for item in services if item is not service), None)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        stream = RemoteStream(writer)
+        if len(self.sessions) >= self.max_sessions:
+            stream.write_line("Too many sessions")
+            await self.close_writer(writer)
+            return
+
+        session = asyncio.current_task()
+        self.sessions[session] = writer
+        try:
+            await self.run_session(reader, stream)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions.pop(session, None)
+            await self.close_writer(writer)
+
+    async def run_session(self, reader: asyncio.StreamReader, stream: RemoteStream):
+        stream.write(PROMPT)
+        await stream.drain()
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # line over the reader limit
+                stream.write_line("Line too long")
+                stream.write(PROMPT)
+                await stream.drain()
+                continue
+            if not line:
+                return
+            cmd_line = line.decode(errors="replace").strip()
+            if cmd_line in EXIT_COMMANDS:
+                return
+            if cmd_line:
+                if self.shell is None:
+                    stream.write_line("Shell service not available")
+                else:
+                    await self.shell.execute(cmd_line, stream)
+            stream.write(PROMPT)
+            await stream.drain()
+
+    async def close_writer(self, writer: asyncio.StreamWriter) -> None:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class Activator:
+    async def start(self, ctx):
+        try:
+            props = ctx.get_property("odss.core.shell.remote")
+        except KeyError:
+            props = {}
+
+        port = props.get("port")
+        self.remote = RemoteShell(
+            ctx,
+            path=props.get("path"),
+            host=props.get("host", "127.0.0.1"),
+            port=int(port) if port is not None else None,
+            max_sessions=int(props.get("max_sessions", DEFAULT_MAX_SESSIONS)),
+        )
+        await self.remote.open()
+
+    async def stop(self, ctx):
+        await self.remote.close()
+        self.remote = None
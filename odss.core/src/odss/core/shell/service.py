@@ -0,0 +1,241 @@
+import dataclasses as dts
+import inspect
+import logging
+import shlex
+import typing as t
+
+from odss.common import (
+    SHELL_COMMAND_HANDLER,
+    SHELL_DEFAULT_NAMESPACE,
+    IBundleContext,
+    IServiceTrackerListener,
+    IShellStream,
+    ServiceTracker,
+    ShellCommands,
+    ShellService,
+)
+
+from .trie import Trie
+
+logger = logging.getLogger(__name__)
+
+
+@dts.dataclass(frozen=True, slots=True)
+class Command:
+    namespace: str
+    name: str
+    handler: t.Callable
+    description: str = ""
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.namespace}.{self.name}"
+
+    def get_usage(self) -> str:
+        params = list(inspect.signature(self.handler).parameters.values())[1:]
+        usage = [self.name]
+        for param in params:
+            if param.kind == param.VAR_POSITIONAL:
+                usage.append(f"[{param.name}...]")
+            elif param.kind == param.VAR_KEYWORD:
+                usage.append(f"[{param.name}=...]")
+            elif param.default is not param.empty:
+                usage.append(f"[{param.name}={param.default}]")
+            else:
+                usage.append(f"<{param.name}>")
+        return " ".join(usage)
+
+
+def get_description(handler: t.Callable) -> str:
+    doc = inspect.getdoc(handler)
+    return doc.splitlines()[0] if doc else ""
+
+
+def parse_arguments(tokens: list[str]) -> tuple[list[str], dict[str, str]]:
+    args = []
+    kwargs = {}
+    for token in tokens:
+        name, sep, value = token.partition("=")
+        if sep and name.isidentifier():
+            kwargs[name] = value
+        else:
+            args.append(token)
+    return args, kwargs
+
+
+class Shell(ShellService):
+    """
+    Commands are indexed twice in prefix trees: by qualified name
+    (``namespace.name``) and by name. Unqualified name resolves to command
+    of default namespace or to the only command with that name.
+
+    Handler is called with the stream and arguments of command line
+    (``name=value`` tokens are passed as keyword arguments). It can write
+    to the stream itself or return output: string, (async) iterable or
+    awaitable of them; every item is written as soon as it is produced.
+    """
+
+    def __init__(self) -> None:
+        # qualified name -> Command
+        self.commands = Trie()
+        # name -> namespace -> Command
+        self.names = Trie()
+        # namespace -> number of commands
+        self.namespaces: dict[str, int] = {}
+
+    def register_command(
+        self, name: str, handler: t.Callable, namespace: str | None = None
+    ) -> bool:
+        namespace = namespace or SHELL_DEFAULT_NAMESPACE
+        if not name or "." in name or " " in name:
+            raise ValueError(f"Incorrect command name: {name!r}")
+        command = Command(namespace, name, handler, get_description(handler))
+        if not self.commands.insert(command.qualified_name, command):
+            logger.warning("Command already registered: %s", command.qualified_name)
+            return False
+        by_namespace = self.names.get(name)
+        if by_namespace is None:
+            by_namespace = {}
+            self.names.insert(name, by_namespace)
+        by_namespace[namespace] = command
+        self.namespaces[namespace] = self.namespaces.get(namespace, 0) + 1
+        return True
+
+    def unregister_command(self, name: str, namespace: str | None = None) -> bool:
+        namespace = namespace or SHELL_DEFAULT_NAMESPACE
+        try:
+            self.commands.remove(f"{namespace}.{name}")
+        except KeyError:
+            return False
+        by_namespace = self.names.get(name)
+        del by_namespace[namespace]
+        if not by_namespace:
+            self.names.remove(name)
+        self.namespaces[namespace] -= 1
+        if not self.namespaces[namespace]:
+            del self.namespaces[namespace]
+        return True
+
+    def get_namespaces(self) -> list[str]:
+        return sorted(self.namespaces)
+
+    def get_commands(self, namespace: str | None = None) -> list[str]:
+        prefix = (namespace or SHELL_DEFAULT_NAMESPACE) + "."
+        return [command.name for _, command in self.commands.items(prefix)]
+
+    def get_all_commands(self) -> list[Command]:
+        return [command for _, command in self.commands.items()]
+
+    def get_command(self, name: str) -> Command:
+        """
+        Find command by qualified or unqualified name, raise KeyError
+        """
+        if "." in name:
+            command = self.commands.get(name)
+            if command is None:
+                raise KeyError(f"Unknown command: {name}")
+            return command
+
+        by_namespace = self.names.get(name)
+        if not by_namespace:
+            raise KeyError(f"Unknown command: {name}")
+        if SHELL_DEFAULT_NAMESPACE in by_namespace:
+            return by_namespace[SHELL_DEFAULT_NAMESPACE]
+        if len(by_namespace) > 1:
+            names = ", ".join(sorted(f"{ns}.{name}" for ns in by_namespace))
+            raise KeyError(f"Ambiguous command {name}: {names}")
+        return next(iter(by_namespace.values()))
+
+    def complete(self, prefix: str) -> list[str]:
+        """
+        Command names (unqualified and qualified) starting with prefix
+        """
+        result = self.names.keys(prefix)
+        result.extend(self.commands.keys(prefix))
+        return result
+
+    async def execute(self, cmd_line: str, stream: IShellStream) -> bool:
+        try:
+            tokens = shlex.split(cmd_line)
+        except ValueError as ex:
+            stream.write_line(f"Syntax error: {ex}")
+            return False
+        if not tokens:
+            return True
+
+        try:
+            command = self.get_command(tokens[0])
+        except KeyError as ex:
+            stream.write_line(ex.args[0])
+            return False
+
+        args, kwargs = parse_arguments(tokens[1:])
+        try:
+            inspect.signature(command.handler).bind(stream, *args, **kwargs)
+        except TypeError as ex:
+            stream.write_line(f"{ex}. Usage: {command.get_usage()}")
+            return False
+
+        try:
+            result = command.handler(stream, *args, **kwargs)
+            await self.write_output(result, stream)
+            await stream.drain()
+        except ConnectionError:
+            # stream of disconnected client
+            raise
+        except Exception as ex:
+            logger.exception("Error executing command: %s", cmd_line)
+            stream.write_line(f"Error executing {command.qualified_name}: {ex!r}")
+            await stream.drain()
+            return False
+        return True
+
+    async def write_output(self, result, stream: IShellStream) -> None:
+        if inspect.isawaitable(result):
+            result = await result
+        if result is None:
+            return
+        if isinstance(result, str):
+            await self.write_lines(result, stream)
+        elif hasattr(result, "__aiter__"):
+            async for item in result:
+                await self.write_lines(item, stream)
+        elif hasattr(result, "__iter__"):
+            for item in result:
+                await self.write_lines(item, stream)
+        else:
+            await self.write_lines(result, stream)
+
+    async def write_lines(self, item, stream: IShellStream) -> None:
+        for line in str(item).splitlines() or [""]:
+            stream.write_line(line)
+        await stream.drain()
+
+
+class CommandsTracker(ServiceTracker, IServiceTrackerListener):
+    """
+    Register in shell methods marked by @command of ShellCommands services
+    """
+
+    def __init__(self, ctx: IBundleContext, shell: Shell) -> None:
+        super().__init__(self, ctx, ShellCommands)
+        self.shell = shell
+        # reference -> registered (name, namespace)
+        self.registered: dict[t.Any, list[tuple[str, str | None]]] = {}
+
+    def on_adding_service(self, reference, service):
+        registered = self.registered.setdefault(reference, [])
+        for name, member in inspect.getmembers(type(service), callable):
+            attrs = getattr(member, SHELL_COMMAND_HANDLER, None)
+            if attrs is None:
+                continue
+            handler = getattr(service, name)
+            if self.shell.register_command(attrs["name"], handler, attrs["namespace"]):
+                registered.append((attrs["name"], attrs["namespace"]))
+
+    def on_modified_service(self, reference, service):
+        pass
+
+    def on_removed_service(self, reference, service):
+        for name, namespace in self.registered.pop(reference, []):
+            self.shell.unregister_command(name, namespace)
@@ -0,0 +1,98 @@
+import typing as t
+
+
+class TrieNode:
+    __slots__ = ("children", "value", "has_value")
+
+    def __init__(self) -> None:
+        self.children: dict[str, "TrieNode"] = {}
+        self.value: t.Any = None
+        self.has_value = False
+
+
+class Trie:
+    """
+    Prefix tree: lookup is O(length of key), completion walks only
+    the subtree of the prefix.
+    """
+
+    def __init__(self) -> None:
+        self.root = TrieNode()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key: str) -> bool:
+        node = self._find(key)
+        return node is not None and node.has_value
+
+    def _find(self, key: str) -> TrieNode | None:
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def get(self, key: str, default: t.Any = None) -> t.Any:
+        node = self._find(key)
+        if node is None or not node.has_value:
+            return default
+        return node.value
+
+    def insert(self, key: str, value: t.Any) -> bool:
+        """
+        Insert value, return False when key already exists
+        """
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, TrieNode())
+        if node.has_value:
+            return False
+        node.value = value
+        node.has_value = True
+        self.size += 1
+        return True
+
+    def remove(self, key: str) -> t.Any:
+        """
+        Remove key and prune empty branch, raise KeyError when missing
+        """
+        path = [self.root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                raise KeyError(key)
+            path.append(node)
+        node = path[-1]
+        if not node.has_value:
+            raise KeyError(key)
+        value = node.value
+        node.value = None
+        node.has_value = False
+        self.size -= 1
+        for char, parent in zip(reversed(key), reversed(path[:-1])):
+            child = parent.children[char]
+            if child.has_value or child.children:
+                break
+            del parent.children[char]
+        return value
+
+    def items(self, prefix: str = "") -> t.Iterator[tuple[str, t.Any]]:
+        """
+        Sorted items with keys starting with prefix
+        """
+        node = self._find(prefix)
+        if node is None:
+            return
+        stack = [(prefix, node)]
+        while stack:
+            key, node = stack.pop()
+            if node.has_value:
+                yield key, node.value
+            for char in sorted(node.children, reverse=True):
+                stack.append((key + char, node.children[char]))
+
+    def keys(self, prefix: str = "") -> list[str]:
+        return [key for key, _ in self.items(prefix)]
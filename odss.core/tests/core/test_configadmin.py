@@ -0,0 +1,217 @@
+import asyncio
+import json
+import threading
+import time
+
+from odss.common import (
+    SERVICE_FACTORY_PID,
+    SERVICE_PID,
+    IConfigurationManaged,
+    IConfigurationManagedFactory,
+)
+
+from odss.core.configadmin import ConfigurationAdmin, FileStorage, SqliteStorage
+
+
+class Managed(IConfigurationManaged):
+    def __init__(self):
+        self.updates = []
+
+    async def updated(self, properties):
+        self.updates.append(properties)
+
+
+class ManagedFactory(IConfigurationManagedFactory):
+    def __init__(self):
+        self.instances = {}
+
+    async def updated(self, pid, properties):
+        self.instances[pid] = properties
+
+    async def deleted(self, pid):
+        del self.instances[pid]
+
+
+async def test_file_storage_write_behind(tmp_path):
+    storage = FileStorage(tmp_path, flush_interval=60)
+    await storage.open()
+
+    await storage.store("app", {"debug": True})
+    await storage.store("app", {"debug": False})
+    await storage.store("http/server", {"port": 8080})
+    assert await storage.load("app") == {"debug": False}
+    assert not list(tmp_path.iterdir())
+
+    await storage.flush()
+    assert json.loads((tmp_path / "app.json").read_text()) == {"debug": False}
+    assert (tmp_path / "http%2Fserver.json").exists()
+
+    await storage.remove("app")
+    await storage.close()
+    assert not (tmp_path / "app.json").exists()
+
+    storage = FileStorage(tmp_path)
+    await storage.open()
+    assert await storage.get_pids() == ["http/server"]
+    assert await storage.load("http/server") == {"port": 8080}
+    await storage.close()
+
+
+class SlowStorage(FileStorage):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writing = threading.Event()
+        self.writes = []
+
+    def _write(self, batch):
+        self.writing.set()
+        self.writes.append(("start", dict(batch)))
+        time.sleep(0.05)
+        super()._write(batch)
+        self.writes.append(("end", dict(batch)))
+
+
+async def test_file_storage_close_during_write(tmp_path):
+    storage = SlowStorage(tmp_path, flush_interval=0.01)
+    await storage.open()
+    await storage.store("app", {"debug": True})
+    while not storage.writing.is_set():
+        await asyncio.sleep(0.01)
+    await storage.store("app", {"debug": False})
+
+    await storage.close()
+    # write of flusher ends before the final one starts
+    assert [kind for kind, _ in storage.writes] == ["start", "end", "start", "end"]
+    assert json.loads((tmp_path / "app.json").read_text()) == {"debug": False}
+    assert not (tmp_path / "app.json.tmp").exists()
+
+
+async def test_managed_service(framework, tmp_path):
+    ctx = framework.get_context()
+    storage = FileStorage(tmp_path)
+    await storage.open()
+    admin = ConfigurationAdmin(ctx, storage)
+    await admin.open()
+
+    configuration = admin.get_configuration("app")
+    await configuration.update({"debug": True})
+
+    managed = Managed()
+    await ctx.register_service(IConfigurationManaged, managed, {SERVICE_PID: "app"})
+    assert managed.updates == [{"debug": True, SERVICE_PID: "app"}]
+
+    await configuration.update({"debug": False, "mode": "prod"})
+    assert managed.updates[-1]["debug"] is False
+    assert await admin.list_configurations("(mode=prod)") == [configuration]
+    assert await admin.list_configurations("(mode=dev)") == []
+
+    await configuration.remove()
+    assert managed.updates[-1] is None
+    assert not await admin.list_configurations()
+
+    await admin.close()
+    await storage.close()
+
+
+async def test_managed_factory(framework, tmp_path):
+    ctx = framework.get_context()
+    storage = FileStorage(tmp_path)
+    await storage.open()
+    admin = ConfigurationAdmin(ctx, storage)
+    await admin.open()
+
+    factory = ManagedFactory()
+    await ctx.register_service(
+        IConfigurationManagedFactory, factory, {SERVICE_FACTORY_PID: "http-server"}
+    )
+    configuration = admin.create_factory_configuration("http-server")
+    await configuration.update({"port": 8080})
+    pid = configuration.get_pid()
+    assert factory.instances[pid]["port"] == 8080
+    assert factory.instances[pid][SERVICE_FACTORY_PID] == "http-server"
+    await admin.close()
+    await storage.close()
+
+    # configurations are loaded from storage and delivered to factory
+    storage = FileStorage(tmp_path)
+    await storage.open()
+    admin = ConfigurationAdmin(ctx, storage)
+    await admin.open()
+    other = ManagedFactory()
+    await ctx.register_service(
+        IConfigurationManagedFactory, other, {SERVICE_FACTORY_PID: "http-server"}
+    )
+    assert other.instances[pid]["port"] == 8080
+
+    await admin.get_configuration(pid).remove()
+    assert pid not in other.instances
+    await admin.close()
+    await storage.close()
+
+
+async def test_sqlite_storage_filters(tmp_path):
+    storage = SqliteStorage(tmp_path / "configuration.db")
+    await storage.open()
+    await storage.store("app", {"mode": "prod", "tags": ["a", "b"]})
+    await storage.store("web", {"mode": "dev", "port": 8080, "name": "web-server"})
+    await storage.store("db", {"mode": "prod", "port": 5432, "name": "database"})
+
+    async def find(ldap_filter=None):
+        return sorted(await storage.find_pids(ldap_filter))
+
+    assert await find() == ["app", "db", "web"]
+    assert await find("(mode=prod)") == ["app", "db"]
+    assert await find("(tags=b)") == ["app"]
+    assert await find("(port=*)") == ["db", "web"]
+    assert await find("(port>=6000)") == ["web"]
+    assert await find("(port<=6000)") == ["db"]
+    assert await find("(|(mode=dev)(tags=a))") == ["app", "web"]
+    assert await find("(!(mode=prod))") == ["web"]
+    # substring is matched in memory on rows selected by sql
+    assert await find("(name=*server)") == ["web"]
+    assert await find("(&(mode=prod)(name=data*))") == ["db"]
+    assert await find("(!(name=data*))") == ["app", "web"]
+
+    await storage.store("app", {"mode": "dev"})
+    assert await find("(mode=dev)") == ["app", "web"]
+    assert await find("(tags=a)") == []
+    await storage.remove("web")
+    assert await find("(mode=dev)") == ["app"]
+    await storage.close()
+
+
+async def test_sqlite_storage_batch(tmp_path):
+    path = tmp_path / "configuration.db"
+    storage = SqliteStorage(path)
+    await storage.open()
+    for index in range(1200):
+        await storage.store(f"pid.{index}", {"index": index})
+    await storage.close()
+
+    storage = SqliteStorage(path)
+    await storage.open()
+    pids = await storage.get_pids()
+    assert len(pids) == 1200
+    batch = await storage.load_batch(pids + ["missing"])
+    assert len(batch) == 1200
+    assert batch["pid.7"] == {"index": 7}
+    assert await storage.load("missing") is None
+    assert await storage.exists("pid.1")
+    await storage.close()
+
+
+async def test_sqlite_managed_service(framework, tmp_path):
+    ctx = framework.get_context()
+    storage = SqliteStorage(tmp_path / "configuration.db")
+    await storage.open()
+    admin = ConfigurationAdmin(ctx, storage)
+    await admin.open()
+
+    configuration = admin.get_configuration("app")
+    await configuration.update({"mode": "prod"})
+    managed = Managed()
+    await ctx.register_service(IConfigurationManaged, managed, {SERVICE_PID: "app"})
+    assert managed.updates == [{"mode": "prod", SERVICE_PID: "app"}]
+    assert await admin.list_configurations("(mode=prod)") == [configuration]
+    await admin.close()
+    await storage.close()
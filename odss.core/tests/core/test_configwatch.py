@@ -0,0 +1,227 @@
+import asyncio
+import json
+
+import pytest
+
+from odss.common import (
+    SERVICE_FACTORY_PID,
+    SERVICE_PID,
+    IConfigurationAdmin,
+    IConfigurationManaged,
+    IConfigurationManagedFactory,
+)
+
+from odss.core.configadmin import ConfigurationAdmin, FileStorage
+from odss.core.configwatch import (
+    ConfigSources,
+    ConfigWatcher,
+    InotifyWatcher,
+    PollingWatcher,
+)
+
+
+class Managed(IConfigurationManaged):
+    def __init__(self):
+        self.updates = []
+
+    async def updated(self, properties):
+        self.updates.append(properties)
+
+
+class ManagedFactory(IConfigurationManagedFactory):
+    def __init__(self):
+        self.instances = {}
+        self.updates = 0
+
+    async def updated(self, pid, properties):
+        self.instances[pid] = properties
+        self.updates += 1
+
+    async def deleted(self, pid):
+        del self.instances[pid]
+
+
+def write(path, payload):
+    path.write_text(json.dumps(payload))
+
+
+def test_sources_diff(tmp_path):
+    directory = tmp_path / "config.d"
+    directory.mkdir()
+    write(directory / "app.json", {"debug": True})
+    write(directory / "db.json", {"host": "localhost"})
+    write(tmp_path / "overrides.json", {"app": {"debug": False}, "http": {}})
+
+    sources = ConfigSources([directory, tmp_path / "overrides.json"])
+    changes = sources.apply(sources.read(sources.scan()))
+    assert changes == {"app": {"debug": False}, "db": {"host": "localhost"}, "http": {}}
+
+    # override wins, change of overridden file is not visible
+    write(directory / "app.json", {"debug": "yes"})
+    write(directory / "db.json", {"host": "db"})
+    changes = sources.apply(
+        sources.read([directory / "app.json", directory / "db.json"])
+    )
+    assert changes == {"db": {"host": "db"}}
+
+    (tmp_path / "overrides.json").unlink()
+    changes = sources.apply(sources.read([tmp_path / "overrides.json"]))
+    assert changes == {"app": {"debug": "yes"}, "http": None}
+
+    # not parsable file keeps previous content
+    (directory / "db.json").write_text("{")
+    assert sources.apply(sources.read([directory / "db.json"])) == {}
+    assert sources.properties["db"] == {"host": "db"}
+
+
+@pytest.mark.parametrize("backend", ["inotify", "poll"])
+async def test_watcher_backends(tmp_path, backend):
+    if backend == "inotify":
+        try:
+            InotifyWatcher(ConfigSources([tmp_path]), None).inotify.close()
+        except OSError:
+            pytest.skip("inotify not available")
+    changes = []
+    sources = ConfigSources([tmp_path])
+    if backend == "inotify":
+        watcher = InotifyWatcher(sources, changes.append)
+    else:
+        watcher = PollingWatcher(sources, changes.append, interval=0.01)
+    await watcher.start()
+    try:
+        write(tmp_path / "app.json", {"debug": True})
+        (tmp_path / "notes.txt").write_text("ignored")
+        for _ in range(100):
+            if changes:
+                break
+            await asyncio.sleep(0.01)
+        assert changes and set().union(*changes) == {tmp_path / "app.json"}
+    finally:
+        await watcher.stop()
+
+
+async def test_config_watcher(framework, tmp_path):
+    ctx = framework.get_context()
+    directory = tmp_path / "config.d"
+    directory.mkdir()
+    write(directory / "app.json", {"debug": True})
+    write(directory / "db.json", {"host": "localhost"})
+
+    storage = FileStorage(tmp_path / "storage")
+    await storage.open()
+    admin = ConfigurationAdmin(ctx, storage)
+    await admin.open()
+    await ctx.register_service(IConfigurationAdmin, admin)
+
+    watcher = ConfigWatcher(ctx, [directory], debounce=0.01, backend="poll")
+    await watcher.open()
+    app = Managed()
+    db = Managed()
+    await ctx.register_service(IConfigurationManaged, app, {SERVICE_PID: "app"})
+    await ctx.register_service(IConfigurationManaged, db, {SERVICE_PID: "db"})
+    assert app.updates == [{"debug": True, SERVICE_PID: "app"}]
+    assert db.updates == [{"host": "localhost", SERVICE_PID: "db"}]
+
+    # burst of writes ends with single update of changed pid only
+    for value in range(5):
+        write(directory / "db.json", {"host": "localhost", "port": value})
+        watcher.changed({directory / "db.json", directory / "app.json"})
+    await asyncio.sleep(0.05)
+    assert app.updates == [{"debug": True, SERVICE_PID: "app"}]
+    assert db.updates[1:] == [{"host": "localhost", "port": 4, SERVICE_PID: "db"}]
+
+    (directory / "app.json").unlink()
+    assert await watcher.reload(None) == {"app": None}
+    assert app.updates[-1] is None
+
+    await watcher.close()
+    await admin.close()
+    await storage.close()
+
+
+async def test_factory_configurations(framework, tmp_path):
+    ctx = framework.get_context()
+    directory = tmp_path / "config.d"
+    directory.mkdir()
+    write(directory / "http-server~main.json", {"port": 8080})
+    write(directory / "http-server~admin.json", {"port": 8081})
+
+    storage = FileStorage(tmp_path / "storage")
+    await storage.open()
+    admin = ConfigurationAdmin(ctx, storage)
+    await admin.open()
+    await ctx.register_service(IConfigurationAdmin, admin)
+    factory = ManagedFactory()
+    await ctx.register_service(
+        IConfigurationManagedFactory, factory, {SERVICE_FACTORY_PID: "http-server"}
+    )
+
+    watcher = ConfigWatcher(ctx, [directory], debounce=0.01, backend="poll")
+    await watcher.open()
+    assert factory.instances == {
+        "http-server~main": {
+            "port": 8080,
+            SERVICE_PID: "http-server~main",
+            SERVICE_FACTORY_PID: "http-server",
+        },
+        "http-server~admin": {
+            "port": 8081,
+            SERVICE_PID: "http-server~admin",
+            SERVICE_FACTORY_PID: "http-server",
+        },
+    }
+
+    # alias updates the same configuration, unchanged one is not touched
+    write(directory / "http-server~main.json", {"port": 9090})
+    (directory / "http-server~admin.json").unlink()
+    await watcher.reload(None)
+    assert list(factory.instances) == ["http-server~main"]
+    assert factory.instances["http-server~main"]["port"] == 9090
+    assert factory.updates == 3
+    await watcher.reload(None)
+    assert factory.updates == 3
+
+    await watcher.close()
+    await admin.close()
+    await storage.close()
+
+
+async def test_inotify_created_directory(tmp_path):
+    directory = tmp_path / "odss" / "config.d"
+    sources = ConfigSources([directory])
+    try:
+        watcher = InotifyWatcher(sources, None)
+    except OSError:
+        pytest.skip("inotify not available")
+    changes = []
+    watcher.callback = changes.append
+    await watcher.start()
+    try:
+        directory.mkdir(parents=True)
+        write(directory / "app.json", {"debug": True})
+        for _ in range(100):
+            if directory in watcher.watches.values() and changes:
+                break
+            await asyncio.sleep(0.01)
+        # directory is watched, files written before are found by rescan
+        assert directory in watcher.watches.values()
+        assert None in changes
+    finally:
+        await watcher.stop()
+
+
+async def test_close_waits_for_reload(framework, tmp_path):
+    watcher = ConfigWatcher(framework.get_context(), [tmp_path], backend="poll")
+    await watcher.open()
+    started = asyncio.Event()
+
+    async def reload(files=None):
+        started.set()
+        await asyncio.sleep(10)
+
+    watcher.reload = reload
+    watcher.changed(None)
+    await asyncio.wait_for(started.wait(), 1)
+    tasks = list(watcher.tasks)
+    await watcher.close()
+    assert tasks and all(task.done() for task in tasks)
@@ -215,3 +215,22 @@ async def test_service_events_modified(framework, listener):
     assert listener.events[0].kind == ServiceEvent.REGISTERED
     assert listener.events[1].kind == ServiceEvent.MODIFIED
     assert listener.events[2].kind == ServiceEvent.UNREGISTERING
+
+
+async def test_service_properties_replace(framework):
+    context = framework.get_context()
+    reg = await context.register_service(
+        ITextService, "mock service", {"foo": "bar", "baz": 1}
+    )
+    ref = reg.get_reference()
+
+    await reg.set_properties({"baz": 2})
+    assert ref.get_property("foo") == "bar"
+
+    await reg.set_properties({"baz": 3}, replace=True)
+    props = ref.get_properties()
+    assert "foo" not in props
+    assert props["baz"] == 3
+    assert props[SERVICE_PRIORITY] == 50
+    assert props[OBJECTCLASS] and props[SERVICE_ID] is not None
+    await reg.unregister()
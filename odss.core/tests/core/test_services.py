@@ -1,4 +1,5 @@
 import pytest
+from odss.common import IServiceFactory
 
 from odss.core.bundle import BundleContext
 from odss.core.errors import BundleException
@@ -148,3 +149,37 @@ async def test_unregister_service(framework):
 
     with pytest.raises(BundleException):
         context.get_service(reference)
+
+
+class CounterFactory(IServiceFactory):
+    def __init__(self):
+        self.created = 0
+        self.released = []
+
+    def get_service(self, bundle, reference):
+        self.created += 1
+        return {"instance": self.created}
+
+    def unget_service(self, bundle, reference, service):
+        self.released.append(service["instance"])
+
+
+async def test_service_factory(framework):
+    context = framework.get_context()
+    factory = CounterFactory()
+    registration = await context.register_service("foo", factory)
+    reference = context.get_service_reference("foo")
+
+    first = context.get_service(reference)
+    assert first == {"instance": 1}
+    assert context.get_service(reference) is first
+    assert factory.created == 1
+
+    context.unget_service(reference)
+    assert factory.released == []
+    context.unget_service(reference)
+    assert factory.released == [1]
+
+    assert context.get_service(reference) == {"instance": 2}
+    await registration.unregister()
+    assert factory.released == [1, 2]
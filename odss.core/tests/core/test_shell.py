@@ -0,0 +1,277 @@
+import asyncio
+import socket
+import stat
+
+import pytest
+
+from odss.common import IShellStream, ShellCommands, ShellService, command
+
+from odss.core.shell import Shell, Trie
+from odss.core.shell.commands import format_query
+from odss.core.shell.remote import PROMPT, RemoteShell
+
+
+class Stream(IShellStream):
+    def __init__(self):
+        self.lines = []
+
+    def write_line(self, line):
+        self.lines.append(line)
+
+
+class Commands(ShellCommands):
+    def __init__(self):
+        self.lines = None
+
+    @command()
+    def echo(self, stream, *words, sep=" "):
+        """
+        Print words
+        """
+        return sep.join(words)
+
+    @command(namespace="test")
+    async def count(self, stream, limit):
+        for value in range(int(limit)):
+            yield value
+            # output is written before the command ends
+            self.lines = list(stream.lines)
+            await asyncio.sleep(0)
+
+    @command(name="fail", namespace="test")
+    def fail_command(self, stream):
+        raise ValueError("failed")
+
+    @command(namespace="other")
+    def echo_other(self, stream):
+        stream.write_line("other")
+
+
+def test_trie():
+    trie = Trie()
+    assert trie.insert("bundles", 1)
+    assert trie.insert("bundle", 2)
+    assert trie.insert("services", 3)
+    assert not trie.insert("bundle", 4)
+    assert len(trie) == 3
+    assert trie.get("bundle") == 2
+    assert trie.get("bund") is None
+    assert "bund" not in trie
+    assert trie.keys("bu") == ["bundle", "bundles"]
+    assert trie.keys() == ["bundle", "bundles", "services"]
+
+    assert trie.remove("bundle") == 2
+    assert trie.keys("bu") == ["bundles"]
+    assert trie.remove("bundles") == 1
+    assert "b" not in trie.root.children
+    with pytest.raises(KeyError):
+        trie.remove("bundles")
+
+
+async def test_execute():
+    shell = Shell()
+    commands = Commands()
+    shell.register_command("echo", commands.echo)
+    shell.register_command("count", commands.count, "test")
+    shell.register_command("fail", commands.fail_command, "test")
+    assert not shell.register_command("echo", commands.echo)
+
+    stream = Stream()
+    assert await shell.execute("echo 'hello world' again sep=,", stream)
+    assert stream.lines == ["hello world,again"]
+
+    stream = Stream()
+    assert await shell.execute("count 3", stream)
+    assert stream.lines == ["0", "1", "2"]
+    assert commands.lines == ["0", "1", "2"]
+
+    stream = Stream()
+    assert not await shell.execute("count", stream)
+    assert "Usage: count <limit>" in stream.lines[0]
+    assert not await shell.execute("test.fail", stream)
+    assert "failed" in stream.lines[-1]
+    assert not await shell.execute("missing", stream)
+    assert not await shell.execute("echo 'unclosed", stream)
+    assert await shell.execute("", stream)
+
+
+async def test_lookup_and_complete():
+    shell = Shell()
+    commands = Commands()
+    shell.register_command("echo", commands.echo)
+    shell.register_command("count", commands.count, "test")
+    shell.register_command("echo", commands.echo_other, "other")
+    shell.register_command("count", commands.echo_other, "other")
+
+    assert shell.get_namespaces() == ["default", "other", "test"]
+    assert shell.get_commands("other") == ["count", "echo"]
+    # default namespace wins, ambiguous name has to be qualified
+    assert shell.get_command("echo").handler == commands.echo
+    with pytest.raises(KeyError):
+        shell.get_command("count")
+    assert shell.get_command("test.count").handler == commands.count
+
+    assert shell.complete("e") == ["echo"]
+    assert shell.complete("") == [
+        "count",
+        "echo",
+        "default.echo",
+        "other.count",
+        "other.echo",
+        "test.count",
+    ]
+    assert shell.complete("te") == ["test.count"]
+
+    assert shell.unregister_command("count", "test")
+    assert not shell.unregister_command("count", "test")
+    assert shell.get_command("count").handler == commands.echo_other
+    assert shell.get_namespaces() == ["default", "other"]
+
+
+async def test_shell_bundle(framework):
+    ctx = framework.get_context()
+    bundle = await framework.install_bundle("odss.core.shell")
+    await bundle.start()
+    shell = ctx.get_service(ctx.get_service_reference(ShellService))
+
+    registration = await ctx.register_service(ShellCommands, Commands())
+    stream = Stream()
+    assert await shell.execute("test.count 2", stream)
+    assert stream.lines == ["0", "1"]
+    assert await shell.execute("help", stream)
+    assert any("echo [words...] [sep= ]" in line for line in stream.lines)
+
+    await registration.unregister()
+    assert not await shell.execute("test.count 2", stream)
+    assert shell.get_namespaces() == ["default"]
+    await bundle.stop()
+
+
+class Output(ShellCommands):
+    def __init__(self):
+        self.produced = 0
+
+    @command()
+    def lines(self, stream, count):
+        for _ in range(int(count)):
+            self.produced += 1
+            yield "x" * 100
+
+
+async def read_response(reader):
+    data = await asyncio.wait_for(reader.readuntil(PROMPT.encode()), 1)
+    return data[: -len(PROMPT)].decode()
+
+
+async def start_remote(framework, **kwargs):
+    ctx = framework.get_context()
+    for name in ("odss.core.shell", "odss.core.shell.commands"):
+        bundle = await framework.install_bundle(name)
+        await bundle.start()
+    remote = RemoteShell(ctx, **kwargs)
+    await remote.open()
+    return remote
+
+
+async def test_remote_shell_sessions(framework, tmp_path):
+    remote = await start_remote(framework, path=tmp_path / "shell.sock")
+    sessions = [
+        await asyncio.open_unix_connection(str(tmp_path / "shell.sock"))
+        for _ in range(3)
+    ]
+    for reader, writer in sessions:
+        assert await read_response(reader) == ""
+
+    commands = ["bundles", "services", "listeners", "metrics"]
+    for (reader, writer), name in zip(sessions, commands):
+        writer.write(f"{name}\n".encode())
+    outputs = [await read_response(reader) for reader, _ in sessions]
+    assert "odss.core.shell.commands" in outputs[0]
+    assert "odss.common.shell.ShellService" in outputs[1]
+    assert "odss.common.shell.ShellCommands" in outputs[2]
+
+    reader, writer = sessions[0]
+    writer.write(b"metrics\n")
+    output = await read_response(reader)
+    assert "services" in output and "service listeners" in output
+
+    writer.write(b"exit\n")
+    assert await reader.read() == b""
+    for _, writer in sessions:
+        writer.close()
+    await remote.close()
+    assert not (tmp_path / "shell.sock").exists()
+
+
+async def test_remote_shell_permissions(framework, tmp_path):
+    path = tmp_path / "odss" / "shell.sock"
+    remote = await start_remote(framework, path=path)
+    try:
+        assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    finally:
+        await remote.close()
+
+
+async def test_remote_shell_socket_owner(framework, tmp_path):
+    path = tmp_path / "shell.sock"
+    # left by crashed shell
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+
+    remote = await start_remote(framework, path=path)
+    # socket of running shell is not taken over
+    second = RemoteShell(framework.get_context(), path=path)
+    with pytest.raises(OSError):
+        await second.open()
+    await second.close()
+    reader, writer = await asyncio.open_unix_connection(str(path))
+    assert await read_response(reader) == ""
+    writer.close()
+
+    # socket of the next shell is kept
+    path.unlink()
+    successor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    successor.bind(str(path))
+    try:
+        await remote.close()
+        assert path.is_socket()
+    finally:
+        successor.close()
+
+
+async def test_remote_shell_flow_control(framework, tmp_path):
+    remote = await start_remote(
+        framework, path=tmp_path / "shell.sock", write_buffer=1024
+    )
+    output = Output()
+    await framework.get_context().register_service(ShellCommands, output)
+
+    reader, writer = await asyncio.open_unix_connection(str(tmp_path / "shell.sock"))
+    try:
+        await read_response(reader)
+        writer.write(b"lines 50000\n")
+        await asyncio.sleep(0.1)
+        # client does not read: command is paused
+        assert 0 < output.produced < 50000
+
+        data = b""
+        while not data.endswith(PROMPT.encode()):
+            data += await asyncio.wait_for(reader.read(1 << 16), 1)
+        assert data.count(b"\n") == 50000
+        assert output.produced == 50000
+    finally:
+        writer.close()
+        await remote.close()
+
+    with pytest.raises(ValueError):
+        RemoteShell(framework.get_context(), host="0.0.0.0", port=0)
+
+
+def test_format_query():
+    from odss.core.query import create_query
+
+    query = "(&(name=a*b)(!(port>=10))(|(x=*)(y<=2)))"
+    assert format_query(create_query(query)) == query
+    assert format_query(create_query(None)) == ""
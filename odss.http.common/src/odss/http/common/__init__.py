@@ -1,5 +1,10 @@
 from .abc import (
     AuthInfo,
+    BodyStream,
+    EventStream,
+    IEventStreamHub,
+    MultipartPart,
+    MultipartStream,
     Request,
     IHttpRouteService,
     IHttpSecurity,
@@ -10,8 +15,14 @@ from .abc import (
     IHttpMiddlewareService,
     IHttpService,
     RouteInfo,
+    WebSocket,
+)
+from .consts import (
+    ODSS_HTTP_FRAMEWORK_EVENTS,
+    ODSS_HTTP_HANDLER,
+    ODSS_HTTP_VIEW,
+    ODSS_HTTP_REQUEST_CSRF,
 )
-from .consts import ODSS_HTTP_HANDLER, ODSS_HTTP_VIEW, ODSS_HTTP_REQUEST_CSRF
 from .response import (
     Response,
     PlainTextResponse,
@@ -43,12 +54,16 @@ from .errors import (
     HttpNotFound,
     HttpUnauthorized,
     HttpForbidden,
+    HttpServiceUnavailable,
+    HttpTooManyRequests,
+    HttpPayloadTooLarge,
 )
 
 __all__ = (
     "ODSS_HTTP_VIEW",
     "ODSS_HTTP_HANDLER",
     "ODSS_HTTP_REQUEST_CSRF",
+    "ODSS_HTTP_FRAMEWORK_EVENTS",
     "route",
     "IHttpServer",
     "IHttpServerEngine",
@@ -59,7 +74,13 @@ __all__ = (
     "IHttpSecurityPolicy",
     "IHttpMiddlewareService",
     "AuthInfo",
+    "BodyStream",
+    "EventStream",
+    "IEventStreamHub",
+    "MultipartPart",
+    "MultipartStream",
     "RouteInfo",
+    "WebSocket",
     "Request",
     "Response",
     "JsonResponse",
@@ -82,6 +103,9 @@ __all__ = (
     "HttpNotFound",
     "HttpUnauthorized",
     "HttpForbidden",
+    "HttpServiceUnavailable",
+    "HttpTooManyRequests",
+    "HttpPayloadTooLarge",
     "JsonError",
     "get_csrf",
     "encode_json",
@@ -15,6 +15,39 @@ class FileField(metaclass=abc.ABCMeta):
     headers: "CIMultiDictProxy[str]"
 
 
+class BodyStream(metaclass=abc.ABCMeta):
+    """
+    Request body read chunk by chunk (inject as handler parameter).
+    """
+
+    @abc.abstractmethod
+    def __aiter__(self) -> t.AsyncIterator[bytes]:
+        raise NotImplemented
+
+    @abc.abstractmethod
+    async def read(self) -> bytes:
+        """
+        Read rest of stream
+        """
+        raise NotImplemented
+
+
+class MultipartPart(BodyStream):
+    name: str | None
+    filename: str | None
+    headers: "CIMultiDictProxy[str]"
+
+
+class MultipartStream(metaclass=abc.ABCMeta):
+    """
+    Multipart request body read part by part (inject as handler parameter).
+    """
+
+    @abc.abstractmethod
+    def __aiter__(self) -> t.AsyncIterator[MultipartPart]:
+        raise NotImplemented
+
+
 class Request(metaclass=abc.ABCMeta):
     @property
     @abc.abstractmethod
@@ -174,6 +207,103 @@ class Request(metaclass=abc.ABCMeta):
 
 
 
+class WebSocket(metaclass=abc.ABCMeta):
+    """
+    WebSocket connection (inject as parameter of route.websocket handler).
+
+    Connection is closed when handler returns.
+    """
+
+    request: Request
+
+    @abc.abstractmethod
+    async def send(self, data: str | bytes) -> None:
+        """
+        Queue message to send, wait when send queue is full
+        """
+        raise NotImplemented
+
+    @abc.abstractmethod
+    async def send_json(self, data: t.Any) -> None:
+        raise NotImplemented
+
+    @abc.abstractmethod
+    async def receive(self) -> str | bytes | None:
+        """
+        Return next message or None when connection is closed
+        """
+        raise NotImplemented
+
+    @abc.abstractmethod
+    def __aiter__(self) -> t.AsyncIterator[str | bytes]:
+        raise NotImplemented
+
+    @abc.abstractmethod
+    def join(self, group: str) -> None:
+        raise NotImplemented
+
+    @abc.abstractmethod
+    def leave(self, group: str) -> None:
+        raise NotImplemented
+
+    @abc.abstractmethod
+    def broadcast(self, group: str, data: str | bytes) -> int:
+        """
+        Send message to all connections of group, return number of receivers
+        """
+        raise NotImplemented
+
+    @abc.abstractmethod
+    async def close(self, code: int = 1000, message: bytes = b"") -> None:
+        raise NotImplemented
+
+
+class EventStream(metaclass=abc.ABCMeta):
+    """
+    Server-Sent Events stream (inject as parameter of route.sse handler).
+
+    Stream stays open after handler returns, until client disconnects.
+    """
+
+    request: Request
+
+    @abc.abstractmethod
+    async def send(
+        self, data: str, event: str | None = None, id: str | None = None
+    ) -> None:
+        """
+        Queue event to send, wait when buffer is full
+        """
+        raise NotImplemented
+
+    @abc.abstractmethod
+    def join(self, channel: str) -> None:
+        raise NotImplemented
+
+    @abc.abstractmethod
+    def leave(self, channel: str) -> None:
+        raise NotImplemented
+
+    @abc.abstractmethod
+    async def close(self) -> None:
+        raise NotImplemented
+
+
+class IEventStreamHub(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def publish(
+        self,
+        channel: str,
+        data: str,
+        event: str | None = None,
+        id: str | None = None,
+    ) -> int:
+        """
+        Send event to all streams of channel, return number of receivers
+        """
+        raise NotImplemented
+
+
 @dc.dataclass(frozen=True, slots=True)
 class RouteInfo:
     name: str
@@ -218,7 +348,7 @@ HttpServerEngineRequestHandler = t.Callable[[HttpServerHandler, Request], t.Awai
 
 class IHttpServerEngineFactory(metaclass=abc.ABCMeta):
     @abc.abstractmethod
-    def create(self, request_handler: HttpServerEngineRequestHandler, host: str, port: int) -> IHttpServerEngine:
+    def create(self, request_handler: HttpServerEngineRequestHandler, host: str, port: int, **options) -> IHttpServerEngine:
         raise NotImplemented
 
 
@@ -52,6 +52,11 @@ class BaseHttpSecurityPolicy(IHttpSecurityPolicy):
 class Cookies:
     def __init__(self) -> None:
         self._store: SimpleCookie[str] = SimpleCookie()
+        # Set-Cookie values rendered once in set()
+        self._rendered: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._store)
 
     def set(
         self,
@@ -75,6 +80,7 @@ class Cookies:
         old = self._store.get(name)
         if old is not None and old.coded_value == "":
             self._store.pop(name)
+            self._rendered.pop(name, None)
 
         self._store[name] = value
         c = self._store[name]
@@ -100,14 +106,14 @@ class Cookies:
             c["version"] = version
         if samesite is not None:
             c["samesite"] = samesite
+        self._rendered[name] = c.OutputString()
 
     def remove(self, name: str):
         self.set(name, "", expires="Thu, 01 Jan 1970 00:00:00 GMT", max_age=0)
 
     def _populate(self, headers: CIMultiDict):
-        for cookie in self._store.values():
-            value = cookie.output(header="")[1:]
-            headers.add("Set-Cookie", value)
+        if self._rendered:
+            headers.extend([("Set-Cookie", value) for value in self._rendered.values()])
 
 
 def get_csrf(request: Request) -> ICsrf:
@@ -1,3 +1,6 @@
 ODSS_HTTP_HANDLER = "odss.http.view.handler"
 ODSS_HTTP_VIEW = "odss.http.view"
 ODSS_HTTP_REQUEST_CSRF = "odss.http.request.csrf"
+
+# channel of event streams with bundle and service events of framework
+ODSS_HTTP_FRAMEWORK_EVENTS = "odss.framework"
@@ -33,6 +33,16 @@ def _create_route_decorator(
     return route
 
 
+def _create_stream_decorator(kind: str) -> t.Callable:
+    get_route = _create_route_decorator("GET")
+
+    def stream_route(path: str = "", **settings):
+        settings[kind] = True
+        return get_route(path, **settings)
+
+    return stream_route
+
+
 HandlerInfo = t.Tuple[t.Callable, t.Dict[str, t.Any]]
 
 
@@ -95,3 +105,5 @@ class route:
     patch = _create_route_decorator("PATCH")
     option = _create_route_decorator("OPTIONS")
     head = _create_route_decorator("HEAD")
+    websocket = _create_stream_decorator("websocket")
+    sse = _create_stream_decorator("sse")
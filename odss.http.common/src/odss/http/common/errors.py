@@ -139,7 +139,21 @@ class HttpForbidden(HttpError):
     default_reason = "Access denied"
 
 
+class HttpPayloadTooLarge(HttpError):
+    status_code = 413
+    default_reason = "The request body is too large"
+
+
 class HttpUnprocessableContent(HttpError):
     status_code = 422
     default_reason = "The request was malformed or contained invalid parameters"
 
+
+class HttpTooManyRequests(HttpError):
+    status_code = 429
+    default_reason = "Too many requests"
+
+
+class HttpServiceUnavailable(HttpError):
+    status_code = 503
+    default_reason = "The service is temporarily unavailable"
@@ -63,7 +63,7 @@ class JsonResponse(Response):
     content_type = "application/json"
 
     def prepare_body(self, body: BodyType):
-        return encode_json(body)
+        return encode_json(body).encode(self.charset)
 
 
 class RedirectResponse(Response):
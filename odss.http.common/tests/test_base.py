@@ -1,6 +1,6 @@
 import pytest
 
-from odss.http.common import JsonError, decode_json, encode_json
+from odss.http.common import JsonError, JsonResponse, decode_json, encode_json
 
 
 def test_encode_json():
@@ -26,3 +26,16 @@ def test_encode_json_error():
 def test_decode_json_error():
     with pytest.raises(JsonError):
         decode_json("[")
+
+
+def test_response_cookies():
+    response = JsonResponse({"a": 1})
+    response.cookies.set("name", "first")
+    response.cookies.set("name", "second", httponly=True)
+    response.cookies.set("other", "value")
+    response.finish()
+    assert response.body == b'{"a":1}'
+    assert response.headers.getall("Set-Cookie") == [
+        "name=second; HttpOnly; Path=/",
+        "other=value; Path=/",
+    ]
@@ -1,7 +1,12 @@
 import logging
-from odss.http.common import IHttpMiddlewareService
+from odss.common import SERVICE_PRIORITY
+from odss.http.common import IEventStreamHub, IHttpMiddlewareService
 
+from .caching import CacheMiddleware
+from .compression import CompressionMiddleware
 from .csrf import CsrfMiddleware, CookieStorage, FormAndHeaderPolicy
+from .limits import LimitsMiddleware, RouteServiceTracker, SecurityPolicyTracker
+from .sse import FrameworkEventsPublisher
 from .trackers import ServerService
 
 logging.getLogger("aiohttp").setLevel("WARN")
@@ -16,11 +21,56 @@ class Activator:
 
         self.service = ServerService(ctx, props)
         await self.service.open()
+        await ctx.register_service(IEventStreamHub, self.service.streams)
+        self.publisher = FrameworkEventsPublisher(self.service.streams)
+        ctx.add_bundle_listener(self.publisher)
+        ctx.add_service_listener(self.publisher)
+        # lower priority wraps higher one: limits (0), compression (10),
+        # CSRF (50), cache (100)
         await ctx.register_service(
             IHttpMiddlewareService,
             CsrfMiddleware(CookieStorage(), FormAndHeaderPolicy()),
+            {SERVICE_PRIORITY: 50},
         )
+        # opt-in: "compression": true or options of CompressionMiddleware
+        compression = props.get("compression")
+        if compression:
+            options = compression if isinstance(compression, dict) else {}
+            # inside limits, outside CSRF and cache: compress final response
+            await ctx.register_service(
+                IHttpMiddlewareService,
+                CompressionMiddleware(**options),
+                {SERVICE_PRIORITY: 10},
+            )
+        # outermost middleware: reject overload before any other work
+        self.limits = LimitsMiddleware(**props.get("limits", {}))
+        self.policy_tracker = SecurityPolicyTracker(ctx, self.limits)
+        await self.policy_tracker.open()
+        self.route_tracker = RouteServiceTracker(ctx, self.limits)
+        await self.route_tracker.open()
+        await ctx.register_service(
+            IHttpMiddlewareService, self.limits, {SERVICE_PRIORITY: 0}
+        )
+        self.cache = None
+        cache = props.get("cache", {})
+        if cache is not False:
+            # inside default middlewares: cache response of route handler only
+            self.cache = CacheMiddleware(**cache)
+            ctx.add_service_listener(self.cache)
+            await ctx.register_service(
+                IHttpMiddlewareService, self.cache, {SERVICE_PRIORITY: 100}
+            )
 
     async def stop(self, ctx):
+        ctx.remove_bundle_listener(self.publisher)
+        ctx.remove_service_listener(self.publisher)
+        self.publisher = None
+        await self.policy_tracker.close()
+        self.policy_tracker = None
+        await self.route_tracker.close()
+        self.route_tracker = None
+        if self.cache is not None:
+            ctx.remove_service_listener(self.cache)
+            self.cache = None
         await self.service.close()
         self.service = None
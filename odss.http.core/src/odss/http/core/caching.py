@@ -0,0 +1,227 @@
+import collections
+import dataclasses as dc
+import hashlib
+import logging
+import time
+import typing as t
+
+from odss.common import OBJECTCLASS, ServiceEvent, get_classes_name
+from odss.http.common import Request, Response
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[str, ...]
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+# headers computed by engine or bound to single client
+SKIP_HEADERS = ("Content-Type", "Content-Length", "Content-Encoding", "Set-Cookie")
+
+
+@dc.dataclass(slots=True)
+class CacheEntry:
+    route: str
+    body: bytes
+    code: int
+    content_type: str | None
+    charset: str | None
+    headers: tuple[tuple[str, str], ...]
+    etag: str
+    expires: float
+
+    def create_response(self) -> Response:
+        response = Response(
+            self.body,
+            code=self.code,
+            headers=list(self.headers),
+            content_type=self.content_type,
+            charset=self.charset,
+        )
+        response.headers["ETag"] = self.etag
+        return response
+
+
+def create_etag(body: bytes) -> str:
+    # weak: compression middleware changes bytes, not content of response
+    return 'W/"{}"'.format(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def match_etag(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    etag = strip_weak(etag)
+    for value in if_none_match.split(","):
+        if strip_weak(value.strip()) == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(None, code=304, headers={"ETag": etag})
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses with TTL and size limits.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: collections.OrderedDict[CacheKey, CacheEntry] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: CacheKey) -> CacheEntry | None:
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires <= time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = entry
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def invalidate(self, route: str) -> int:
+        keys = [key for key, entry in self.entries.items() if entry.route == route]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self.entries.pop(key)
+        self.size -= len(entry.body)
+
+
+def get_server(request: Request) -> str:
+    # middleware service is shared by servers: the same route name and path
+    # can be served by different handlers of other server
+    transport = request.transport
+    if transport is None:
+        return ""
+    return str(transport.get_extra_info("sockname"))
+
+
+class CacheMiddleware:
+    """
+    Cache responses of GET routes with "cache_ttl" setting.
+
+    Route settings:
+        cache_ttl: seconds to keep response
+        cache_vary: request headers which are part of cache key
+        cache_invalidate: specifications of services whose events
+            drop cached responses of the route
+
+    Register instance as service listener to get invalidation by services events.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.cache = ResponseCache(max_entries, max_bytes)
+        self.dependencies: dict[str, set[str]] = {}
+
+    async def __call__(self, request: Request, handler):
+        settings = getattr(request, "settings", {})
+        ttl = settings.get("cache_ttl")
+        if not ttl or request.method not in CACHEABLE_METHODS:
+            return await handler(request)
+
+        route = settings["name"]
+        key = self.get_key(route, request, settings.get("cache_vary", ()))
+        if_none_match = request.headers.get("If-None-Match")
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            if if_none_match and match_etag(if_none_match, entry.etag):
+                return not_modified(entry.etag)
+            return entry.create_response()
+
+        response = await handler(request)
+        entry = self.create_entry(route, response, ttl)
+        if entry is None:
+            return response
+
+        self.add_dependencies(route, settings.get("cache_invalidate", ()))
+        self.cache.set(key, entry)
+        if if_none_match and match_etag(if_none_match, entry.etag):
+            return not_modified(entry.etag)
+        response.headers["ETag"] = entry.etag
+        return response
+
+    def get_key(self, route: str, request: Request, vary: t.Iterable[str]) -> CacheKey:
+        headers = request.headers
+        return (get_server(request), route, request.path_qs) + tuple(
+            headers.get(name, "") for name in vary
+        )
+
+    def create_entry(
+        self, route: str, response: t.Any, ttl: float
+    ) -> CacheEntry | None:
+        if not isinstance(response, Response) or response.code != 200:
+            return None
+        if response.cookies or "Set-Cookie" in response.headers:
+            return None
+
+        body = response.body
+        if isinstance(body, str):
+            body = body.encode(response.charset or "utf-8")
+        headers = tuple(
+            (name, value)
+            for name, value in response.headers.items()
+            if name not in SKIP_HEADERS
+        )
+        return CacheEntry(
+            route=route,
+            body=body,
+            code=response.code,
+            content_type=response.content_type,
+            charset=response.charset,
+            headers=headers,
+            etag=create_etag(body),
+            expires=time.monotonic() + ttl,
+        )
+
+    def add_dependencies(self, route: str, specifications: t.Any) -> None:
+        if not specifications:
+            return
+        for spec in get_classes_name(specifications):
+            self.dependencies.setdefault(spec, set()).add(route)
+
+    def invalidate(self, route: str) -> None:
+        count = self.cache.invalidate(route)
+        logger.debug("Invalidate %d cached response(s) of: %s", count, route)
+
+    async def service_changed(self, event: ServiceEvent) -> None:
+        if event.kind not in (
+            ServiceEvent.REGISTERED,
+            ServiceEvent.MODIFIED,
+            ServiceEvent.UNREGISTERING,
+        ):
+            return
+        for spec in event.reference.get_property(OBJECTCLASS):
+            for route in self.dependencies.get(spec, ()):
+                self.invalidate(route)
@@ -0,0 +1,175 @@
+import asyncio
+import collections
+import hashlib
+import typing as t
+import zlib
+
+from odss.http.common import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # type: ignore[assignment]
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def compress_gzip(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_deflate(data: bytes, level: int) -> bytes:
+    return zlib.compress(data, level)
+
+
+def compress_brotli(data: bytes, level: int) -> bytes:
+    # brotli quality is 0-11, zlib level is 0-9
+    return brotli.compress(data, quality=min(level + 2, 11))
+
+
+ENCODERS: dict[str, t.Callable[[bytes, int], bytes]] = {
+    "gzip": compress_gzip,
+    "deflate": compress_deflate,
+}
+if brotli is not None:
+    ENCODERS = {"br": compress_brotli, **ENCODERS}
+
+
+def select_encoding(accept_encoding: str) -> str | None:
+    """
+    Select best supported encoding from Accept-Encoding header.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in ENCODERS:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressedCache:
+    """
+    LRU cache of compressed bodies keyed by body hash and encoding.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: collections.OrderedDict[tuple[bytes, str], bytes] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: tuple[bytes, str]) -> bytes | None:
+        try:
+            data = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def set(self, key: tuple[bytes, str], data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = data
+        self.size += len(data)
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, removed = self.entries.popitem(last=False)
+            self.size -= len(removed)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+
+class CompressionMiddleware:
+    """
+    Compress response body according to Accept-Encoding of request.
+
+    Bodies bigger than executor_threshold are compressed in thread pool,
+    so event loop is not blocked.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        level: int = 6,
+        executor_threshold: int = 64 * 1024,
+        cache_entries: int = 256,
+        cache_bytes: int = 16 * 1024 * 1024,
+    ):
+        self.min_size = min_size
+        self.level = level
+        self.executor_threshold = executor_threshold
+        self.cache = CompressedCache(cache_entries, cache_bytes)
+
+    async def __call__(self, request: Request, handler):
+        response = await handler(request)
+        if not isinstance(response, Response):
+            return response
+
+        if not self.is_compressible(response):
+            return response
+
+        response.headers.add("Vary", "Accept-Encoding")
+        encoding = select_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        body = response.body
+        if isinstance(body, str):
+            body = body.encode(response.charset or "utf-8")
+        response.body = await self.compress(body, encoding)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def is_compressible(self, response: Response) -> bool:
+        if response.code < 200 or response.code in (204, 304):
+            return False
+        if "Content-Encoding" in response.headers:
+            return False
+        if len(response.body) < self.min_size:
+            return False
+        content_type = response.content_type or ""
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def compress(self, body: bytes, encoding: str) -> bytes:
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        encoder = ENCODERS[encoding]
+        if len(body) >= self.executor_threshold:
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(None, encoder, body, self.level)
+        else:
+            data = encoder(body, self.level)
+        self.cache.set(key, data)
+        return data
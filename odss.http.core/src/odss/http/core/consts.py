@@ -1 +1,34 @@
 DEFAULT_SCOPE = "default"
+
+HTTP_SERVER_FACTORY_PID = "http-server"
+
+# seconds to wait for in-flight requests of replaced server
+DEFAULT_GRACE_PERIOD = 10.0
+
+WORKER_ID_PROP = "odss.http.core.worker"
+
+# seconds to wait for in-flight requests of removed route service
+DEFAULT_DRAIN_TIMEOUT = 5.0
+
+ODSS_HTTP_VIEW_REQUESTS = "odss.http.view.requests"
+
+# bytes of streamed request body (route setting: max_body_size)
+DEFAULT_MAX_BODY_SIZE = 16 * 1024 * 1024
+
+ODSS_HTTP_REQUEST_WEBSOCKET = "odss.http.request.websocket"
+
+# seconds between websocket pings (route setting: ping_interval)
+DEFAULT_WEBSOCKET_PING_INTERVAL = 30.0
+
+# messages waiting for send per websocket (route setting: max_queue)
+DEFAULT_WEBSOCKET_QUEUE = 64
+
+ODSS_HTTP_REQUEST_EVENT_STREAM = "odss.http.request.event-stream"
+
+# seconds between keep-alive comments of idle event stream
+DEFAULT_EVENT_STREAM_PING_INTERVAL = 15.0
+
+# events waiting for send per event stream (route setting: max_queue)
+DEFAULT_EVENT_STREAM_QUEUE = 64
+
+ODSS_HTTP_REQUEST_TIMING = "odss.http.request.timing"
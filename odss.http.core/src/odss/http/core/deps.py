@@ -7,13 +7,23 @@ import typing as t
 from collections import namedtuple
 
 from odss.http.common import (
+    BodyStream,
+    EventStream,
+    HttpBadRequest,
     HttpUnprocessableContent,
-    JsonError,
+    MultipartStream,
     Request,
     RouteInfo,
-    decode_json,
+    WebSocket,
 )
-from pydantic import BaseModel, TypeAdapter, ValidationError, dataclasses as pdc
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from .consts import (
+    DEFAULT_MAX_BODY_SIZE,
+    ODSS_HTTP_REQUEST_EVENT_STREAM,
+    ODSS_HTTP_REQUEST_WEBSOCKET,
+)
+from .streams import RequestBodyStream, RequestMultipartStream
 
 Field: t.TypeAlias = tuple[TypeAdapter, t.Any, bool]
 
@@ -59,26 +69,58 @@ class RouteResolver(AbstractResolver):
         return {self.name: context.request}
 
 
+class WebSocketResolver(AbstractResolver):
+    def resolve(self, context: IncjectContext):
+        return {self.name: context.request[ODSS_HTTP_REQUEST_WEBSOCKET]}
+
+
+class EventStreamResolver(AbstractResolver):
+    def resolve(self, context: IncjectContext):
+        return {self.name: context.request[ODSS_HTTP_REQUEST_EVENT_STREAM]}
+
+
 class BodyResolver(AbstractResolver):
     def __init__(self, name: str, model: t.Any):
         super().__init__(name)
-        model_class = model if not dc.is_dataclass(model) else pdc.dataclass(model)
-        self.model = t.cast(t.Callable, model_class)
+        # built once per route: JSON bytes are validated without intermediate dict
+        self.adapter = TypeAdapter(model)
 
     async def resolve(self, context: IncjectContext):
         request = context.request
         if request.method in ["POST", "PUT", "PATCH", "DELETE"]:
-            value = None
             if request.content_type == "application/json":
                 data = await request.read()
-                value = decode_json(data)
+                if data:
+                    return {self.name: self.validate_json(data)}
             elif "multipart/form-data" in request.content_type:
                 value = await request.post()
-            if value:
-                obj = self.model(value)
-                return {self.name: obj}
+                if value:
+                    return {self.name: self.adapter.validate_python(dict(value))}
         return {}
 
+    def validate_json(self, data: bytes) -> t.Any:
+        try:
+            return self.adapter.validate_json(data)
+        except ValidationError as ex:
+            # body is not JSON at all: bad request, not invalid content
+            if any(error["type"] == "json_invalid" for error in ex.errors()):
+                raise HttpBadRequest("Problem with decode json") from ex
+            raise
+
+
+class StreamResolver(AbstractResolver):
+    """
+    Inject request body as stream, without buffering of whole body.
+    """
+
+    def __init__(self, name: str, stream_class: t.Callable):
+        super().__init__(name)
+        self.stream_class = stream_class
+
+    def resolve(self, context: IncjectContext):
+        max_size = context.route.get("max_body_size", DEFAULT_MAX_BODY_SIZE)
+        return {self.name: self.stream_class(context.request, max_size)}
+
 
 class AbstractFieldResolver(AbstractResolver):
     def __init__(self, name: str, field: Field):
@@ -163,6 +205,18 @@ def check_system_field(deps: list[t.Any], param: inspect.Parameter) -> bool:
     elif param.annotation == RouteInfo:
         deps.append(RouteResolver(param.name))
         return True
+    elif param.annotation == WebSocket:
+        deps.append(WebSocketResolver(param.name))
+        return True
+    elif param.annotation == EventStream:
+        deps.append(EventStreamResolver(param.name))
+        return True
+    elif param.annotation == BodyStream:
+        deps.append(StreamResolver(param.name, RequestBodyStream))
+        return True
+    elif param.annotation == MultipartStream:
+        deps.append(StreamResolver(param.name, RequestMultipartStream))
+        return True
     return False
 
 
@@ -191,8 +245,6 @@ async def resolve_dependency(
             values.update(valid_values)
         except ValidationError as error:
             all_errors.append(format_error(error, field.name))
-        except JsonError as ex:
-            raise HttpUnprocessableContent() from ex
         if all_errors:
             raise RequestValidationError(all_errors)
     return values
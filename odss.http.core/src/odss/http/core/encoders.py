@@ -8,11 +8,51 @@ import uuid
 from re import Pattern
 from types import GeneratorType
 
+from odss.http.common import encode_json
+from pydantic import BaseModel, PydanticSchemaGenerationError, TypeAdapter
+from pydantic_core import PydanticSerializationError
+
+Serializer = t.Callable[[t.Any], bytes]
+
 
 def serialize_response(obj: t.Any) -> bytes:
     return serialize_to_jsonable(obj)
 
 
+def create_serializer(annotation: t.Any) -> Serializer | None:
+    """
+    Compile JSON serializer from return annotation of handler.
+
+    Only annotations with pydantic models (also nested in typed collections)
+    are compiled, other ones use serialize_to_jsonable: pydantic would change
+    JSON of dataclasses (e.g. Decimal as string, timedelta as ISO duration).
+    """
+    if annotation is None or not has_schema_type(annotation):
+        return None
+    try:
+        adapter = TypeAdapter(annotation)
+    except PydanticSchemaGenerationError:
+        return None
+    expected = annotation if isinstance(annotation, type) else None
+
+    def serialize(obj: t.Any) -> bytes:
+        if expected is None or isinstance(obj, expected):
+            try:
+                return adapter.dump_json(obj, warnings=False)
+            except PydanticSerializationError:
+                pass
+        # returned value does not match annotation
+        return encode_json(serialize_to_jsonable(obj)).encode()
+
+    return serialize
+
+
+def has_schema_type(annotation: t.Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(has_schema_type(arg) for arg in t.get_args(annotation))
+
+
 def serialize_to_jsonable(obj: t.Any):
     if dc.is_dataclass(obj):
         return serialize_to_jsonable(dc.asdict(obj))
@@ -1,17 +1,120 @@
 import asyncio
 import functools
 import logging
+import os
+import socket
+import stat
+import time
 import typing as t
 
 from aiohttp import web
 from odss.http.common import IHttpServerEngineFactory, Response, RouteInfo, HttpError
 
+from .timing import get_timing
+
 logger = logging.getLogger(__name__)
 
+SD_LISTEN_FDS_START = 3
+
+
+def get_listen_fd(fd: int | str) -> int:
+    """
+    Return file descriptor of inherited socket.
+
+    Value "systemd" (or "systemd:<index>") means socket passed by systemd
+    socket activation (LISTEN_FDS / LISTEN_PID environment variables).
+    """
+    if isinstance(fd, int):
+        return fd
+    if fd.isdigit():
+        return int(fd)
+    name, _, index = fd.partition(":")
+    if name != "systemd":
+        raise ValueError(f"Unknown socket descriptor: {fd}")
+    if int(os.environ.get("LISTEN_PID", os.getpid())) != os.getpid():
+        raise ValueError("Sockets passed by systemd belong to other process")
+    count = int(os.environ.get("LISTEN_FDS", 0))
+    idx = int(index or 0)
+    if idx >= count:
+        raise ValueError(f"Not found systemd socket: {idx} (LISTEN_FDS={count})")
+    return SD_LISTEN_FDS_START + idx
+
+
+def format_listener(
+    host: str | None = None,
+    port: int | None = None,
+    path: str | None = None,
+    fd: int | str | None = None,
+) -> str:
+    if path:
+        return f"unix:{path}"
+    if fd is not None:
+        return f"fd:{fd}"
+    return f"http://{host}:{port}"
+
+
+def has_listener(props: t.Mapping[str, t.Any]) -> bool:
+    return bool(
+        ("host" in props and "port" in props)
+        or props.get("path")
+        or props.get("fd") is not None
+    )
+
+
+def remove_stale_socket(path: str) -> None:
+    """
+    Remove unix socket file left by crashed server: nobody listens on it.
+    Other files and sockets in use are kept (bind fails on them).
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            logger.info("Remove stale unix socket: %s", path)
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def bind_unix_socket(path: str) -> socket.socket:
+    # bound here, not by asyncio: the socket file is removed only by its owner
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
 
 class ServerEngineFactory(IHttpServerEngineFactory):
-    def create(self, request_handler: t.Callable, host: str, port: int):
-        return ServerEngine(request_handler, host, port)
+    def create(self, request_handler: t.Callable, host: str, port: int, **options):
+        return ServerEngine(request_handler, host, port, **options)
+
+
+def to_web_response(response: Response) -> web.Response:
+    """
+    Convert odss response. Body is always passed as bytes, so aiohttp writes
+    it directly instead of wrapping (and encoding again) in payload object.
+    """
+    response.finish()
+    body = response.body
+    content_type = response.content_type
+    if isinstance(body, str):
+        body = body.encode(response.charset or "utf-8")
+        content_type = content_type or "text/plain"
+    return web.Response(
+        body=body,
+        status=response.code,
+        content_type=content_type,
+        charset=response.charset,
+        headers=response.headers,
+    )
 
 
 class Application(web.Application):
@@ -24,16 +127,14 @@ class Application(web.Application):
         request._match_info = match_info
         try:
             response = await self.request_handler(match_info.handler, request)
-            response.finish()
-            return web.Response(
-                body=response.body,
-                status=response.code,
-                content_type=response.content_type,
-                charset=response.charset,
-                headers=response.headers,
-            )
+            if isinstance(response, web.StreamResponse):
+                # already sent by handler, e.g. websocket
+                return response
+            start = time.perf_counter()
+            web_response = to_web_response(response)
         except HttpError as ex:
-            return web.json_response(
+            start = time.perf_counter()
+            web_response = web.json_response(
                 ex.serialize(),
                 status=ex.code,
                 reason=ex.status,
@@ -41,29 +142,94 @@ class Application(web.Application):
                 # charset=ex.charset,
                 headers=ex.headers,
             )
+        timing = get_timing(request)
+        if timing is not None:
+            timing.add("conversion", time.perf_counter() - start)
+            timing.finish(request, web_response.headers)
+        return web_response
 
 
 class ServerEngine:
     def __init__(
-        self, request_handler: t.Callable, host: str = "0.0.0.0", port: int = 8765
+        self,
+        request_handler: t.Callable,
+        host: str = "0.0.0.0",
+        port: int = 8765,
+        reuse_port: bool = False,
+        path: str | None = None,
+        fd: int | str | None = None,
     ):
         self.request_handler = request_handler
         self.host = host
         self.port = port
+        self.reuse_port = reuse_port
+        self.path = path
+        self.fd = fd
+        self.name = format_listener(host, port, path, fd)
+        # inode of bound unix socket: removed on close if still the same file
+        self.socket_inode: int | None = None
 
     async def open(self):
         self.app = Application(self.request_handler)
         self.app._router.freeze = lambda: None  # remove freeze
         self.runner = web.AppRunner(self.app)
         await self.runner.setup()
-        self.site = web.TCPSite(self.runner, self.host, self.port, ssl_context=None)
+        self.site = self._create_site()
         await self.site.start()
+        if self.path:
+            self.socket_inode = os.stat(self.path).st_ino
+
+    def _create_site(self) -> web.BaseSite:
+        if self.fd is not None:
+            # work on duplicate, so the inherited socket stays open for next server
+            sock = socket.socket(fileno=os.dup(get_listen_fd(self.fd)))
+            sock.setblocking(False)
+            return web.SockSite(self.runner, sock)
+        if self.path:
+            remove_stale_socket(self.path)
+            return web.SockSite(self.runner, bind_unix_socket(self.path))
+        return web.TCPSite(
+            self.runner,
+            self.host,
+            self.port,
+            ssl_context=None,
+            reuse_port=self.reuse_port or None,
+        )
+
+    def get_fileno(self) -> int | None:
+        """Return descriptor of listening socket (used to hand over the socket)"""
+        server = getattr(self.site, "_server", None)
+        if server is not None and server.sockets:
+            return server.sockets[0].fileno()
+        return None
+
+    def hand_over(self) -> None:
+        """Listening socket is taken over by next server: keep its unix socket file"""
+        self.socket_inode = None
+
+    async def stop(self):
+        """Stop accepting new connections"""
+        if self.site is not None:
+            logger.info("Stop listening http server %s", self.name)
+            await self.site.stop()
+            self.site = None
+            self._remove_socket()
+
+    def _remove_socket(self) -> None:
+        inode, self.socket_inode = self.socket_inode, None
+        if inode is None:
+            return
+        # path could be taken over by socket of the next server
+        try:
+            if os.stat(self.path).st_ino == inode:
+                os.unlink(self.path)
+        except FileNotFoundError:
+            pass
 
     async def close(self):
-        logger.info("Stop http server http://%s:%d", self.host, self.port)
-        await self.site.stop()
-        await self.runner.shutdown()
-        self.site = None
+        logger.info("Stop http server %s", self.name)
+        await self.stop()
+        await self.runner.cleanup()
         self.runner = None
         self.app = None
 
@@ -89,11 +255,27 @@ class ServerEngine:
                 route_info.name,
             )
             resource = app_route.resource
-            resource._routes.remove(app_route)
+            remove_resource_route(resource, app_route)
             if not resource._routes and self.app:
                 router = self.app.router
                 router._resources.remove(resource)
+                if hasattr(router, "unindex_resource"):
+                    router.unindex_resource(resource)
                 if resource.name:
                     del router._named_resources[resource.name]
 
         return functools.partial(unregister_route, app_route)
+
+
+def remove_resource_route(resource, app_route) -> None:
+    routes = resource._routes
+    if isinstance(routes, list):
+        routes.remove(app_route)
+        return
+    # aiohttp>=3.10 keeps routes by method
+    if getattr(resource, "_any_route", None) is app_route:
+        resource._any_route = None
+    for method, route in list(routes.items()):
+        if route is app_route:
+            del routes[method]
+            resource._allowed_methods.discard(method)
@@ -1,31 +1,165 @@
 import asyncio
+import copy
 import logging
+import time
 import typing as t
 from functools import wraps
 
 from odss.http.common import JsonResponse, Request, Response
 
+from .consts import (
+    DEFAULT_EVENT_STREAM_PING_INTERVAL,
+    DEFAULT_EVENT_STREAM_QUEUE,
+    DEFAULT_WEBSOCKET_PING_INTERVAL,
+    DEFAULT_WEBSOCKET_QUEUE,
+    ODSS_HTTP_REQUEST_EVENT_STREAM,
+    ODSS_HTTP_REQUEST_WEBSOCKET,
+)
 from .deps import get_dependency, resolve_dependency
-from .encoders import serialize_response
+from .encoders import create_serializer, serialize_response
+from .sse import EventStreamConnection, EventStreamHub
+from .timing import get_timing
+from .websockets import WebSocketConnection, WebSocketHub
 
 logger = logging.getLogger(__name__)
 
 
+FlightKey = tuple[str, ...]
+
+
 class ViewSettings(t.TypedDict):
     prefix: str
 
 
+class SingleFlight:
+    """
+    Share one execution of handler between concurrent identical requests.
+    """
+
+    def __init__(self, vary: t.Iterable[str] = ()) -> None:
+        self.vary = tuple(vary)
+        self.calls: dict[FlightKey, asyncio.Future] = {}
+        self.shared = 0
+
+    def get_key(self, request: Request) -> FlightKey:
+        headers = request.headers
+        return (request.method, request.path_qs) + tuple(
+            headers.get(name, "") for name in self.vary
+        )
+
+    async def __call__(self, request: Request, handler: t.Callable) -> Response:
+        if request.method not in ("GET", "HEAD"):
+            return await handler(request)
+
+        key = self.get_key(request)
+        call = self.calls.get(key)
+        if call is None:
+            # own task: cancel of first request must not break others
+            call = asyncio.ensure_future(handler(request))
+            self.calls[key] = call
+            call.add_done_callback(lambda _: self.calls.pop(key, None))
+        else:
+            self.shared += 1
+        # middlewares can modify response, every request gets own copy
+        return clone_response(await asyncio.shield(call))
+
+
+def clone_response(response: Response) -> Response:
+    clone = copy.copy(response)
+    clone.headers = response.headers.copy()
+    clone.cookies = copy.deepcopy(response.cookies)
+    return clone
+
+
 def create_request_handler(path, props, handler) -> t.Callable:
     deps = get_dependency(path, handler)
+    serializer = create_serializer(deps.return_field)
 
     @wraps(handler)
     async def request_handler(request: Request):
+        timing = get_timing(request)
+        start = time.perf_counter()
         values = await resolve_dependency(deps, request, props)
+        resolved = time.perf_counter()
         response = handler(**values)
         if asyncio.iscoroutine(response):
             response = await response
+        handled = time.perf_counter()
         if not isinstance(response, Response):
-            response = JsonResponse(body=serialize_response(response))
+            if serializer is not None:
+                response = Response(serializer(response), content_type="json")
+            else:
+                response = JsonResponse(body=serialize_response(response))
+        if timing is not None:
+            timing.add("resolve", resolved - start)
+            timing.add("handler", handled - resolved)
+            timing.add("serialize", time.perf_counter() - handled)
         return response
 
+    single_flight = props.get("single_flight")
+    if single_flight:
+        flight = SingleFlight(props.get("single_flight_vary", ()))
+
+        @wraps(handler)
+        async def single_flight_handler(request: Request):
+            return await flight(request, request_handler)
+
+        return single_flight_handler
+
     return request_handler
+
+
+def create_websocket_handler(
+    path, props, handler, hub: WebSocketHub, view: t.Any
+) -> t.Callable:
+    deps = get_dependency(path, handler)
+    ping_interval = props.get("ping_interval", DEFAULT_WEBSOCKET_PING_INTERVAL)
+    idle_timeout = props.get("idle_timeout")
+    max_queue = props.get("max_queue", DEFAULT_WEBSOCKET_QUEUE)
+
+    @wraps(handler)
+    async def websocket_handler(request: Request):
+        connection = WebSocketConnection(
+            request, hub, view, ping_interval, idle_timeout, max_queue
+        )
+        request[ODSS_HTTP_REQUEST_WEBSOCKET] = connection
+        # invalid parameters are rejected before upgrade of connection
+        values = await resolve_dependency(deps, request, props)
+        await connection.open()
+        try:
+            result = handler(**values)
+            if asyncio.iscoroutine(result):
+                await result
+        finally:
+            await connection.close()
+        return connection.response
+
+    return websocket_handler
+
+
+def create_event_stream_handler(
+    path, props, handler, hub: EventStreamHub, connections: set
+) -> t.Callable:
+    deps = get_dependency(path, handler)
+    ping_interval = props.get("ping_interval", DEFAULT_EVENT_STREAM_PING_INTERVAL)
+    max_queue = props.get("max_queue", DEFAULT_EVENT_STREAM_QUEUE)
+
+    @wraps(handler)
+    async def event_stream_handler(request: Request):
+        connection = EventStreamConnection(
+            request, hub, connections, ping_interval, max_queue
+        )
+        request[ODSS_HTTP_REQUEST_EVENT_STREAM] = connection
+        values = await resolve_dependency(deps, request, props)
+        await connection.open()
+        try:
+            result = handler(**values)
+            if asyncio.iscoroutine(result):
+                await result
+            # stream is open until client disconnects or server closes it
+            await connection.wait_closed()
+        finally:
+            await connection.close()
+        return connection.response
+
+    return event_stream_handler
@@ -0,0 +1,197 @@
+import collections
+import dataclasses as dc
+import logging
+import math
+import time
+import typing as t
+
+from odss.common import IBundleContext, IServiceTrackerListener, ServiceTracker
+from odss.http.common import (
+    HttpServiceUnavailable,
+    HttpTooManyRequests,
+    IHttpRouteService,
+    IHttpSecurityPolicy,
+    Request,
+)
+
+from .server import extract_handlers
+
+logger = logging.getLogger(__name__)
+
+LIMITS_SETTINGS = ("rate_limit", "max_concurrency", "max_client_concurrency")
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def acquire(self) -> float:
+        """
+        Take one token. Return 0 on success or seconds to wait for next token.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+@dc.dataclass
+class LimitCounters:
+    accepted: int = 0
+    limited: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+
+
+class RouteLimits:
+    """
+    Limits of single route created from route settings:
+        rate_limit: requests per second
+        rate_burst: size of bucket (default: max(1, rate_limit))
+        rate_limit_per: "client" (default) or "route"
+        max_concurrency: max in-flight requests of route
+        max_client_concurrency: max in-flight requests of route per client
+    """
+
+    def __init__(self, settings: dict[str, t.Any], max_clients: int) -> None:
+        self.rate = settings.get("rate_limit")
+        self.burst = settings.get("rate_burst") or max(1, self.rate or 0)
+        self.per_client = settings.get("rate_limit_per", "client") == "client"
+        self.concurrency = settings.get("max_concurrency")
+        self.client_concurrency = settings.get("max_client_concurrency")
+        self.max_clients = max_clients
+        self.buckets: collections.OrderedDict[str, TokenBucket] = (
+            collections.OrderedDict()
+        )
+        self.clients: dict[str, int] = {}
+        self.counters = LimitCounters()
+
+    def acquire_token(self, client: str) -> float:
+        if not self.rate:
+            return 0.0
+        key = client if self.per_client else ""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.rate, self.burst)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket.acquire()
+
+    def enter(self, client: str) -> bool:
+        if self.concurrency and self.counters.in_flight >= self.concurrency:
+            return False
+        count = self.clients.get(client, 0)
+        if self.client_concurrency and count >= self.client_concurrency:
+            return False
+        self.counters.in_flight += 1
+        self.clients[client] = count + 1
+        return True
+
+    def leave(self, client: str) -> None:
+        self.counters.in_flight -= 1
+        count = self.clients[client] - 1
+        if count:
+            self.clients[client] = count
+        else:
+            del self.clients[client]
+
+
+class LimitsMiddleware:
+    """
+    Enforce per route rate (429) and concurrency (503) limits before handler.
+
+    Client is identified by security policy (if set) or remote address.
+    """
+
+    def __init__(self, max_clients: int = 10000) -> None:
+        self.max_clients = max_clients
+        self.policy: IHttpSecurityPolicy | None = None
+        self.routes: dict[str, RouteLimits] = {}
+
+    async def __call__(self, request: Request, handler):
+        settings = getattr(request, "settings", {})
+        if not any(settings.get(name) for name in LIMITS_SETTINGS):
+            return await handler(request)
+
+        name = settings["name"]
+        limits = self.routes.get(name)
+        if limits is None:
+            limits = self.routes[name] = RouteLimits(settings, self.max_clients)
+
+        client = self.get_client(request)
+        wait = limits.acquire_token(client)
+        if wait:
+            limits.counters.limited += 1
+            raise HttpTooManyRequests(headers={"Retry-After": str(math.ceil(wait))})
+
+        if not limits.enter(client):
+            limits.counters.rejected += 1
+            raise HttpServiceUnavailable(headers={"Retry-After": "1"})
+
+        limits.counters.accepted += 1
+        try:
+            return await handler(request)
+        finally:
+            limits.leave(client)
+
+    def get_client(self, request: Request) -> str:
+        if self.policy is not None:
+            identity = self.policy.identify(request)
+            if identity:
+                return identity
+        return request.remote or ""
+
+    def invalidate(self, name: str) -> bool:
+        """
+        Drop state of unbound route: rebound route starts with new limits
+        """
+        return self.routes.pop(name, None) is not None
+
+    def get_counters(self) -> dict[str, LimitCounters]:
+        return {name: limits.counters for name, limits in self.routes.items()}
+
+
+class SecurityPolicyTracker(ServiceTracker, IServiceTrackerListener):
+    def __init__(self, ctx: IBundleContext, middleware: LimitsMiddleware):
+        super().__init__(self, ctx, IHttpSecurityPolicy)
+        self.middleware = middleware
+
+    def on_adding_service(self, reference, service):
+        self.middleware.policy = service
+
+    def on_modified_service(self, reference, service):
+        pass
+
+    def on_removed_service(self, reference, service):
+        if self.middleware.policy is service:
+            self.middleware.policy = None
+
+
+class RouteServiceTracker(ServiceTracker, IServiceTrackerListener):
+    """
+    Invalidate limits of routes of removed route services
+    """
+
+    def __init__(self, ctx: IBundleContext, middleware: LimitsMiddleware):
+        super().__init__(self, ctx, IHttpRouteService)
+        self.middleware = middleware
+
+    def on_adding_service(self, reference, service):
+        pass
+
+    def on_modified_service(self, reference, service):
+        pass
+
+    def on_removed_service(self, reference, service):
+        for _, props in extract_handlers(service):
+            self.middleware.invalidate(props["name"])
@@ -1,3 +1,4 @@
+import asyncio
 import functools
 import inspect
 import logging
@@ -6,13 +7,22 @@ import typing as t
 from odss.http.common import (
     ODSS_HTTP_HANDLER,
     ODSS_HTTP_VIEW,
+    HttpServiceUnavailable,
     IHttpServer,
     IHttpServerEngineFactory,
     RouteInfo,
 )
 
-from .handlers import create_request_handler
+from .consts import ODSS_HTTP_VIEW_REQUESTS
+from .handlers import (
+    create_event_stream_handler,
+    create_request_handler,
+    create_websocket_handler,
+)
 from .middewares import Middlewares
+from .sse import EventStreamConnection, EventStreamHub
+from .timing import RequestTimings
+from .websockets import WebSocketHub
 
 logger = logging.getLogger(__name__)
 
@@ -47,9 +57,43 @@ def extract_view_prefix(view: t.Any) -> str:
     return ""
 
 
+class RequestCounter:
+    """
+    Count in-flight requests.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.closing = False
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def enter(self) -> None:
+        self.count += 1
+        self.idle.clear()
+
+    def leave(self) -> None:
+        self.count -= 1
+        if not self.count:
+            self.idle.set()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
 class HttpServer(IHttpServer):
     def __init__(
-        self, engine_factory: IHttpServerEngineFactory, host: str, port: int
+        self,
+        engine_factory: IHttpServerEngineFactory,
+        host: str,
+        port: int,
+        streams: EventStreamHub | None = None,
+        timings: RequestTimings | None = None,
+        **options,
     ) -> None:
         self.middlewares = Middlewares()
         self.engine_factory = engine_factory
@@ -57,35 +101,89 @@ class HttpServer(IHttpServer):
         self.handlers: dict[t.Any, list[t.Callable]] = {}
         self.host = host
         self.port = port
+        self.options = options
+        self.requests = RequestCounter()
+        self.views_requests: dict[t.Any, RequestCounter] = {}
+        self.websockets = WebSocketHub()
+        self.streams = streams if streams is not None else EventStreamHub()
+        self.views_streams: dict[t.Any, set[EventStreamConnection]] = {}
+        self.timings = timings if timings is not None else RequestTimings()
 
     async def open(self):
         self.engine = self.engine_factory.create(
-            self.request_handler, self.host, self.port
+            self.request_handler, self.host, self.port, **self.options
         )
         await self.engine.open()
 
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop accepting new connections and wait (max timeout seconds)
+        for in-flight requests.
+        """
+        await self.engine.stop()
+        # websockets and event streams never end by themselves,
+        # clients have to reconnect
+        await self.websockets.close()
+        await self.close_streams()
+        if not await self.requests.wait(timeout):
+            logger.warning(
+                "Timeout (%ss) of draining %d request(s)", timeout, self.requests.count
+            )
+            return False
+        return True
+
+    def get_fileno(self) -> int | None:
+        return self.engine.get_fileno() if self.engine else None
+
+    def hand_over(self) -> None:
+        if self.engine is not None:
+            self.engine.hand_over()
+
     async def close(self):
+        await self.websockets.close()
+        await self.close_streams()
         await self.engine.close()
         self.middlewares.reset()
         self.engine_factory = None
         self.engine = None
 
+    async def close_streams(self, view: t.Any = None) -> None:
+        views = [view] if view is not None else list(self.views_streams)
+        connections = [
+            connection
+            for key in views
+            for connection in list(self.views_streams.get(key, ()))
+        ]
+        await asyncio.gather(*[connection.close() for connection in connections])
+
     def add_route(self, route):
         return self.engine.add_route(route)
 
-    def add_middleware(
-        self, middleware: t.Callable, priority: tuple[int, int]
-    ):
+    def add_middleware(self, middleware: t.Callable, priority: tuple[int, int]):
         return self.middlewares.add(middleware, priority)
 
-    def request_handler(self, handler, request):
+    async def request_handler(self, handler, request):
+        view_requests = getattr(handler, ODSS_HTTP_VIEW_REQUESTS, None)
+        if view_requests is not None and view_requests.closing:
+            raise HttpServiceUnavailable(headers={"Retry-After": "1"})
+
         request.is_secure = request.secure
         settings = getattr(handler, ODSS_HTTP_HANDLER, {})
         setattr(request, "settings", settings)
+        self.timings.start(request, settings)
 
         for middleware, _ in self.middlewares.all():
             handler = functools.partial(middleware, handler=handler)
-        return handler(request)
+
+        self.requests.enter()
+        if view_requests is not None:
+            view_requests.enter()
+        try:
+            return await handler(request)
+        finally:
+            self.requests.leave()
+            if view_requests is not None:
+                view_requests.leave()
 
     def bind_handler(self, view: t.Any):
         if view in self.handlers:
@@ -94,14 +192,28 @@ class HttpServer(IHttpServer):
 
         prefix = extract_view_prefix(view)
         routes = []
+        view_requests = RequestCounter()
+        view_streams: set[EventStreamConnection] = set()
         for handler, props in extract_handlers(view):
             path = prefix + props["path"]
-            handler = create_request_handler(path, props, handler)
+            if props.get("websocket"):
+                handler = create_websocket_handler(
+                    path, props, handler, self.websockets, view
+                )
+            elif props.get("sse"):
+                handler = create_event_stream_handler(
+                    path, props, handler, self.streams, view_streams
+                )
+            else:
+                handler = create_request_handler(path, props, handler)
+            setattr(handler, ODSS_HTTP_VIEW_REQUESTS, view_requests)
             route = RouteInfo(props["name"], props["method"], path, handler, props)
             unregister = self.add_route(route)
             routes.append(unregister)
 
         self.handlers[view] = routes
+        self.views_requests[view] = view_requests
+        self.views_streams[view] = view_streams
         return True
 
     def unbind_handler(self, view: t.Any):
@@ -114,6 +226,26 @@ class HttpServer(IHttpServer):
             unregister()
 
         del self.handlers[view]
+        del self.views_requests[view]
+        del self.views_streams[view]
 
         return True
 
+    async def drain_handler(self, view: t.Any, timeout: float) -> bool:
+        """
+        Reject new requests of view (503) and wait (max timeout seconds)
+        for running ones before unbind.
+        """
+        view_requests = self.views_requests.get(view)
+        if view_requests is not None:
+            view_requests.closing = True
+            await self.websockets.close_view(view)
+            await self.close_streams(view)
+            if not await view_requests.wait(timeout):
+                logger.warning(
+                    "Timeout (%ss) of draining %d request(s) of: %s",
+                    timeout,
+                    view_requests.count,
+                    view,
+                )
+        return self.unbind_handler(view)
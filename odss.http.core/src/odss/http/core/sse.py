@@ -0,0 +1,221 @@
+import asyncio
+import logging
+
+from aiohttp import web
+from odss.common import OBJECTCLASS, SERVICE_ID, BundleEvent, ServiceEvent
+from odss.http.common import (
+    ODSS_HTTP_FRAMEWORK_EVENTS,
+    EventStream,
+    IEventStreamHub,
+    Request,
+    encode_json,
+)
+
+logger = logging.getLogger(__name__)
+
+PING = b": ping\n\n"
+# queued after the last frame: writer ends when it is reached
+CLOSE = None
+FLUSH_TIMEOUT = 1.0
+
+
+def format_event(data: str, event: str | None = None, id: str | None = None) -> bytes:
+    lines = []
+    if event is not None:
+        lines.append(f"event: {event}")
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class EventStreamConnection(EventStream):
+    """
+    Event stream with bounded buffer written by background task.
+
+    Handler waits on send() when buffer is full, publish never waits:
+    stream with full buffer is closed as slow consumer.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        hub: "EventStreamHub",
+        connections: set["EventStreamConnection"],
+        ping_interval: float,
+        max_queue: int,
+    ) -> None:
+        self.request = request
+        self.hub = hub
+        self.connections = connections
+        self.ping_interval = ping_interval
+        self.response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            }
+        )
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(max_queue)
+        self.channels: set[str] = set()
+        self.writer: asyncio.Task | None = None
+        self.closed = False
+
+    async def open(self) -> None:
+        await self.response.prepare(self.request)
+        self.writer = asyncio.create_task(self._write())
+        self.connections.add(self)
+
+    async def _write(self) -> None:
+        while True:
+            try:
+                frame = await asyncio.wait_for(self.queue.get(), self.ping_interval)
+            except asyncio.TimeoutError:
+                frame = PING
+            if frame is CLOSE:
+                return
+            try:
+                await self.response.write(frame)
+            except ConnectionError as ex:
+                logger.debug("Event stream disconnected: %s", ex)
+                return
+
+    async def wait_closed(self) -> None:
+        # wait() does not re-raise result of writer (nor cancel it)
+        if self.writer is not None:
+            await asyncio.wait([self.writer])
+
+    async def send(
+        self, data: str, event: str | None = None, id: str | None = None
+    ) -> None:
+        if self.closed:
+            raise ConnectionResetError("Event stream is closed")
+        await self.queue.put(format_event(data, event, id))
+
+    def push(self, frame: bytes) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.warning("Close slow event stream consumer: %s", self.request.remote)
+            self._detach()
+            self._abort()
+            return False
+        return True
+
+    def join(self, channel: str) -> None:
+        self.hub.join(channel, self)
+
+    def leave(self, channel: str) -> None:
+        self.hub.leave(channel, self)
+
+    async def close(self, flush: bool = True) -> None:
+        if self.closed:
+            return
+        self._detach()
+        writer = self.writer
+        if writer is None or writer.done():
+            return
+        if flush:
+            try:
+                self.queue.put_nowait(CLOSE)
+            except asyncio.QueueFull:
+                pass
+            else:
+                await asyncio.wait([writer], timeout=FLUSH_TIMEOUT)
+                if writer.done():
+                    return
+        self._abort()
+
+    def _detach(self) -> None:
+        self.closed = True
+        self.hub.remove(self)
+        self.connections.discard(self)
+
+    def _abort(self) -> None:
+        # drop buffered frames: writer waiting for frame gets CLOSE at once,
+        # writer blocked by slow client fails on aborted transport
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(CLOSE)
+        transport = self.request.transport
+        if transport is not None:
+            transport.abort()
+
+
+class EventStreamHub(IEventStreamHub):
+    """
+    Fan out events to streams subscribed to channel.
+
+    Event is serialized once, the same frame is queued to every stream.
+    """
+
+    def __init__(self) -> None:
+        self.channels: dict[str, set[EventStreamConnection]] = {}
+
+    def has_subscribers(self, channel: str) -> bool:
+        return channel in self.channels
+
+    def join(self, channel: str, connection: EventStreamConnection) -> None:
+        self.channels.setdefault(channel, set()).add(connection)
+        connection.channels.add(channel)
+
+    def leave(self, channel: str, connection: EventStreamConnection) -> None:
+        connection.channels.discard(channel)
+        connections = self.channels.get(channel)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.channels[channel]
+
+    def remove(self, connection: EventStreamConnection) -> None:
+        for channel in list(connection.channels):
+            self.leave(channel, connection)
+
+    def publish(
+        self,
+        channel: str,
+        data: str,
+        event: str | None = None,
+        id: str | None = None,
+    ) -> int:
+        connections = self.channels.get(channel)
+        if not connections:
+            return 0
+        frame = format_event(data, event, id)
+        count = 0
+        for connection in list(connections):
+            if connection.push(frame):
+                count += 1
+        return count
+
+
+class FrameworkEventsPublisher:
+    """
+    Publish bundle and service events to ODSS_HTTP_FRAMEWORK_EVENTS channel.
+    """
+
+    def __init__(self, hub: EventStreamHub, channel: str = ODSS_HTTP_FRAMEWORK_EVENTS):
+        self.hub = hub
+        self.channel = channel
+
+    def bundle_changed(self, event: BundleEvent) -> None:
+        if not self.hub.has_subscribers(self.channel):
+            return
+        bundle = event.bundle
+        data = {"kind": event.kind, "bundle": {"id": bundle.id, "name": bundle.name}}
+        self.hub.publish(self.channel, encode_json(data), event="bundle")
+
+    def service_changed(self, event: ServiceEvent) -> None:
+        if not self.hub.has_subscribers(self.channel):
+            return
+        reference = event.reference
+        data = {
+            "kind": event.kind,
+            "service": {
+                "id": reference.get_property(SERVICE_ID),
+                "objectclass": list(reference.get_property(OBJECTCLASS)),
+            },
+        }
+        self.hub.publish(self.channel, encode_json(data), event="service")
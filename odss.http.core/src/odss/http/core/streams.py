@@ -0,0 +1,96 @@
+import typing as t
+
+from aiohttp import BodyPartReader
+from odss.http.common import (
+    BodyStream,
+    HttpBadRequest,
+    HttpPayloadTooLarge,
+    MultipartPart,
+    MultipartStream,
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class SizeLimit:
+    """
+    Count bytes read from request body, raise 413 after max_size.
+    """
+
+    def __init__(self, max_size: int | None) -> None:
+        self.max_size = max_size
+        self.size = 0
+
+    def check_length(self, length: int | None) -> None:
+        if self.max_size is not None and length is not None and length > self.max_size:
+            raise HttpPayloadTooLarge()
+
+    def add(self, size: int) -> None:
+        self.size += size
+        self.check_length(self.size)
+
+
+async def read_all(stream: t.AsyncIterable[bytes]) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+class RequestBodyStream(BodyStream):
+    def __init__(self, request, max_size: int | None, chunk_size: int = CHUNK_SIZE):
+        self.request = request
+        self.limit = SizeLimit(max_size)
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self) -> t.AsyncIterator[bytes]:
+        self.limit.check_length(self.request.content_length)
+        async for chunk in self.request.content.iter_chunked(self.chunk_size):
+            self.limit.add(len(chunk))
+            yield chunk
+
+    async def read(self) -> bytes:
+        return await read_all(self)
+
+
+class RequestMultipartPart(MultipartPart):
+    def __init__(self, part, limit: SizeLimit, chunk_size: int):
+        self.part = part
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self.name = part.name
+        self.filename = part.filename
+        self.headers = part.headers
+
+    async def __aiter__(self) -> t.AsyncIterator[bytes]:
+        while True:
+            chunk = await self.part.read_chunk(self.chunk_size)
+            if not chunk:
+                break
+            self.limit.add(len(chunk))
+            yield chunk
+
+    async def read(self) -> bytes:
+        return await read_all(self)
+
+    async def skip(self) -> None:
+        # not consumed data is still counted against the size limit
+        async for _ in self:
+            pass
+
+
+class RequestMultipartStream(MultipartStream):
+    def __init__(self, request, max_size: int | None, chunk_size: int = CHUNK_SIZE):
+        self.request = request
+        self.limit = SizeLimit(max_size)
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self) -> t.AsyncIterator[MultipartPart]:
+        self.limit.check_length(self.request.content_length)
+        reader = await self.request.multipart()
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            if not isinstance(part, BodyPartReader):
+                raise HttpBadRequest("Nested multipart is not supported")
+            stream_part = RequestMultipartPart(part, self.limit, self.chunk_size)
+            yield stream_part
+            await stream_part.skip()
@@ -0,0 +1,120 @@
+import bisect
+import logging
+import time
+import typing as t
+
+from .consts import ODSS_HTTP_REQUEST_TIMING
+
+logger = logging.getLogger(__name__)
+
+# upper bounds of histogram buckets in milliseconds
+BUCKETS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def serialize(self) -> dict[str, t.Any]:
+        buckets = {str(bound): count for bound, count in zip(BUCKETS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class RequestTiming:
+    """
+    Durations (seconds) of request phases.
+
+    "middleware" is the rest of total time not measured by other phases.
+    """
+
+    __slots__ = ("timings", "route", "server_timing", "start", "phases")
+
+    def __init__(self, timings: "RequestTimings", route: str, server_timing: bool):
+        self.timings = timings
+        self.route = route
+        self.server_timing = server_timing
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase: str, duration: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration
+
+    def finish(self, request, headers) -> None:
+        total = time.perf_counter() - self.start
+        self.phases["middleware"] = max(0.0, total - sum(self.phases.values()))
+        self.phases["total"] = total
+        if self.server_timing:
+            headers["Server-Timing"] = ", ".join(
+                f"{phase};dur={duration * 1000:.3f}"
+                for phase, duration in self.phases.items()
+            )
+        self.timings.record(request, self)
+
+
+class RequestTimings:
+    """
+    Per route histograms (milliseconds) of request phases and slow request log.
+    """
+
+    def __init__(
+        self, slow_threshold: float | None = None, server_timing: bool = False
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.server_timing = server_timing
+        self.routes: dict[str, dict[str, Histogram]] = {}
+
+    def start(self, request, settings: dict[str, t.Any]) -> RequestTiming:
+        timing = RequestTiming(
+            self,
+            settings.get("name", ""),
+            settings.get("server_timing", self.server_timing),
+        )
+        request[ODSS_HTTP_REQUEST_TIMING] = timing
+        return timing
+
+    def record(self, request, timing: RequestTiming) -> None:
+        histograms = self.routes.get(timing.route)
+        if histograms is None:
+            histograms = self.routes[timing.route] = {}
+        for phase, duration in timing.phases.items():
+            histogram = histograms.get(phase)
+            if histogram is None:
+                histogram = histograms[phase] = Histogram()
+            histogram.observe(duration * 1000)
+
+        total = timing.phases["total"]
+        if self.slow_threshold is not None and total >= self.slow_threshold:
+            logger.warning(
+                "Slow request %s %s (%.1f ms): %s",
+                request.method,
+                request.path,
+                total * 1000,
+                ", ".join(
+                    f"{phase}={duration * 1000:.1f}ms"
+                    for phase, duration in timing.phases.items()
+                    if phase != "total"
+                ),
+            )
+
+    def get_stats(self) -> dict[str, dict[str, dict[str, t.Any]]]:
+        return {
+            route: {phase: histogram.serialize() for phase, histogram in phases.items()}
+            for route, phases in self.routes.items()
+        }
+
+
+def get_timing(request) -> RequestTiming | None:
+    try:
+        return request[ODSS_HTTP_REQUEST_TIMING]
+    except KeyError:
+        return None
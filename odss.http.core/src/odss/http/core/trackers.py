@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import typing as t
 
@@ -11,8 +12,16 @@ from odss.common import (
 )
 from odss.http.common import IHttpMiddlewareService, IHttpRouteService, IHttpServer, IHttpSecurity
 
-from .engine import ServerEngineFactory
+from .consts import (
+    DEFAULT_DRAIN_TIMEOUT,
+    DEFAULT_GRACE_PERIOD,
+    HTTP_SERVER_FACTORY_PID,
+)
+from .engine import ServerEngineFactory, format_listener, has_listener
 from .server import HttpServer
+from .sse import EventStreamHub
+from .timing import RequestTimings
+from .workers import WorkerSupervisor, get_worker_id
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +36,14 @@ class RouteTracker(ServiceTracker, IServiceTrackerListener):
         ctx: IBundleContext,
         server: IHttpServer,
         scope: str,
+        drain_timeout: float = DEFAULT_DRAIN_TIMEOUT,
     ):
         query = (
             "|(!(scope=*)(scope=default))" if scope == "default" else {"scope": scope}
         )
         super().__init__(self, ctx, IHttpRouteService, query)
         self.server = server
+        self.drain_timeout = drain_timeout
 
     def on_adding_service(self, reference, service):
         self.server.bind_handler(service)
@@ -40,8 +51,8 @@ class RouteTracker(ServiceTracker, IServiceTrackerListener):
     def on_modified_service(self, reference, service):
         pass
 
-    def on_removed_service(self, reference, service):
-        self.server.unbind_handler(service)
+    async def on_removed_service(self, reference, service):
+        await self.server.drain_handler(service, self.drain_timeout)
 
 
 class MiddlewareTracker(ServiceTracker, IServiceTrackerListener):
@@ -92,57 +103,138 @@ class ServerService:
         self.reg = None
         self.servers: dict[str, t.Any] = {}
         self.scopes: list[str] = []
+        self.retiring: set[asyncio.Task] = set()
+        # shared by all servers: publisher does not depend on configuration
+        self.streams = EventStreamHub()
+        self.timings = RequestTimings(
+            props.get("slow_request_threshold"), props.get("server_timing", False)
+        )
+        self.worker_id = get_worker_id(ctx)
+        self.supervisor = None
+        workers = int(props.get("workers", 1))
+        if self.worker_id is None and workers > 1:
+            self.supervisor = WorkerSupervisor(
+                ctx, workers - 1, props.get("worker_bundles")
+            )
 
     async def open(self):
-        if "host" in self.props and "port" in self.props:
-            await self.updated(
+        if self.supervisor:
+            await self.supervisor.open()
+        if has_listener(self.props):
+            await self._update(
                 "default", self.props, self.props.get("scope", "default")
             )
         else:
             self.reg = await self.ctx.register_service(
-                IConfigurationManagedFactory, self, {SERVICE_FACTORY_PID: "http-server"}
+                IConfigurationManagedFactory,
+                self,
+                {SERVICE_FACTORY_PID: HTTP_SERVER_FACTORY_PID},
             )
 
     async def close(self):
         if self.reg:
             await self.reg.unregister()
             self.reg = None
+        if self.supervisor:
+            await self.supervisor.close()
         for pid in list(self.servers.keys()):
             await self._remove(pid)
+        if self.retiring:
+            await asyncio.gather(*self.retiring)
 
     async def updated(self, pid: str, props=None, scope=None):
+        if self.supervisor:
+            self.supervisor.updated(pid, props)
+        await self._update(pid, props, scope)
+
+    async def _update(self, pid: str, props, scope=None):
         scope = scope if scope is not None else props.get("scope", "default")
-        if scope in self.scopes:
+        previous = self.servers.get(pid)
+        if scope in self.scopes and (previous is None or previous[2] != scope):
             logger.error("Server with scope: %s already running", scope)
             return
 
-        await self._remove(pid)
+        host, port = props.get("host"), props.get("port")
+        port = int(port) if port is not None else None
+        path, fd = props.get("path"), props.get("fd")
+        name = format_listener(host, port, path, fd)
+        if self.worker_id is not None and (path or fd is not None):
+            logger.info("Skip http server %s in worker %d", name, self.worker_id)
+            return
 
-        host, port = props["host"], int(props["port"])
-        self.scopes.append(scope)
-        server = HttpServer(self.engine_factory, host, port)
+        handover = previous is not None and previous[3] == name
+        if handover:
+            # the same address (or unix socket path): take over listening
+            # socket of running server
+            fd = previous[0].get_fileno()
+        reuse_port = bool(props.get("reuse_port", self.is_multiprocess()))
+        server = HttpServer(
+            self.engine_factory,
+            host,
+            port,
+            streams=self.streams,
+            timings=self.timings,
+            reuse_port=reuse_port,
+            path=path,
+            fd=fd,
+        )
         try:
-            logger.info("Start http server http://%s:%d (scope=%s)", host, port, scope)
+            logger.info("Start http server %s (scope=%s)", name, scope)
             await server.open()
-        except OSError as error:
-            logger.error("Failed to create HTTP server at port %d: %s", port, error)
-        else:
-            trackers = [
-                MiddlewareTracker(self.ctx, server, scope),
-                RouteTracker(self.ctx, server, scope),
-            ]
-            for tracker in trackers:
-                await tracker.open()
-            self.servers[pid] = (server, trackers, scope)
+        except (OSError, ValueError) as error:
+            logger.error("Failed to create HTTP server at %s: %s", name, error)
+            return
+
+        drain_timeout = float(
+            props.get(
+                "drain_timeout",
+                self.props.get("drain_timeout", DEFAULT_DRAIN_TIMEOUT),
+            )
+        )
+        trackers = [
+            MiddlewareTracker(self.ctx, server, scope),
+            RouteTracker(self.ctx, server, scope, drain_timeout),
+        ]
+        for tracker in trackers:
+            await tracker.open()
+        self.servers[pid] = (server, trackers, scope, name)
+
+        if previous is not None:
+            if handover:
+                previous[0].hand_over()
+            self.scopes.remove(previous[2])
+            grace_period = float(
+                props.get(
+                    "grace_period",
+                    self.props.get("grace_period", DEFAULT_GRACE_PERIOD),
+                )
+            )
+            task = asyncio.create_task(self._retire(previous, grace_period))
+            self.retiring.add(task)
+            task.add_done_callback(self.retiring.discard)
+        self.scopes.append(scope)
 
     async def deleted(self, pid: str):
+        if self.supervisor:
+            self.supervisor.deleted(pid)
         await self._remove(pid)
 
+    def is_multiprocess(self) -> bool:
+        return self.supervisor is not None or self.worker_id is not None
+
     async def _remove(self, pid):
         if pid in self.servers:
-            server, trackers, scope = self.servers[pid]
+            server, trackers, scope, _ = self.servers[pid]
             del self.servers[pid]
             for track in trackers:
                 await track.close()
             await server.close()
             self.scopes.remove(scope)
+
+    async def _retire(self, entry, grace_period: float):
+        server, trackers, scope, name = entry
+        logger.info("Drain http server %s (scope=%s)", name, scope)
+        await server.drain(grace_period)
+        for track in trackers:
+            await track.close()
+        await server.close()
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import typing as t
+
+from aiohttp import WSCloseCode, WSMsgType, web
+from odss.http.common import Request, WebSocket, encode_json
+
+logger = logging.getLogger(__name__)
+
+# queued after the last message: writer ends when it is reached
+CLOSE = None
+# seconds to send queued messages on close
+CLOSE_TIMEOUT = 1.0
+
+CLOSED_TYPES = (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.CLOSED, WSMsgType.ERROR)
+
+
+class WebSocketConnection(WebSocket):
+    """
+    WebSocket connection with own send queue written by background task.
+
+    Handler waits on send() when queue is full (back-pressure), broadcast
+    never waits: connection with full queue is closed as slow consumer.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        hub: "WebSocketHub",
+        view: t.Any,
+        ping_interval: float | None,
+        idle_timeout: float | None,
+        max_queue: int,
+    ) -> None:
+        self.request = request
+        self.hub = hub
+        self.view = view
+        self.idle_timeout = idle_timeout
+        self.response = web.WebSocketResponse(heartbeat=ping_interval)
+        self.queue: asyncio.Queue[str | bytes | None] = asyncio.Queue(max_queue)
+        self.groups: set[str] = set()
+        self.writer: asyncio.Task | None = None
+        self.closed = False
+
+    async def open(self) -> None:
+        await self.response.prepare(self.request)
+        self.writer = asyncio.create_task(self._write())
+        self.hub.add(self)
+
+    async def _write(self) -> None:
+        while True:
+            data = await self.queue.get()
+            if data is CLOSE:
+                return
+            try:
+                if isinstance(data, str):
+                    await self.response.send_str(data)
+                else:
+                    await self.response.send_bytes(data)
+            except ConnectionError as ex:
+                logger.debug("Problem with send message: %s", ex)
+                return
+
+    async def send(self, data: str | bytes) -> None:
+        if self.closed:
+            raise ConnectionResetError("WebSocket is closed")
+        await self.queue.put(data)
+
+    async def send_json(self, data: t.Any) -> None:
+        await self.send(encode_json(data))
+
+    def push(self, data: str | bytes) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning("Close slow websocket consumer: %s", self.request.remote)
+            self._detach()
+            self._abort()
+            return False
+        return True
+
+    async def receive(self) -> str | bytes | None:
+        while not self.closed:
+            try:
+                message = await self.response.receive(timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                await self.close(WSCloseCode.GOING_AWAY, b"Idle timeout", flush=False)
+                return None
+            if message.type in (WSMsgType.TEXT, WSMsgType.BINARY):
+                return message.data
+            if message.type in CLOSED_TYPES:
+                return None
+        return None
+
+    async def __aiter__(self) -> t.AsyncIterator[str | bytes]:
+        while True:
+            data = await self.receive()
+            if data is None:
+                return
+            yield data
+
+    def join(self, group: str) -> None:
+        self.hub.join(group, self)
+
+    def leave(self, group: str) -> None:
+        self.hub.leave(group, self)
+
+    def broadcast(self, group: str, data: str | bytes) -> int:
+        return self.hub.broadcast(group, data)
+
+    async def wait_closed(self) -> None:
+        # wait() does not re-raise result of writer (nor cancel it)
+        if self.writer is not None:
+            await asyncio.wait([self.writer])
+
+    async def close(
+        self, code: int = WSCloseCode.OK, message: bytes = b"", flush: bool = True
+    ) -> None:
+        if self.closed:
+            return
+        self._detach()
+        writer = self.writer
+        if writer is not None and not writer.done():
+            if not flush:
+                self._drop_queued()
+            try:
+                self.queue.put_nowait(CLOSE)
+            except asyncio.QueueFull:
+                pass
+            else:
+                await asyncio.wait([writer], timeout=CLOSE_TIMEOUT)
+            if not writer.done():
+                # writer is not cancelled in the middle of frame
+                self._abort()
+                await self.wait_closed()
+                return
+        if self.response.prepared:
+            await self.response.close(code=code, message=message)
+
+    def _detach(self) -> None:
+        self.closed = True
+        self.hub.remove(self)
+
+    def _drop_queued(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def _abort(self) -> None:
+        # writer waiting for message gets CLOSE at once,
+        # writer blocked by slow client fails on aborted transport
+        self._drop_queued()
+        self.queue.put_nowait(CLOSE)
+        transport = self.request.transport
+        if transport is not None:
+            transport.abort()
+
+
+class WebSocketHub:
+    """
+    All websocket connections of server grouped by view and broadcast groups.
+    """
+
+    def __init__(self) -> None:
+        self.views: dict[t.Any, set[WebSocketConnection]] = {}
+        self.groups: dict[str, set[WebSocketConnection]] = {}
+
+    def add(self, connection: WebSocketConnection) -> None:
+        self.views.setdefault(connection.view, set()).add(connection)
+
+    def remove(self, connection: WebSocketConnection) -> None:
+        for group in list(connection.groups):
+            self.leave(group, connection)
+        connections = self.views.get(connection.view)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.views[connection.view]
+
+    def join(self, group: str, connection: WebSocketConnection) -> None:
+        self.groups.setdefault(group, set()).add(connection)
+        connection.groups.add(group)
+
+    def leave(self, group: str, connection: WebSocketConnection) -> None:
+        connection.groups.discard(group)
+        connections = self.groups.get(group)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.groups[group]
+
+    def broadcast(self, group: str, data: str | bytes) -> int:
+        count = 0
+        for connection in list(self.groups.get(group, ())):
+            if connection.push(data):
+                count += 1
+        return count
+
+    async def close_view(self, view: t.Any) -> None:
+        connections = list(self.views.get(view, ()))
+        await asyncio.gather(
+            *[
+                connection.close(WSCloseCode.GOING_AWAY, b"Service stopped")
+                for connection in connections
+            ]
+        )
+
+    async def close(self) -> None:
+        for view in list(self.views):
+            await self.close_view(view)
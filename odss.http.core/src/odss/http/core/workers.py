@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+import typing as t
+from multiprocessing.connection import Connection
+
+from odss.common import (
+    SERVICE_FACTORY_PID,
+    IBundleContext,
+    IConfigurationManagedFactory,
+)
+
+from .consts import HTTP_SERVER_FACTORY_PID, WORKER_ID_PROP
+
+logger = logging.getLogger(__name__)
+
+BundleInfo = tuple[str, int | None]
+WorkerTarget = t.Callable[[int, dict[str, t.Any], list[BundleInfo], Connection], None]
+
+# bundles started by workers when "worker_bundles" is not set
+HTTP_BUNDLES_PREFIX = "odss.http."
+
+
+def get_worker_id(ctx: IBundleContext) -> int | None:
+    try:
+        return int(ctx.get_property(WORKER_ID_PROP))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def run_worker(
+    worker_id: int,
+    properties: dict[str, t.Any],
+    bundles: list[BundleInfo],
+    conn: Connection,
+) -> None:
+    """
+    Entry point of worker process. Run own framework instance with given bundles
+    and apply "http-server" configuration send by supervisor.
+    """
+    try:
+        asyncio.run(_run_worker(worker_id, properties, bundles, conn))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _run_worker(
+    worker_id: int,
+    properties: dict[str, t.Any],
+    bundles: list[BundleInfo],
+    conn: Connection,
+) -> None:
+    from odss.core import Framework
+
+    properties = properties.copy()
+    properties[WORKER_ID_PROP] = worker_id
+
+    framework = Framework(properties)
+    for name, start_level in bundles:
+        bundle = await framework.install_bundle(name)
+        if start_level:
+            bundle.start_level = start_level
+
+    loop = asyncio.get_running_loop()
+    messages: asyncio.Queue[tuple] = asyncio.Queue()
+
+    def on_message():
+        try:
+            while conn.poll():
+                messages.put_nowait(conn.recv())
+        except EOFError:
+            loop.remove_reader(conn.fileno())
+            messages.put_nowait(("stop",))
+
+    await framework.start()
+    loop.add_reader(conn.fileno(), on_message)
+    try:
+        while True:
+            action, *args = await messages.get()
+            if action == "stop":
+                break
+            await _dispatch(framework.get_context(), action, *args)
+    finally:
+        loop.remove_reader(conn.fileno())
+        await framework.stop()
+
+
+async def _dispatch(ctx: IBundleContext, action: str, *args) -> None:
+    reference = ctx.get_service_reference(
+        IConfigurationManagedFactory, {SERVICE_FACTORY_PID: HTTP_SERVER_FACTORY_PID}
+    )
+    if reference is None:
+        logger.warning("Not found http server factory for: %s", action)
+        return
+    factory = ctx.get_service(reference)
+    try:
+        if action == "updated":
+            await factory.updated(*args)
+        elif action == "deleted":
+            await factory.deleted(*args)
+    finally:
+        ctx.unget_service(reference)
+
+
+class WorkerProcess:
+    def __init__(self, worker_id: int, target: WorkerTarget, args: tuple) -> None:
+        self.worker_id = worker_id
+        self.target = target
+        self.args = args
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.conn: Connection | None = None
+        self.started = 0.0
+        # restarts since worker was running stable
+        self.restarts = 0
+        self.restart_at: float | None = None
+
+    def start(self) -> None:
+        self.started = time.monotonic()
+        mp = multiprocessing.get_context("spawn")
+        self.conn, child_conn = mp.Pipe()
+        self.process = mp.Process(
+            target=self.target,
+            args=(self.worker_id, *self.args, child_conn),
+            name=f"odss-http-worker-{self.worker_id}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def send(self, *message) -> None:
+        try:
+            self.conn.send(message)
+        except (OSError, ValueError) as ex:
+            logger.warning(
+                "Could not send %s to worker %d: %s", message[0], self.worker_id, ex
+            )
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    @property
+    def exitcode(self) -> int | None:
+        return self.process.exitcode if self.process else None
+
+    def stop(self, timeout: float) -> None:
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.send("stop")
+            self.process.join(timeout)
+        if self.process.is_alive():
+            logger.warning("Terminate http worker %d", self.worker_id)
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+
+class WorkerSupervisor:
+    """
+    Run http workers in separate processes and keep them alive.
+
+    Each worker runs own framework with given bundles (by default the HTTP
+    bundles of supervisor) and receives every "http-server" factory
+    configuration applied in supervisor process.
+
+    Crashed worker is restarted with exponential backoff; after MAX_RESTARTS
+    failures in a row it is left stopped.
+    """
+
+    CHECK_INTERVAL = 1.0
+    STOP_TIMEOUT = 10.0
+    RESTART_DELAY = 1.0
+    MAX_RESTART_DELAY = 60.0
+    MAX_RESTARTS = 5
+
+    def __init__(
+        self,
+        ctx: IBundleContext,
+        workers: int,
+        bundles: list[str] | None = None,
+        target: WorkerTarget = run_worker,
+    ) -> None:
+        self.ctx = ctx
+        self.size = workers
+        self.bundles = bundles
+        self.target = target
+        self.workers: list[WorkerProcess] = []
+        self.configs: dict[str, dict[str, t.Any]] = {}
+        self.runner: asyncio.Task | None = None
+
+    async def open(self) -> None:
+        args = (self._get_properties(), self._get_bundles())
+        self.workers = [
+            WorkerProcess(worker_id, self.target, args)
+            for worker_id in range(1, self.size + 1)
+        ]
+        for worker in self.workers:
+            await self._start_worker(worker)
+        self.runner = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        if self.runner:
+            runner, self.runner = self.runner, None
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(None, worker.stop, self.STOP_TIMEOUT)
+                for worker in self.workers
+            ]
+        )
+        self.workers = []
+
+    def updated(self, pid: str, props: dict[str, t.Any]) -> None:
+        self.configs[pid] = props
+        for worker in self.workers:
+            worker.send("updated", pid, props)
+
+    def deleted(self, pid: str) -> None:
+        self.configs.pop(pid, None)
+        for worker in self.workers:
+            worker.send("deleted", pid)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.CHECK_INTERVAL)
+            now = time.monotonic()
+            for worker in self.workers:
+                if worker.is_alive():
+                    if now - worker.started > self.MAX_RESTART_DELAY:
+                        worker.restarts = 0
+                elif worker.process is not None:
+                    exitcode = worker.exitcode
+                    await loop.run_in_executor(None, worker.stop, self.STOP_TIMEOUT)
+                    if worker.restarts >= self.MAX_RESTARTS:
+                        logger.error(
+                            "Http worker %d exited (code=%s) after %d restarts. "
+                            "Not restarting",
+                            worker.worker_id,
+                            exitcode,
+                            worker.restarts,
+                        )
+                        continue
+                    delay = min(
+                        self.RESTART_DELAY * 2**worker.restarts,
+                        self.MAX_RESTART_DELAY,
+                    )
+                    worker.restart_at = now + delay
+                    logger.error(
+                        "Http worker %d exited (code=%s). Restarting in %.1fs",
+                        worker.worker_id,
+                        exitcode,
+                        delay,
+                    )
+                elif worker.restart_at is not None and now >= worker.restart_at:
+                    worker.restart_at = None
+                    worker.restarts += 1
+                    await self._start_worker(worker)
+
+    async def _start_worker(self, worker: WorkerProcess) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, worker.start)
+        logger.info(
+            "Started http worker %d (pid=%s)", worker.worker_id, worker.process.pid
+        )
+        for pid, props in self.configs.items():
+            worker.send("updated", pid, props)
+
+    def _get_properties(self) -> dict[str, t.Any]:
+        framework = self.ctx.get_bundle_by_id(0)
+        return framework.get_properties()
+
+    def _get_bundles(self) -> list[BundleInfo]:
+        if self.bundles is not None:
+            return [(name, None) for name in self.bundles]
+        # not every bundle: configuration admin or shell must not run in workers
+        return [
+            (bundle.name, bundle.start_level)
+            for bundle in self.ctx.get_bundles()
+            if bundle.id != 0 and bundle.name.startswith(HTTP_BUNDLES_PREFIX)
+        ]
@@ -0,0 +1,151 @@
+import time
+from unittest.mock import Mock
+
+from odss.common import OBJECTCLASS, ServiceEvent, get_classes_name
+from odss.http.common import PlainTextResponse, route
+
+from odss.http.core.caching import (
+    CacheEntry,
+    CacheMiddleware,
+    ResponseCache,
+    create_etag,
+    match_etag,
+)
+
+
+class IStore:
+    pass
+
+
+class Reference:
+    def __init__(self, properties):
+        self.properties = properties
+
+    def get_property(self, name):
+        return self.properties[name]
+
+
+def create_request(sockname, path_qs="/items?page=1"):
+    request = Mock(path_qs=path_qs, headers={"Accept": "text/plain"})
+    request.transport.get_extra_info.return_value = sockname
+    return request
+
+
+def create_entry(route, body, ttl=10):
+    return CacheEntry(
+        route, body, 200, "text/plain", "utf-8", (), "", time.monotonic() + ttl
+    )
+
+
+def test_match_etag():
+    etag = create_etag(b"body")
+    assert etag.startswith('W/"')
+    assert match_etag(etag, etag)
+    assert match_etag('"other", ' + etag, etag)
+    # weak comparison: the same opaque tag
+    assert match_etag(etag[2:], etag)
+    assert match_etag("*", etag)
+    assert not match_etag('"other"', etag)
+
+
+def test_cache_limits_and_ttl():
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.set(("a",), create_entry("a", b"12345"))
+    cache.set(("b",), create_entry("b", b"12345"))
+    assert cache.get(("a",)) is not None
+    cache.set(("c",), create_entry("c", b"1"))
+    assert cache.get(("b",)) is None
+    assert cache.size == 6
+
+    cache.set(("d",), create_entry("d", b"1", ttl=-1))
+    assert cache.get(("d",)) is None
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+async def test_cache_and_etag(http_server, http_client):
+    middleware = CacheMiddleware()
+    http_server.add_middleware(middleware, (0, 0))
+    calls = []
+
+    @route.get("/text", cache_ttl=30)
+    def text():
+        calls.append(1)
+        return PlainTextResponse("cached text")
+
+    http_server.bind_handler(text)
+
+    response = await http_client.get("/text")
+    assert response.status == 200
+    etag = response.headers["ETag"]
+    assert etag == create_etag(b"cached text")
+
+    response = await http_client.get("/text")
+    assert response.status == 200
+    assert response.headers["ETag"] == etag
+    assert response.headers["Content-Type"] == "text/plain; charset=utf-8"
+    assert await response.text() == "cached text"
+
+    response = await http_client.get("/text", headers={"If-None-Match": etag})
+    assert response.status == 304
+    assert len(calls) == 1
+    assert middleware.cache.hits == 2
+
+
+async def test_skip_not_cacheable(http_server, http_client):
+    http_server.add_middleware(CacheMiddleware(), (0, 0))
+    calls = []
+
+    @route.get("/plain")
+    def plain():
+        calls.append(1)
+        return PlainTextResponse("plain")
+
+    @route.get("/cookie", cache_ttl=30)
+    def cookie():
+        calls.append(1)
+        response = PlainTextResponse("cookie")
+        response.cookies.set("session", "secret")
+        return response
+
+    http_server.bind_handler(plain)
+    http_server.bind_handler(cookie)
+
+    for path in ("/plain", "/cookie") * 2:
+        response = await http_client.get(path)
+        assert "ETag" not in response.headers
+    assert len(calls) == 4
+
+
+async def test_invalidate_by_service_event(http_server, http_client):
+    middleware = CacheMiddleware()
+    http_server.add_middleware(middleware, (0, 0))
+    values = ["first"]
+
+    @route.get("/value", cache_ttl=30, cache_invalidate=IStore)
+    def value():
+        return PlainTextResponse(values[-1])
+
+    http_server.bind_handler(value)
+
+    response = await http_client.get("/value")
+    assert await response.text() == "first"
+
+    values.append("second")
+    response = await http_client.get("/value")
+    assert await response.text() == "first"
+
+    reference = Reference({OBJECTCLASS: get_classes_name(IStore)})
+    await middleware.service_changed(ServiceEvent(ServiceEvent.MODIFIED, reference))
+    response = await http_client.get("/value")
+    assert await response.text() == "second"
+
+
+def test_key_of_server():
+    middleware = CacheMiddleware()
+    first = middleware.get_key("items", create_request(("127.0.0.1", 8080)), ())
+    second = middleware.get_key("items", create_request(("127.0.0.1", 8081)), ())
+    assert first != second
+    assert first == middleware.get_key("items", create_request(("127.0.0.1", 8080)), ())
+    vary = middleware.get_key("items", create_request(("127.0.0.1", 8080)), ("Accept",))
+    assert vary[-1] == "text/plain"
@@ -0,0 +1,101 @@
+import gzip
+import zlib
+
+import pytest
+from odss.http.common import PlainTextResponse, Response, route
+
+from odss.http.core.compression import (
+    CompressedCache,
+    CompressionMiddleware,
+    select_encoding,
+)
+
+TEXT = "compress me " * 200
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("deflate", "deflate"),
+        ("gzip;q=0.5, deflate", "deflate"),
+        ("gzip;q=0, *", "deflate"),
+        ("GZIP, deflate;q=0.1", "gzip"),
+    ],
+)
+def test_select_encoding(header, expected):
+    encoding = select_encoding(header)
+    if expected is None or encoding != "br":
+        assert encoding == expected
+
+
+def test_cache_limits():
+    cache = CompressedCache(max_entries=2, max_bytes=10)
+    cache.set((b"1", "gzip"), b"12345")
+    cache.set((b"2", "gzip"), b"12345")
+    assert cache.get((b"1", "gzip")) == b"12345"
+    cache.set((b"3", "gzip"), b"1")
+    assert cache.get((b"2", "gzip")) is None
+    assert cache.get((b"1", "gzip")) == b"12345"
+    cache.set((b"4", "gzip"), b"1234567890")
+    assert len(cache.entries) == 1
+    assert cache.size == 10
+
+
+async def test_gzip_response(http_server, http_client):
+    middleware = CompressionMiddleware(min_size=100)
+    http_server.add_middleware(middleware, (0, 0))
+
+    @route.get("/text")
+    def text():
+        return PlainTextResponse(TEXT)
+
+    http_server.bind_handler(text)
+
+    for _ in range(2):
+        response = await http_client.get(
+            "/text", headers={"Accept-Encoding": "gzip"}, auto_decompress=False
+        )
+        assert response.status == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert gzip.decompress(await response.read()).decode() == TEXT
+    assert middleware.cache.hits == 1
+
+
+async def test_deflate_in_executor(http_server, http_client):
+    middleware = CompressionMiddleware(min_size=100, executor_threshold=100)
+    http_server.add_middleware(middleware, (0, 0))
+
+    @route.get("/json")
+    def json():
+        return {"text": TEXT}
+
+    http_server.bind_handler(json)
+
+    response = await http_client.get(
+        "/json", headers={"Accept-Encoding": "deflate"}, auto_decompress=False
+    )
+    assert response.headers["Content-Encoding"] == "deflate"
+    assert zlib.decompress(await response.read()) == b'{"text":"%s"}' % TEXT.encode()
+
+
+async def test_skip_small_and_binary(http_server, http_client):
+    http_server.add_middleware(CompressionMiddleware(min_size=100), (0, 0))
+
+    @route.get("/small")
+    def small():
+        return PlainTextResponse("small")
+
+    @route.get("/binary")
+    def binary():
+        return Response(b"\0" * 1000, content_type="application/octet-stream")
+
+    http_server.bind_handler(small)
+    http_server.bind_handler(binary)
+
+    for path in ("/small", "/binary"):
+        response = await http_client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
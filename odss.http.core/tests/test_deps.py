@@ -6,7 +6,7 @@ from datetime import datetime
 from unittest.mock import MagicMock, Mock
 
 import pytest
-from odss.http.common import Request, RouteInfo
+from odss.http.common import HttpBadRequest, Request, RouteInfo, route
 from pydantic import BaseModel
 
 from odss.http.core.deps import SystemFieldType, get_dependency, resolve_dependency
@@ -269,6 +269,50 @@ async def test_invalid_dataset_params():
     assert error.errors[2].location == "profile.website"
 
 
+async def test_invalid_json_body():
+    class User(BaseModel):
+        id: int
+
+    def basemodel_params_fn(user: User):
+        pass
+
+    deps = get_dependency("", basemodel_params_fn)
+
+    async def side_effect_helper():
+        return b'{"id": 1'
+
+    request = Mock()
+    request.method = "POST"
+    request.content_type = "application/json"
+    request.read = side_effect_helper
+
+    with pytest.raises(HttpBadRequest) as exc_info:
+        await resolve_dependency(deps, request, {})
+    assert exc_info.value.code == 400
+
+
+async def test_malformed_json_response(http_client):
+    class User(BaseModel):
+        id: int
+
+    @route.post("/users")
+    async def create(user: User):
+        return user.id
+
+    http_client.server.bind_handler(create)
+
+    response = await http_client.post(
+        "/users", data=b'{"id": 1', headers={"Content-Type": "application/json"}
+    )
+    assert response.status == 400
+    assert (await response.json())["reason"] == "Problem with decode json"
+
+    response = await http_client.post(
+        "/users", data=b'{"id": "x"}', headers={"Content-Type": "application/json"}
+    )
+    assert response.status == 422
+
+
 def test_return_fn():
     def simple_test() -> str:
         return "test"
@@ -5,9 +5,13 @@ from enum import Enum
 from pathlib import Path
 from uuid import UUID
 
+import json
+
 import pytest
+from odss.http.common import route
+from pydantic import BaseModel
 
-from odss.http.core.encoders import serialize_to_jsonable
+from odss.http.core.encoders import create_serializer, serialize_to_jsonable
 
 datetime_now = datetime.datetime.now()
 date_today = datetime.date.today()
@@ -82,3 +86,68 @@ def test_complex():
             "uuid_1": "ecaa455c-aac8-4882-a63c-4def9a7d22ef",
         },
     }
+
+
+class Item(BaseModel):
+    id: int
+    tags: set[str] = set()
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+@dataclass
+class Payment:
+    amount: Decimal
+    duration: datetime.timedelta
+
+
+@pytest.mark.parametrize(
+    "annotation",
+    [None, int, str, dict[str, int], list[int], "Item", Point, list[Payment]],
+)
+def test_skip_serializer(annotation):
+    assert create_serializer(annotation) is None
+
+
+def test_compiled_serializer():
+    serializer = create_serializer(list[Item])
+    assert json.loads(serializer([Item(id=1, tags={"a"})])) == [
+        {"id": 1, "tags": ["a"]}
+    ]
+
+    serializer = create_serializer(dict[str, Item] | None)
+    assert json.loads(serializer({"a": Item(id=2)})) == {"a": {"id": 2, "tags": []}}
+    assert serializer(None) == b"null"
+
+    # value different from annotation
+    serializer = create_serializer(Item)
+    assert json.loads(serializer({"x": Decimal(1)})) == {"x": 1}
+
+
+async def test_return_annotation(http_client):
+    @route.get("/items")
+    def items() -> list[Item]:
+        return [Item(id=1), Item(id=2)]
+
+    http_client.server.bind_handler(items)
+
+    response = await http_client.get("/items")
+    assert response.status == 200
+    assert response.content_type == "application/json"
+    assert await response.json() == [{"id": 1, "tags": []}, {"id": 2, "tags": []}]
+
+
+async def test_dataclass_annotation(http_client):
+    @route.get("/payment")
+    def payment() -> Payment:
+        return Payment(Decimal("1.5"), datetime.timedelta(seconds=3))
+
+    http_client.server.bind_handler(payment)
+
+    response = await http_client.get("/payment")
+    assert response.status == 200
+    assert await response.json() == {"amount": 1.5, "duration": 3.0}
@@ -0,0 +1,120 @@
+import socket
+import tracemalloc
+
+import aiohttp
+import pytest
+from odss.http.common import JsonResponse, route
+
+from odss.http.core.engine import (
+    ServerEngineFactory,
+    get_listen_fd,
+    to_web_response,
+)
+from odss.http.core.server import HttpServer
+
+
+@route.get("/ping")
+def ping():
+    return {"pong": True}
+
+
+async def test_unix_socket(tmp_path):
+    path = str(tmp_path / "odss.sock")
+    server = HttpServer(ServerEngineFactory(), None, None, path=path)
+    await server.open()
+    server.bind_handler(ping)
+    try:
+        connector = aiohttp.UnixConnector(path=path)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async with session.get("http://localhost/ping") as response:
+                assert response.status == 200
+                assert await response.json() == {"pong": True}
+    finally:
+        await server.close()
+
+
+async def test_stale_unix_socket(tmp_path):
+    path = tmp_path / "odss.sock"
+    # left by crashed server
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+
+    server = HttpServer(ServerEngineFactory(), None, None, path=str(path))
+    await server.open()
+    assert path.is_socket()
+    await server.close()
+    assert not path.exists()
+
+
+async def test_unix_path_of_other_file(tmp_path):
+    path = tmp_path / "odss.sock"
+    path.write_text("data")
+    server = HttpServer(ServerEngineFactory(), None, None, path=str(path))
+    with pytest.raises(OSError):
+        await server.open()
+    assert path.read_text() == "data"
+
+
+async def test_inherited_socket():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen()
+    port = sock.getsockname()[1]
+    try:
+        for _ in range(2):
+            server = HttpServer(ServerEngineFactory(), None, None, fd=sock.fileno())
+            await server.open()
+            server.bind_handler(ping)
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/ping") as response:
+                    assert response.status == 200
+            await server.close()
+            # inherited socket survives server restart
+            assert sock.fileno() != -1
+    finally:
+        sock.close()
+
+
+def test_systemd_fd(monkeypatch):
+    monkeypatch.setenv("LISTEN_FDS", "2")
+    monkeypatch.delenv("LISTEN_PID", raising=False)
+    assert get_listen_fd(7) == 7
+    assert get_listen_fd("7") == 7
+    assert get_listen_fd("systemd") == 3
+    assert get_listen_fd("systemd:1") == 4
+    with pytest.raises(ValueError):
+        get_listen_fd("systemd:2")
+    monkeypatch.setenv("LISTEN_PID", "1")
+    with pytest.raises(ValueError):
+        get_listen_fd("systemd")
+
+
+def make_json_response():
+    response = JsonResponse({"id": 1, "name": "test"})
+    response.cookies.set("session", "abc", httponly=True)
+    response.cookies.set("theme", "dark")
+    return response
+
+
+def test_web_response_allocations():
+    count = 2000
+    responses = [make_json_response() for _ in range(count)]
+    # warm up caches of aiohttp and multidict
+    for response in [make_json_response() for _ in range(10)]:
+        to_web_response(response)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        converted = [to_web_response(response) for response in responses]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    web_response = converted[0]
+    assert isinstance(web_response.body, bytes)
+    assert len(web_response.headers.getall("Set-Cookie")) == 2
+    # 9 blocks per response; str body or cookies rendered in finish() add 3
+    assert blocks / count < 10.5
@@ -0,0 +1,65 @@
+import asyncio
+
+from odss.http.common import route
+
+
+async def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met")
+
+
+async def test_single_flight(http_server, http_client):
+    calls = []
+    release = asyncio.Event()
+
+    @route.get("/items", single_flight=True, single_flight_vary=["Accept"])
+    async def items(q: str):
+        calls.append(q)
+        await release.wait()
+        return {"q": q}
+
+    http_client.server.bind_handler(items)
+
+    requests = [
+        asyncio.create_task(http_client.get("/items?q=1")),
+        asyncio.create_task(http_client.get("/items?q=1")),
+        asyncio.create_task(http_client.get("/items?q=2")),
+        asyncio.create_task(
+            http_client.get("/items?q=1", headers={"Accept": "text/plain"})
+        ),
+    ]
+    await wait_for(lambda: http_server.requests.count == 4)
+    release.set()
+
+    responses = await asyncio.gather(*requests)
+    assert [response.status for response in responses] == [200] * 4
+    assert await responses[1].json() == {"q": "1"}
+    assert await responses[2].json() == {"q": "2"}
+    assert sorted(calls) == ["1", "1", "2"]
+
+    release.clear()
+    request = asyncio.create_task(http_client.get("/items?q=1"))
+    await wait_for(lambda: len(calls) == 4)
+    release.set()
+    assert (await request).status == 200
+
+
+async def test_single_flight_disabled(http_client):
+    calls = []
+    release = asyncio.Event()
+
+    @route.get("/items")
+    async def items():
+        calls.append(1)
+        await release.wait()
+        return {}
+
+    http_client.server.bind_handler(items)
+
+    requests = [asyncio.create_task(http_client.get("/items")) for _ in range(2)]
+    await wait_for(lambda: len(calls) == 2)
+    release.set()
+    await asyncio.gather(*requests)
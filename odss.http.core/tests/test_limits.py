@@ -0,0 +1,103 @@
+import asyncio
+
+from odss.http.common import BaseHttpSecurityPolicy, IHttpRouteService, route
+
+from odss.http.core.limits import (
+    LimitsMiddleware,
+    RouteServiceTracker,
+    TokenBucket,
+)
+
+
+class HeaderPolicy(BaseHttpSecurityPolicy):
+    def identify(self, request):
+        return request.headers.get("X-User", "")
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    wait = bucket.acquire()
+    assert 0 < wait <= 0.1
+
+
+async def test_rate_limit(http_server, http_client):
+    middleware = LimitsMiddleware()
+    middleware.policy = HeaderPolicy()
+    http_server.add_middleware(middleware, (0, 0))
+
+    @route.get("/limited", rate_limit=0.1, rate_burst=2, name="limited")
+    def limited():
+        return {}
+
+    http_server.bind_handler(limited)
+
+    statuses = [(await http_client.get("/limited")).status for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    response = await http_client.get("/limited")
+    assert response.headers["Retry-After"] == "10"
+
+    # other client has own bucket
+    response = await http_client.get("/limited", headers={"X-User": "other"})
+    assert response.status == 200
+
+    counters = middleware.get_counters()["limited"]
+    assert counters.accepted == 3
+    assert counters.limited == 2
+
+
+async def test_concurrency_limit(http_server, http_client):
+    middleware = LimitsMiddleware()
+    http_server.add_middleware(middleware, (0, 0))
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    @route.get("/slow", max_concurrency=1, name="slow")
+    async def slow():
+        started.set()
+        await release.wait()
+        return {}
+
+    http_server.bind_handler(slow)
+
+    first = asyncio.create_task(http_client.get("/slow"))
+    await started.wait()
+    response = await http_client.get("/slow")
+    assert response.status == 503
+    release.set()
+    assert (await first).status == 200
+    assert (await http_client.get("/slow")).status == 200
+
+    counters = middleware.get_counters()["slow"]
+    assert counters.rejected == 1
+    assert counters.in_flight == 0
+
+
+class LimitedView:
+    @route.get("/limited", rate_limit=1, name="limited")
+    def limited(self):
+        return {}
+
+
+async def test_invalidate_unbound_route(framework, http_server, http_client):
+    ctx = framework.get_context()
+    middleware = LimitsMiddleware()
+    http_server.add_middleware(middleware, (0, 0))
+    tracker = RouteServiceTracker(ctx, middleware)
+    await tracker.open()
+
+    view = LimitedView()
+    http_server.bind_handler(view)
+    registration = await ctx.register_service(IHttpRouteService, view)
+    assert (await http_client.get("/limited")).status == 200
+    assert (await http_client.get("/limited")).status == 429
+
+    await registration.unregister()
+    http_server.unbind_handler(view)
+    assert "limited" not in middleware.get_counters()
+
+    # rebound route starts with full bucket
+    http_server.bind_handler(view)
+    assert (await http_client.get("/limited")).status == 200
+    await tracker.close()
@@ -1,3 +1,5 @@
+import asyncio
+
 from odss.http.common import JsonResponse, RedirectResponse, Request, Response, route
 
 
@@ -127,3 +129,66 @@ async def test_methods(http_client):
         else:
             content = await response.json()
             assert content == {"method": method.upper()}
+
+
+async def test_drain_handler(http_client):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    class View:
+        @route.get("/slow")
+        async def slow(self):
+            started.set()
+            await release.wait()
+            return {"slow": True}
+
+        @route.get("/fast")
+        async def fast(self):
+            return {"fast": True}
+
+    view = View()
+    server = http_client.server.server
+    server.bind_handler(view)
+
+    slow = asyncio.create_task(http_client.get("/slow"))
+    await started.wait()
+
+    drain = asyncio.create_task(server.drain_handler(view, 5))
+    await asyncio.sleep(0)
+
+    response = await http_client.get("/fast")
+    assert response.status == 503
+    assert response.headers["Retry-After"] == "1"
+    assert not drain.done()
+
+    release.set()
+    response = await slow
+    assert response.status == 200
+    assert await drain is True
+
+    response = await http_client.get("/fast")
+    assert response.status == 404
+
+
+async def test_drain_handler_timeout(http_client):
+    release = asyncio.Event()
+
+    class View:
+        @route.get("/hang")
+        async def hang(self):
+            await release.wait()
+            return {}
+
+    view = View()
+    server = http_client.server.server
+    server.bind_handler(view)
+
+    hang = asyncio.create_task(http_client.get("/hang"))
+    while not server.views_requests[view].count:
+        await asyncio.sleep(0.01)
+
+    assert await server.drain_handler(view, 0.1) is True
+    assert view not in server.handlers
+    release.set()
+    response = await hang
+    assert response.status == 200
@@ -0,0 +1,158 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+from odss.common import get_classes_name
+from odss.http.common import ODSS_HTTP_FRAMEWORK_EVENTS, EventStream, route
+
+from odss.http.core.sse import (
+    EventStreamConnection,
+    EventStreamHub,
+    FrameworkEventsPublisher,
+    format_event,
+)
+
+
+class IClock:
+    pass
+
+
+class Events:
+    def __init__(self, channel):
+        self.channel = channel
+        self.joined = asyncio.Event()
+
+    @route.sse("/events")
+    async def events(self, stream: EventStream, name: str = "anonymous"):
+        await stream.send(f"hello {name}", event="welcome")
+        stream.join(self.channel)
+        self.joined.set()
+
+
+async def read_event(response):
+    lines = []
+    while True:
+        line = await asyncio.wait_for(response.content.readline(), 2)
+        if line in (b"\n", b""):
+            return b"".join(lines).decode()
+        lines.append(line)
+
+
+def test_format_event():
+    assert format_event("text") == b"data: text\n\n"
+    assert format_event("a\nb", event="update", id="1") == (
+        b"event: update\nid: 1\ndata: a\ndata: b\n\n"
+    )
+
+
+async def test_publish(http_server, http_client):
+    view = Events("news")
+    http_server.bind_handler(view)
+
+    first = await http_client.get("/events?name=bob")
+    assert first.headers["Content-Type"] == "text/event-stream"
+    assert await read_event(first) == "event: welcome\ndata: hello bob\n"
+    await view.joined.wait()
+    view.joined.clear()
+    second = await http_client.get("/events")
+    await read_event(second)
+    await view.joined.wait()
+
+    assert http_server.streams.publish("news", "breaking", id="7") == 2
+    for response in (first, second):
+        assert await read_event(response) == "id: 7\ndata: breaking\n"
+
+    assert await http_server.drain_handler(view, 2)
+    assert await asyncio.wait_for(first.content.read(), 2) == b""
+    assert not http_server.streams.channels
+
+
+async def test_framework_events(framework, http_server, http_client):
+    ctx = framework.get_context()
+    view = Events(ODSS_HTTP_FRAMEWORK_EVENTS)
+    http_server.bind_handler(view)
+    publisher = FrameworkEventsPublisher(http_server.streams)
+    ctx.add_service_listener(publisher)
+
+    response = await http_client.get("/events")
+    await read_event(response)
+    await view.joined.wait()
+
+    await ctx.register_service(IClock, IClock())
+    event = await read_event(response)
+    assert event.startswith("event: service\ndata: ")
+    data = json.loads(event.split("data: ", 1)[1])
+    assert data["service"]["objectclass"] == list(get_classes_name(IClock))
+    ctx.remove_service_listener(publisher)
+    response.close()
+
+
+async def test_evict_slow_consumer():
+    hub = EventStreamHub()
+    connections = set()
+    connection = EventStreamConnection(Mock(), hub, connections, 15, 1)
+    connections.add(connection)
+    connection.join("news")
+
+    assert hub.publish("news", "first") == 1
+    assert hub.publish("news", "second") == 0
+    await asyncio.sleep(0)
+    assert connection.closed
+    assert not hub.channels
+    assert not connections
+
+
+class SlowResponse:
+    """
+    Client not reading: write blocks until transport is aborted
+    """
+
+    def __init__(self):
+        self.aborted = asyncio.Event()
+
+    async def write(self, frame):
+        await self.aborted.wait()
+        raise ConnectionResetError("Connection lost")
+
+    def abort(self):
+        self.aborted.set()
+
+
+async def test_evict_blocked_writer():
+    hub = EventStreamHub()
+    connection = EventStreamConnection(Mock(), hub, set(), 15, 1)
+    response = connection.response = SlowResponse()
+    connection.request.transport.abort = response.abort
+    connection.writer = asyncio.create_task(connection._write())
+    connection.join("news")
+
+    assert hub.publish("news", "first") == 1
+    # writer blocks on the first frame
+    while not connection.queue.empty():
+        await asyncio.sleep(0)
+    assert hub.publish("news", "second") == 1
+    assert hub.publish("news", "third") == 0
+
+    await asyncio.wait_for(connection.wait_closed(), 1)
+    assert connection.closed
+    assert not connection.writer.cancelled()
+
+
+async def test_wait_closed_does_not_raise():
+    connection = EventStreamConnection(Mock(), EventStreamHub(), set(), 15, 1)
+    connection.writer = asyncio.create_task(asyncio.sleep(10))
+    await asyncio.sleep(0)
+    connection.writer.cancel()
+    await connection.wait_closed()
+
+
+async def test_close_ends_writer_waiting_for_frame():
+    connection = EventStreamConnection(Mock(), EventStreamHub(), set(), 15, 2)
+    connection.response = Mock(write=AsyncMock())
+    connection.writer = asyncio.create_task(connection._write())
+    await connection.send("last")
+    await connection.close()
+
+    assert connection.writer.done() and not connection.writer.cancelled()
+    connection.response.write.assert_awaited_once_with(b"data: last\n\n")
+    connection.request.transport.abort.assert_not_called()
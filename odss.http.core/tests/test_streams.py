@@ -0,0 +1,121 @@
+import aiohttp
+from odss.http.common import BodyStream, MultipartStream, route
+
+DATA = b"x" * (256 * 1024)
+
+
+class Buffer:
+    def __init__(self):
+        self.data = b""
+
+    async def write(self, data):
+        self.data += bytes(data)
+
+
+async def chunks(data, size=1024):
+    for pos in range(0, len(data), size):
+        yield data[pos : pos + size]
+
+
+async def test_body_stream(http_client):
+    @route.post("/upload")
+    async def upload(body: BodyStream):
+        size = 0
+        count = 0
+        async for chunk in body:
+            size += len(chunk)
+            count += 1
+        return {"size": size, "chunks": count}
+
+    http_client.server.bind_handler(upload)
+
+    response = await http_client.post("/upload", data=DATA)
+    assert response.status == 200
+    content = await response.json()
+    assert content["size"] == len(DATA)
+    assert content["chunks"] > 1
+
+
+async def test_body_stream_max_size(http_client):
+    @route.post("/upload", max_body_size=1024)
+    async def upload(body: BodyStream):
+        return {"size": len(await body.read())}
+
+    http_client.server.bind_handler(upload)
+
+    response = await http_client.post("/upload", data=DATA)
+    assert response.status == 413
+
+    # chunked body, without content length
+    response = await http_client.post("/upload", data=chunks(DATA))
+    assert response.status == 413
+
+    response = await http_client.post("/upload", data=b"small")
+    assert response.status == 200
+    assert await response.json() == {"size": 5}
+
+
+async def test_multipart_stream(http_client):
+    @route.post("/upload", max_body_size=len(DATA) + 1024)
+    async def upload(form: MultipartStream):
+        parts = {}
+        async for part in form:
+            parts[part.name] = [part.filename, len(await part.read())]
+        return parts
+
+    http_client.server.bind_handler(upload)
+
+    form = aiohttp.FormData()
+    form.add_field("name", "value")
+    form.add_field("file", DATA, filename="data.bin")
+    response = await http_client.post("/upload", data=form)
+    assert response.status == 200
+    assert await response.json() == {
+        "name": [None, 5],
+        "file": ["data.bin", len(DATA)],
+    }
+
+    form = aiohttp.FormData()
+    form.add_field("file", DATA * 2, filename="data.bin")
+    response = await http_client.post("/upload", data=form)
+    assert response.status == 413
+
+
+async def test_multipart_skipped_parts_max_size(http_client):
+    @route.post("/upload", max_body_size=len(DATA) + 1024)
+    async def upload(form: MultipartStream):
+        # parts are not read
+        return {"parts": [part.name async for part in form]}
+
+    http_client.server.bind_handler(upload)
+
+    for names, status in ((["first", "second"], 413), (["first"], 200)):
+        with aiohttp.MultipartWriter("form-data") as writer:
+            for name in names:
+                part = writer.append(DATA)
+                part.set_content_disposition("form-data", name=name)
+        buffer = Buffer()
+        await writer.write(buffer)
+        # chunked body, without content length
+        response = await http_client.post(
+            "/upload",
+            data=chunks(buffer.data),
+            headers={"Content-Type": writer.content_type},
+        )
+        assert response.status == status
+    assert await response.json() == {"parts": ["first"]}
+
+
+async def test_nested_multipart(http_client):
+    @route.post("/upload")
+    async def upload(form: MultipartStream):
+        return {"parts": [part.name async for part in form]}
+
+    http_client.server.bind_handler(upload)
+
+    with aiohttp.MultipartWriter("form-data") as writer:
+        with aiohttp.MultipartWriter("mixed") as nested:
+            nested.append("nested")
+        writer.append(nested)
+    response = await http_client.post("/upload", data=writer)
+    assert response.status == 400
@@ -0,0 +1,67 @@
+import logging
+
+from odss.http.common import HttpNotFound, route
+
+from odss.http.core.timing import Histogram
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value in (0.5, 1.0, 7.0, 10000.0):
+        histogram.observe(value)
+    stats = histogram.serialize()
+    assert stats["count"] == 4
+    assert stats["sum"] == 10008.5
+    assert stats["buckets"]["1.0"] == 2
+    assert stats["buckets"]["10.0"] == 1
+    assert stats["buckets"]["inf"] == 1
+
+
+async def test_server_timing(http_server, http_client):
+    @route.get("/timed", server_timing=True, name="timed")
+    def timed():
+        return {"ok": True}
+
+    @route.get("/plain", name="plain")
+    def plain():
+        raise HttpNotFound()
+
+    http_server.bind_handler(timed)
+    http_server.bind_handler(plain)
+
+    response = await http_client.get("/timed")
+    phases = [
+        item.split(";")[0] for item in response.headers["Server-Timing"].split(", ")
+    ]
+    assert phases == [
+        "resolve",
+        "handler",
+        "serialize",
+        "conversion",
+        "middleware",
+        "total",
+    ]
+
+    response = await http_client.get("/plain")
+    assert response.status == 404
+    assert "Server-Timing" not in response.headers
+
+    stats = http_server.timings.get_stats()
+    assert stats["timed"]["handler"]["count"] == 1
+    assert stats["timed"]["total"]["count"] == 1
+    assert stats["plain"]["total"]["count"] == 1
+
+
+async def test_slow_request_log(http_server, http_client, caplog):
+    http_server.timings.slow_threshold = 0
+
+    @route.get("/slow")
+    def slow():
+        return {}
+
+    http_server.bind_handler(slow)
+
+    with caplog.at_level(logging.WARNING, logger="odss.http.core.timing"):
+        await http_client.get("/slow")
+    assert "Slow request GET /slow" in caplog.text
+    assert "handler=" in caplog.text
@@ -0,0 +1,98 @@
+import asyncio
+
+import aiohttp
+from odss.http.common import IHttpRouteService, route
+
+from odss.http.core.trackers import ServerService
+
+
+class SlowView:
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    @route.get("/slow")
+    async def slow(self):
+        self.started.set()
+        await self.release.wait()
+        return {"slow": True}
+
+    @route.get("/fast")
+    async def fast(self):
+        return {"fast": True}
+
+
+async def test_reconfigure_without_downtime(framework, unused_tcp_port):
+    ctx = framework.get_context()
+    view = SlowView()
+    await ctx.register_service(IHttpRouteService, view)
+
+    service = ServerService(ctx, {})
+    await service.open()
+    props = {"host": "127.0.0.1", "port": unused_tcp_port}
+    await service.updated("http.1", props)
+    first = service.servers["http.1"][0]
+
+    url = f"http://127.0.0.1:{unused_tcp_port}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            slow = asyncio.create_task(session.get(url + "/slow"))
+            await view.started.wait()
+
+            await service.updated("http.1", {**props, "grace_period": 5})
+            assert service.servers["http.1"][0] is not first
+            assert service.scopes == ["default"]
+
+            async with aiohttp.ClientSession() as other_session:
+                async with other_session.get(url + "/fast") as response:
+                    assert response.status == 200
+                    assert await response.json() == {"fast": True}
+
+            view.release.set()
+            async with await slow as response:
+                assert response.status == 200
+                assert await response.json() == {"slow": True}
+    finally:
+        await service.close()
+    assert not service.retiring
+    assert first.engine is None
+
+
+async def test_reconfigure_unix_socket(framework, tmp_path):
+    ctx = framework.get_context()
+    view = SlowView()
+    await ctx.register_service(IHttpRouteService, view)
+
+    service = ServerService(ctx, {})
+    await service.open()
+    path = tmp_path / "http.sock"
+    props = {"path": str(path)}
+    await service.updated("http.1", props)
+    first = service.servers["http.1"][0]
+    inode = path.stat().st_ino
+
+    connector = aiohttp.UnixConnector(path=str(path))
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            slow = asyncio.create_task(session.get("http://localhost/slow"))
+            await view.started.wait()
+
+            await service.updated("http.1", {**props, "grace_period": 5})
+            assert service.servers["http.1"][0] is not first
+            # socket file is not recreated: clients never see it missing
+            assert path.stat().st_ino == inode
+
+            view.release.set()
+            async with await slow as response:
+                assert await response.json() == {"slow": True}
+        await asyncio.gather(*service.retiring)
+        assert first.engine is None
+
+        # old server closed, its socket file stays for the new one
+        connector = aiohttp.UnixConnector(path=str(path))
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async with session.get("http://localhost/fast") as response:
+                assert await response.json() == {"fast": True}
+    finally:
+        await service.close()
+    assert not path.exists()
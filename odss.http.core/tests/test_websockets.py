@@ -0,0 +1,146 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import aiohttp
+from odss.http.common import WebSocket, route
+
+from odss.http.core.websockets import WebSocketConnection, WebSocketHub
+
+
+class Dashboard:
+    def __init__(self):
+        self.joined = asyncio.Event()
+
+    @route.websocket("/echo")
+    async def echo(self, ws: WebSocket, prefix: str = ""):
+        async for message in ws:
+            await ws.send_json({"echo": prefix + message})
+
+    @route.websocket("/live")
+    async def live(self, ws: WebSocket):
+        ws.join("live")
+        self.joined.set()
+        async for message in ws:
+            ws.broadcast("live", message)
+
+    @route.websocket("/idle", idle_timeout=0.1)
+    async def idle(self, ws: WebSocket):
+        async for message in ws:
+            pass
+
+
+async def test_echo(http_client):
+    http_client.server.bind_handler(Dashboard())
+
+    ws = await http_client.ws_connect("/echo?prefix=>")
+    await ws.send_str("hello")
+    assert await ws.receive_json() == {"echo": ">hello"}
+    await ws.close()
+
+
+async def test_broadcast(http_server, http_client):
+    dashboard = Dashboard()
+    http_server.bind_handler(dashboard)
+
+    first = await http_client.ws_connect("/live")
+    await dashboard.joined.wait()
+    dashboard.joined.clear()
+    second = await http_client.ws_connect("/live")
+    await dashboard.joined.wait()
+    assert len(http_server.websockets.groups["live"]) == 2
+
+    await first.send_str("update")
+    assert (await first.receive()).data == "update"
+    assert (await second.receive()).data == "update"
+
+    await second.close()
+    await first.close()
+
+
+async def test_idle_timeout(http_client):
+    http_client.server.bind_handler(Dashboard())
+
+    ws = await http_client.ws_connect("/idle")
+    message = await ws.receive(timeout=2)
+    assert message.type == aiohttp.WSMsgType.CLOSE
+    assert message.data == aiohttp.WSCloseCode.GOING_AWAY
+
+
+async def test_close_on_unbind(http_server, http_client):
+    dashboard = Dashboard()
+    http_server.bind_handler(dashboard)
+
+    ws = await http_client.ws_connect("/live")
+    await dashboard.joined.wait()
+
+    assert await http_server.drain_handler(dashboard, 2)
+    message = await ws.receive(timeout=2)
+    assert message.type == aiohttp.WSMsgType.CLOSE
+    assert http_server.requests.count == 0
+    assert not http_server.websockets.views
+
+
+async def test_evict_slow_consumer():
+    hub = WebSocketHub()
+    connection = WebSocketConnection(Mock(), hub, "view", None, None, 1)
+    hub.add(connection)
+    connection.join("group")
+
+    assert hub.broadcast("group", "first") == 1
+    assert hub.broadcast("group", "second") == 0
+    assert connection.closed
+    assert not hub.groups
+    assert not hub.views
+    connection.request.transport.abort.assert_called_once_with()
+
+
+class SlowResponse:
+    """
+    Client not reading: send blocks until transport is aborted
+    """
+
+    prepared = True
+
+    def __init__(self):
+        self.aborted = asyncio.Event()
+        self.close = AsyncMock()
+
+    async def send_str(self, data):
+        await self.aborted.wait()
+        raise ConnectionResetError("Connection lost")
+
+    def abort(self):
+        self.aborted.set()
+
+
+async def test_evict_blocked_writer():
+    hub = WebSocketHub()
+    connection = WebSocketConnection(Mock(), hub, "view", None, None, 1)
+    response = connection.response = SlowResponse()
+    connection.request.transport.abort = response.abort
+    connection.writer = asyncio.create_task(connection._write())
+    connection.join("group")
+
+    assert hub.broadcast("group", "first") == 1
+    # writer blocks on the first message
+    while not connection.queue.empty():
+        await asyncio.sleep(0)
+    assert hub.broadcast("group", "second") == 1
+    assert hub.broadcast("group", "third") == 0
+
+    await asyncio.wait_for(connection.wait_closed(), 1)
+    assert connection.closed
+    assert not connection.writer.cancelled()
+
+
+async def test_close_ends_writer_waiting_for_message():
+    connection = WebSocketConnection(Mock(), WebSocketHub(), "view", None, None, 2)
+    connection.response = Mock(prepared=True, send_str=AsyncMock(), close=AsyncMock())
+    connection.writer = asyncio.create_task(connection._write())
+    await connection.send("last")
+    await connection.close()
+
+    assert connection.writer.done() and not connection.writer.cancelled()
+    connection.response.send_str.assert_awaited_once_with("last")
+    connection.response.close.assert_awaited_once()
+    connection.request.transport.abort.assert_not_called()
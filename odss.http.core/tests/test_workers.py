@@ -0,0 +1,118 @@
+import asyncio
+import sys
+from unittest.mock import MagicMock
+
+from odss.http.core.engine import ServerEngineFactory
+from odss.http.core.server import HttpServer
+from odss.http.core.workers import WorkerSupervisor
+
+
+def exit_worker(worker_id, properties, bundles, conn):
+    sys.exit(3)
+
+
+def echo_worker(worker_id, properties, bundles, conn):
+    while True:
+        message = conn.recv()
+        if message[0] == "stop":
+            break
+        conn.send(message)
+
+
+def create_context():
+    ctx = MagicMock()
+    ctx.get_bundle_by_id.return_value.get_properties.return_value = {}
+    return ctx
+
+
+async def test_reuse_port(unused_tcp_port):
+    servers = [
+        HttpServer(ServerEngineFactory(), "127.0.0.1", unused_tcp_port, reuse_port=True)
+        for _ in range(2)
+    ]
+    for server in servers:
+        await server.open()
+    for server in servers:
+        await server.close()
+
+
+async def test_propagate_config():
+    supervisor = WorkerSupervisor(create_context(), 1, [], target=echo_worker)
+    supervisor.updated("http.1", {"host": "127.0.0.1", "port": 8080})
+    await supervisor.open()
+    try:
+        worker = supervisor.workers[0]
+        message = await asyncio.get_running_loop().run_in_executor(
+            None, worker.conn.recv
+        )
+        assert message == ("updated", "http.1", {"host": "127.0.0.1", "port": 8080})
+
+        supervisor.deleted("http.1")
+        message = await asyncio.get_running_loop().run_in_executor(
+            None, worker.conn.recv
+        )
+        assert message == ("deleted", "http.1")
+    finally:
+        await supervisor.close()
+
+
+async def test_restart_crashed_worker():
+    supervisor = WorkerSupervisor(create_context(), 1, [], target=exit_worker)
+    supervisor.CHECK_INTERVAL = 0.1
+    supervisor.RESTART_DELAY = 0.1
+    await supervisor.open()
+    try:
+        worker = supervisor.workers[0]
+        first_pid = worker.process.pid
+        for _ in range(100):
+            await asyncio.sleep(0.1)
+            if worker.process and worker.process.pid != first_pid:
+                break
+        assert worker.process.pid != first_pid
+    finally:
+        await supervisor.close()
+
+
+async def test_restart_backoff_and_limit(caplog):
+    supervisor = WorkerSupervisor(create_context(), 1, [], target=exit_worker)
+    supervisor.CHECK_INTERVAL = 0.05
+    supervisor.RESTART_DELAY = 0.1
+    supervisor.MAX_RESTARTS = 2
+    await supervisor.open()
+    try:
+        worker = supervisor.workers[0]
+        for _ in range(200):
+            await asyncio.sleep(0.05)
+            if "Not restarting" in caplog.text:
+                break
+        assert worker.restarts == 2
+        assert worker.process is None and worker.restart_at is None
+        # delay doubles with every restart
+        delays = [
+            record.args[-1]
+            for record in caplog.records
+            if record.msg.endswith("Restarting in %.1fs")
+        ]
+        assert delays == [0.1, 0.2]
+    finally:
+        await supervisor.close()
+
+
+def test_default_bundles():
+    ctx = create_context()
+    bundles = []
+    for bundle_id, name in enumerate(
+        ["framework", "odss.core.configadmin", "odss.http.core", "odss.http.cors"]
+    ):
+        bundle = MagicMock(id=bundle_id, start_level=None)
+        bundle.name = name
+        bundles.append(bundle)
+    ctx.get_bundles.return_value = bundles
+
+    supervisor = WorkerSupervisor(ctx, 1)
+    assert supervisor._get_bundles() == [
+        ("odss.http.core", None),
+        ("odss.http.cors", None),
+    ]
+    supervisor = WorkerSupervisor(ctx, 1, ["app.views"])
+    assert supervisor._get_bundles() == [("app.views", None)]